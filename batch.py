@@ -0,0 +1,111 @@
+# Vectorized expansion of batches of states with NumPy
+import numpy as np
+
+from game import MOVES, OPPOSITE_DIRECTIONS
+
+class BatchBoard:
+    """Board of a map as NumPy arrays, to expand a whole batch of states at once. A batch is an array of robot
+    cells (n,) and a matrix of sorted box cells (n, boxes). The walls are an extra cell past the end of the
+    board, so the neighbour tables can be indexed by a whole batch without checking for -1 first.
+        Parameters:
+            board (Board): Compiled board of the map
+            storages (list): Coordinates of the storages
+            prune_deadlocks (bool): Drop the pushes and pulls of a box to a dead cell (see Board.dead_mask)
+            box_costs (list): Heuristic cost of a box in each cell (see make_box_costs), None for no heuristic
+    """
+    def __init__(self, board, storages, prune_deadlocks=False, box_costs=None):
+        self.board = board
+        self.wall = board.size
+        self.neighbours = {
+            direction: np.array([cell if cell >= 0 else self.wall for cell in table] + [self.wall], dtype=np.int32)
+            for direction, table in board.neighbours.items()
+        }
+        self.is_storage = np.zeros(board.size + 1, dtype=bool)
+        self.is_storage[[board.cell(storage) for storage in storages]] = True
+        self.robot_keys = np.array(board.robot_keys + [0], dtype=np.uint64)
+        self.box_keys = np.array(board.box_keys + [0], dtype=np.uint64)
+        self.dead = None
+        if prune_deadlocks:
+            dead_mask = board.dead_mask(storages)
+            self.dead = np.array([bool((dead_mask >> cell) & 1) for cell in range(board.size)] + [True])
+        self.box_costs = None if box_costs is None else np.array(list(box_costs) + [0], dtype=np.int64)
+
+    def batch(self, states):
+        """Converts compact states to a batch
+            Parameters:
+                states (list): Compact states
+            Returns:
+                robots (ndarray): Robot cells
+                boxes (ndarray): Sorted box cells of each state
+        """
+        cell = self.board.cell
+        robots = np.array([cell(state.robot) for state in states], dtype=np.int32)
+        boxes = np.array([sorted(cell(box) for box in state.boxes) for state in states], dtype=np.int32)
+        return robots, boxes
+
+    def expand(self, robots, boxes):
+        """Generates every walk, push and pull of every state of a batch, with legality masks over the batch
+            Parameters:
+                robots (ndarray): Robot cells
+                boxes (ndarray): Sorted box cells of each state
+            Returns:
+                parents (ndarray): Index of the parent of each successor in the batch
+                moves (ndarray): Index of the movement of each successor in MOVES
+                robots (ndarray): Robot cells of the successors
+                boxes (ndarray): Sorted box cells of the successors
+        """
+        parents, moves, next_robots, next_boxes = [], [], [], []
+        for index, (direction, movement) in enumerate(MOVES):
+            neighbours = self.neighbours[direction]
+            target = neighbours[robots]
+            target_boxes = boxes == target[:, None]
+            has_box = target_boxes.any(axis=1)
+            if movement == "-":
+                legal = (target != self.wall) & ~has_box
+                moved_boxes = boxes
+            elif movement == "P":
+                # The box in front of the robot moves one cell further
+                beyond = neighbours[target]
+                legal = (target != self.wall) & has_box & (beyond != self.wall) & ~(boxes == beyond[:, None]).any(axis=1)
+                if self.dead is not None:
+                    legal &= ~self.dead[beyond]
+                moved_boxes = np.where(target_boxes, beyond[:, None], boxes)
+            else:
+                # The box behind the robot moves to the cell the robot leaves
+                behind = self.neighbours[OPPOSITE_DIRECTIONS[direction]][robots]
+                behind_boxes = boxes == behind[:, None]
+                legal = (target != self.wall) & ~has_box & behind_boxes.any(axis=1)
+                if self.dead is not None:
+                    legal &= ~self.dead[robots]
+                moved_boxes = np.where(behind_boxes, robots[:, None], boxes)
+            indices = np.nonzero(legal)[0]
+            parents.append(indices)
+            moves.append(np.full(len(indices), index, dtype=np.int8))
+            next_robots.append(target[indices])
+            # A walk keeps the boxes sorted
+            next_boxes.append(moved_boxes[indices] if movement == "-" else np.sort(moved_boxes[indices], axis=1))
+        return np.concatenate(parents), np.concatenate(moves), np.concatenate(next_robots), np.concatenate(next_boxes)
+
+    def keys(self, robots, boxes):
+        """Computes the Zobrist keys of a batch (see Board.zobrist_key)"""
+        return self.robot_keys[robots] ^ np.bitwise_xor.reduce(self.box_keys[boxes], axis=1)
+
+    def is_goal(self, boxes):
+        """Returns a mask of the states of a batch with every box on a storage"""
+        return self.is_storage[boxes].all(axis=1)
+
+    def heuristic(self, boxes):
+        """Computes the heuristic of every state of a batch, the sum of the costs of its boxes (see make_box_costs)"""
+        return self.box_costs[boxes].sum(axis=1)
+
+def unique_unvisited(keys, visited_keys):
+    """Finds the first occurrence of each key of a batch that is not among the visited keys, by sorting
+        Parameters:
+            keys (ndarray): Keys of the batch
+            visited_keys (ndarray): Keys already visited
+        Returns:
+            indices (ndarray): Indices of the new keys in the batch, in order
+    """
+    _, first = np.unique(keys, return_index=True)
+    first.sort()
+    return first[~np.isin(keys[first], visited_keys)]
@@ -0,0 +1,254 @@
+# Benchmark of the searching algorithms over a directory of levels
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import resource
+from functools import partial
+from time import time
+
+from game import Game, map2objects
+from search import (
+    breadth_first_search,
+    depth_first_search,
+    greedy_best_search,
+    a_star_search,
+    ida_star_search,
+    bidirectional_search,
+    hda_star_search,
+    external_breadth_first_search,
+    anytime_a_star_search,
+    batch_breadth_first_search,
+    packed_breadth_first_search,
+    packed_a_star_search
+)
+
+# Search algorithms of the benchmark, by name, and whether they take a heuristic
+ALGORITHMS = {
+    'greedy': (greedy_best_search, True),
+    'a_star': (a_star_search, True),
+    'breadth_first': (breadth_first_search, False),
+    'depth_first': (depth_first_search, False),
+    'ida_star': (ida_star_search, True),
+    'bidirectional': (bidirectional_search, False),
+    'hda_star': (hda_star_search, True),
+    'external_breadth_first': (external_breadth_first_search, False),
+    'anytime_a_star': (anytime_a_star_search, True),
+    'batch_breadth_first': (batch_breadth_first_search, False),
+    'packed_breadth_first': (packed_breadth_first_search, False),
+    'packed_a_star': (packed_a_star_search, True)
+}
+
+# Columns of the results
+FIELDS = ["level", "algorithm", "heuristic", "macro", "solved", "reason", "length", "expanded", "generated",
+          "nodes_per_sec", "peak_rss_mb", "wall_time"]
+
+# Seconds a run is given after its time limit before it is stopped
+DEADLINE_GRACE = 5
+
+# A run is a regression when it gets slower (or its nodes per second drop) by more than this factor
+REGRESSION_FACTOR = 1.2
+
+def load_levels(directory):
+    """
+    Loads the levels of a directory, one level per .txt file in the format parsed by map2objects.
+
+    Args:
+        directory (str): Directory of the levels.
+    Returns:
+        levels (dict): Map of each level, by file name without extension, sorted by name.
+    """
+    levels = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.txt'):
+            with open(os.path.join(directory, filename)) as infile:
+                levels[filename[:-4]] = infile.read().rstrip("\n")
+    return levels
+
+def run_level(game_map, algorithm, max_time, memory_mb, macro, results):
+    """
+    Runs a search algorithm on a level in a worker process, with the address space capped to memory_mb,
+    and puts the measures of the run in the results queue.
+
+    Args:
+        game_map (str): Map of the level.
+        algorithm (function): Search algorithm.
+        max_time (float): Maximum time to run the algorithm (in minutes).
+        memory_mb (int): Memory limit of the process in MB, None for no limit.
+        macro (bool): Run the search in macro mode.
+        results (Queue): Queue for the measures of the run.
+    """
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    objects = map2objects(game_map)
+    game = Game(objects["state"], objects["blanks"], objects["board"])
+    start = time()
+    try:
+        output = algorithm(game, objects["blanks"], max_time, macro=macro)
+    except MemoryError:
+        output = {"reason": "Memory exceeded"}
+    wall_time = time() - start
+
+    # ru_maxrss is in KB on Linux. The children are the workers of the parallel searches.
+    peak_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    expanded = output.get("expanded", 0)
+    generated = output.get("generated", 0)
+    results.put({
+        "solved": "moves" in output,
+        "reason": output.get("reason", ""),
+        "length": len(output["moves"]) // 2 if "moves" in output else None,
+        "expanded": expanded,
+        "generated": generated,
+        "nodes_per_sec": round(expanded / wall_time, 1) if wall_time > 0 else None,
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+        "wall_time": round(wall_time, 4)
+    })
+
+def run_benchmark(levels, algorithms, heuristics, max_time, memory_mb=None, macro=False):
+    """
+    Runs every algorithm (with every heuristic, for the algorithms that take one) on every level.
+    Each run is a separate process, stopped if it goes over its time limit.
+
+    Args:
+        levels (dict): Map of each level, by name (see load_levels).
+        algorithms (list): Names of the algorithms (see ALGORITHMS).
+        heuristics (list): Names of the heuristics (see make_heuristic).
+        max_time (float): Maximum time of each run (in minutes).
+        memory_mb (int): Memory limit of each run in MB, None for no limit.
+        macro (bool): Run the searches in macro mode.
+    Returns:
+        rows (list): Measures of each run (see FIELDS).
+    """
+    rows = []
+    for level, game_map in levels.items():
+        for name in algorithms:
+            algorithm, takes_heuristic = ALGORITHMS[name]
+            for heuristic in (heuristics if takes_heuristic else [None]):
+                search = partial(algorithm, heuristic=heuristic) if heuristic else algorithm
+                print(f"Running {name.replace('_', ' ').title()}{f' ({heuristic})' if heuristic else ''} on {level}...")
+                results = multiprocessing.Queue()
+                process = multiprocessing.Process(target=run_level, args=(game_map, search, max_time, memory_mb, macro, results))
+                process.start()
+                process.join(max_time * 60 + DEADLINE_GRACE)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+                if not results.empty():
+                    measures = results.get()
+                elif process.exitcode is not None and process.exitcode < 0 and process.exitcode != -15:
+                    measures = {"solved": False, "reason": f"Killed by signal {-process.exitcode}"}
+                elif process.exitcode:
+                    measures = {"solved": False, "reason": "Error"}
+                else:
+                    measures = {"solved": False, "reason": "Time exceeded"}
+                row = {"level": level, "algorithm": name, "heuristic": heuristic or "", "macro": macro}
+                row.update(measures)
+                rows.append({field: row.get(field) for field in FIELDS})
+                print(f"{'Solved' if row['solved'] else row['reason']} in {row.get('wall_time')} seconds\n")
+    return rows
+
+def save_results(rows, filename):
+    """
+    Saves the results of a benchmark as JSON, or as CSV if the file name ends with .csv.
+
+    Args:
+        rows (list): Measures of each run (see FIELDS).
+        filename (str): Output file.
+    """
+    with open(filename, 'w', newline='') as outfile:
+        if filename.endswith('.csv'):
+            writer = csv.DictWriter(outfile, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            json.dump(rows, outfile, indent=1)
+    print(f"Results saved to {filename}")
+
+def load_results(filename):
+    """
+    Loads the results of a benchmark saved by save_results.
+
+    Args:
+        filename (str): JSON or CSV file.
+    Returns:
+        rows (list): Measures of each run (see FIELDS). The values read from CSV are strings.
+    """
+    with open(filename, newline='') as infile:
+        if filename.endswith('.csv'):
+            return list(csv.DictReader(infile))
+        return json.load(infile)
+
+def diff_results(old_rows, new_rows):
+    """
+    Compares two benchmark runs. A run is a regression when it is no longer solved, its solution is longer,
+    or its wall time or nodes per second get worse by more than REGRESSION_FACTOR.
+
+    Args:
+        old_rows (list): Measures of the reference run.
+        new_rows (list): Measures of the new run.
+    Returns:
+        regressions (list): Description of each regression.
+    """
+    def key(row):
+        return (row["level"], row["algorithm"], row["heuristic"] or "", str(row["macro"]))
+
+    def number(value):
+        return float(value) if value not in (None, "") else None
+
+    def solved(row):
+        return row["solved"] in (True, "True")
+
+    old_runs = {key(row): row for row in old_rows}
+    regressions = []
+    for row in new_rows:
+        old = old_runs.get(key(row))
+        if old is None or not solved(old):
+            continue
+        name = "/".join(part for part in key(row)[:3] if part)
+        if not solved(row):
+            regressions.append(f"{name}: no longer solved ({row['reason']})")
+            continue
+        old_length, new_length = number(old["length"]), number(row["length"])
+        if new_length > old_length:
+            regressions.append(f"{name}: solution length {old_length:g} -> {new_length:g}")
+        old_time, new_time = number(old["wall_time"]), number(row["wall_time"])
+        if old_time and new_time > old_time * REGRESSION_FACTOR:
+            regressions.append(f"{name}: wall time {old_time:g}s -> {new_time:g}s")
+        old_speed, new_speed = number(old["nodes_per_sec"]), number(row["nodes_per_sec"])
+        if old_speed and new_speed is not None and new_speed * REGRESSION_FACTOR < old_speed:
+            regressions.append(f"{name}: nodes/sec {old_speed:g} -> {new_speed:g}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the Pukoban search algorithms")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the algorithms on a directory of levels")
+    run_parser.add_argument("levels", help="Directory of .txt levels")
+    run_parser.add_argument("--algorithms", nargs="+", default=["greedy", "a_star"], choices=list(ALGORITHMS))
+    run_parser.add_argument("--heuristics", nargs="+", default=["manhattan"], choices=["manhattan", "distance", "matching"])
+    run_parser.add_argument("--time", type=float, default=1, help="Time limit of each run (in minutes)")
+    run_parser.add_argument("--memory", type=int, default=None, help="Memory limit of each run (in MB)")
+    run_parser.add_argument("--macro", action="store_true", help="Run the searches in macro mode")
+    run_parser.add_argument("--output", default="benchmark.json", help="Results file (.json or .csv)")
+
+    diff_parser = commands.add_parser("diff", help="Compare two benchmark results")
+    diff_parser.add_argument("old", help="Results of the reference run")
+    diff_parser.add_argument("new", help="Results of the new run")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        rows = run_benchmark(load_levels(args.levels), args.algorithms, args.heuristics, args.time, args.memory, args.macro)
+        save_results(rows, args.output)
+    else:
+        regressions = diff_results(load_results(args.old), load_results(args.new))
+        for regression in regressions:
+            print(regression)
+        print(f"{len(regressions)} regressions")
+        exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Checkpoints of the searching algorithms, to resume a search after it is stopped
+import gc
+import os
+import pickle
+from contextlib import contextmanager
+from itertools import islice
+from time import perf_counter
+
+# Seconds between two checkpoints of a search
+CHECKPOINT_INTERVAL = 60.0
+
+# Minimum ratio of the time between two checkpoints to the time the last one took to save, so a search with a
+# large open list, pickled whole at every checkpoint, spends at most a tenth of its time saving it
+SAVE_TIME_RATIO = 10
+
+@contextmanager
+def paused_gc():
+    """Pauses the cyclic garbage collector while the millions of small tuples of a checkpoint are pickled or
+    unpickled. None of them makes a cycle, and the collections it would run on the way take most of the time."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+class Checkpoint:
+    """Checkpoint files of a search. The search state (open list, counters, time spent...) is pickled to path
+    at every checkpoint, written to a temporary file and renamed, so the file is never left half written. The
+    dictionaries that only grow (the visited nodes and their parents) are saved incrementally instead: each
+    checkpoint appends the entries added since the previous one to path + ".log", and the state records how
+    much of the log it goes with, so a log written past the last state is cut back when it is loaded.
+    A checkpoint is only loaded by the same algorithm on the same map and parameters (the signature).
+    The interval grows with the time the checkpoints take to save (see SAVE_TIME_RATIO).
+        Parameters:
+            path (str): Path of the checkpoint file
+            interval (float): Minimum seconds between two checkpoints
+    """
+    def __init__(self, path, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.log_path = path + ".log"
+        self.interval = interval
+        self.saved = {} # Number of entries of each dictionary already in the log
+        self.next_save = perf_counter() + interval
+
+    def due(self):
+        """Checks if the interval since the last checkpoint is over"""
+        return perf_counter() >= self.next_save
+
+    def load(self, algorithm, signature):
+        """Loads the last checkpoint of a search
+            Parameters:
+                algorithm (str): Name of the search algorithm
+                signature (str): Map and parameters of the search (see checkpoint_signature)
+            Returns:
+                state (dict): Search state of the checkpoint, None if there is no checkpoint of this search
+                records (dict): Entries of each dictionary saved incrementally, as lists of (key, value) pairs
+        """
+        try:
+            with open(self.path, "rb") as infile, paused_gc():
+                checkpoint = pickle.load(infile)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None, {}
+        if checkpoint["algorithm"] != algorithm or checkpoint["signature"] != signature:
+            return None, {}
+        records = {}
+        if checkpoint["log_size"]:
+            try:
+                with open(self.log_path, "r+b") as log, paused_gc():
+                    while log.tell() < checkpoint["log_size"]:
+                        for name, items in pickle.load(log).items():
+                            records.setdefault(name, []).extend(items)
+                    log.truncate(checkpoint["log_size"])
+            except (OSError, EOFError, pickle.UnpicklingError):
+                return None, {} # The log is missing or shorter than the checkpoint, the search starts over
+        self.saved = {name: len(items) for name, items in records.items()}
+        self.next_save = perf_counter() + self.interval
+        return checkpoint["state"], records
+
+    def save(self, algorithm, signature, state, records=None):
+        """Saves a checkpoint of a search
+            Parameters:
+                algorithm (str): Name of the search algorithm
+                signature (str): Map and parameters of the search (see checkpoint_signature)
+                state (dict): Search state, pickled whole
+                records (dict): Dictionaries saved incrementally by name, only their new entries are written
+        """
+        start = perf_counter()
+        with paused_gc():
+            self.write(algorithm, signature, state, records)
+        end = perf_counter()
+        self.next_save = end + max(self.interval, SAVE_TIME_RATIO * (end - start))
+
+    def write(self, algorithm, signature, state, records):
+        """Appends the new entries of the records to the log, then replaces the checkpoint file (see save)"""
+        if not self.saved and os.path.exists(self.log_path):
+            os.remove(self.log_path) # Log of another search
+        frame = {name: list(islice(entries.items(), self.saved.get(name, 0), None)) for name, entries in (records or {}).items()}
+        with open(self.log_path, "ab") as log:
+            if any(frame.values()):
+                pickle.dump(frame, log, pickle.HIGHEST_PROTOCOL)
+                log.flush()
+                os.fsync(log.fileno())
+            log_size = log.tell()
+        for name, items in frame.items():
+            self.saved[name] = self.saved.get(name, 0) + len(items)
+
+        checkpoint = {"algorithm": algorithm, "signature": signature, "state": state, "log_size": log_size}
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as outfile:
+            pickle.dump(checkpoint, outfile, pickle.HIGHEST_PROTOCOL)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(temporary_path, self.path)
+
+    def clear(self):
+        """Removes the checkpoint files, once the search is over"""
+        for path in (self.path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.saved = {}
@@ -0,0 +1,81 @@
+# Frontier (open list) data structures for the searching algorithms
+import heapq
+from collections import deque
+
+# 1. First in, first out frontier
+class FifoFrontier:
+    """Queue frontier used by Breadth First Search. Push and pop are O(1)."""
+    def __init__(self):
+        self.items = deque()
+
+    def push(self, item, priority=None):
+        """Adds an item at the end of the queue (the priority is ignored)"""
+        self.items.append(item)
+
+    def pop(self):
+        """Removes and returns the oldest item"""
+        return self.items.popleft()
+
+    def __len__(self):
+        return len(self.items)
+
+# 2. Last in, first out frontier
+class LifoFrontier:
+    """Stack frontier used by Depth First Search. Push and pop are O(1)."""
+    def __init__(self):
+        self.items = []
+
+    def push(self, item, priority=None):
+        """Adds an item at the top of the stack (the priority is ignored)"""
+        self.items.append(item)
+
+    def pop(self):
+        """Removes and returns the newest item"""
+        return self.items.pop()
+
+    def __len__(self):
+        return len(self.items)
+
+# 3. Priority frontier
+class PriorityFrontier:
+    """Binary heap frontier used by Greedy Best Search and A*. Push and pop are O(log n).
+    Items with the same priority are popped in insertion order, so the search is
+    deterministic and the items themselves are never compared.
+    """
+    def __init__(self):
+        self.heap = []
+        self.pushed = 0
+
+    def push(self, item, priority):
+        """Adds an item with the given priority (tuple or number, lowest first)"""
+        heapq.heappush(self.heap, (priority, self.pushed, item))
+        self.pushed += 1
+
+    def pop(self):
+        """Removes and returns the item with the lowest priority"""
+        return heapq.heappop(self.heap)[2]
+
+    def peek(self):
+        """Returns the lowest priority, without removing its item"""
+        return self.heap[0][0]
+
+    def __len__(self):
+        return len(self.heap)
+
+FRONTIERS = {
+    "fifo": FifoFrontier,
+    "lifo": LifoFrontier,
+    "priority": PriorityFrontier
+}
+
+# 4. Frontier factory
+def make_frontier(kind):
+    """Creates an empty frontier
+        Parameters:
+            kind (str): Type of frontier: "fifo", "lifo" or "priority"
+        Returns:
+            frontier (object): Empty frontier with push, pop and len
+    """
+    if kind not in FRONTIERS:
+        raise ValueError(f"Unknown frontier '{kind}', expected one of {sorted(FRONTIERS)}")
+    return FRONTIERS[kind]()
@@ -1,223 +1,870 @@
-import copy
-
-# 1. Map to objects function
-def map2objects(game_map):
-    """Generates a dictionary with the coordinates of the robot, the boxes and the storages from a given map
-    Args:
-        my_map (str): Map of the game
-    Returns:
-        objects (list): Dictionary with the coordinates of the robot, the boxes, the storages and the blanks
-    """
-    blanks = []
-    boxes = []
-    storages = []
-    y = game_map.count("\n")
-    x = 0
-    
-    # Blanks are the empty spaces where the robot and the boxes can move.
-    # In this case, the blanks are the spaces that are not walls. 
-    for i in game_map:
-        if i == "R":
-            blanks.append((x,y))
-            robot = (x,y)
-        elif i==" ":
-            blanks.append((x,y))
-        elif i=="B":
-            boxes.append((x,y))
-            blanks.append((x,y))
-        elif i=="S":
-            # Storages are also blanks
-            storages.append((x,y))
-            blanks.append((x,y))
-        elif i == "\n":
-            y -= 1
-            x = -1
-        x += 1
-    objects = {"state": {"robot":robot, "boxes":boxes, "storages":storages}, "blanks":blanks}
-    return objects
-
-# 2. Game class for the Pukoban game
-class Game:
-    # Constructor
-    def __init__(self, initialization_state, blanks_coords):
-        """Initializes the game from a given state
-        Args:
-            state (dict): Dictionary with the coordinates of the robot, the boxes and the storages
-            blanks_coords (list): Coordinates of the blanks. Blanks are the empty spaces where the robot and the boxes can move.
-        """
-        self.robot = initialization_state["robot"]
-        self.boxes = initialization_state["boxes"]
-        self.storages = initialization_state["storages"]
-        self.blanks = blanks_coords
-        
-    def check_win(self):
-        #Check if all the storages are filled with boxes (can have more boxes than storages)
-        if all(item in self.storages for item in self.boxes):
-            return True
-        else:
-            return False
-        
-    def get_moving_coords(self, direction):
-        """
-        Check if the robot can move in the given direction
-            Parameters:
-                direction (tuple): (Direction to move in, type of movement)
-            Returns:
-                moving_coords (list): Coordinates of the robot and box after moving, 
-        """
-        robot_coords = self.robot
-        blanks_coords = self.blanks
-        boxes_coords = self.boxes
-          
-        # Get the coordinates of the robot after moving
-        if direction[0] == "L":
-            robot_moving_coords = (robot_coords[0] - 1, robot_coords[1])
-        elif direction[0] == "R":
-            robot_moving_coords = (robot_coords[0] + 1, robot_coords[1])
-        elif direction[0] == "U":
-            robot_moving_coords = (robot_coords[0], robot_coords[1] + 1) 
-        elif direction[0] == "D":
-            robot_moving_coords = (robot_coords[0], robot_coords[1] - 1)        
-        
-        
-        # Get the coordinates of the box before (box_coords) and after moving (box_moving_coords)
-        if direction[1] == "P":
-            if direction[0] == "L":
-                box_moving_coords = (robot_coords[0] - 2, robot_coords[1])
-                box_coords = (robot_coords[0] - 1, robot_coords[1])
-            elif direction[0] == "R":
-                box_moving_coords = (robot_coords[0] + 2, robot_coords[1])
-                box_coords = (robot_coords[0] + 1, robot_coords[1])
-            elif direction[0] == "U":
-                box_moving_coords = (robot_coords[0], robot_coords[1] + 2)
-                box_coords = (robot_coords[0], robot_coords[1] + 1)
-            elif direction[0] == "D":
-                box_moving_coords = (robot_coords[0], robot_coords[1] - 2)
-                box_coords = (robot_coords[0], robot_coords[1] - 1)
-        elif direction[1] == "p":
-            box_moving_coords = robot_coords
-            if direction[0] == "L":
-                box_coords = (robot_coords[0] + 1, robot_coords[1])
-            elif direction[0] == "R":
-                box_coords = (robot_coords[0] - 1, robot_coords[1])
-            elif direction[0] == "U":
-                box_coords = (robot_coords[0], robot_coords[1] - 1)
-            elif direction[0] == "D":
-                box_coords = (robot_coords[0], robot_coords[1] + 1)
-        
-        moving_coords = {}
-         
-        # Check if the robot can move in the given direction
-        # If it can, return the coordinates of the robot and the box after moving
-        # If it can't, return an empty list
-            
-        if direction[1] == "-":
-            if robot_moving_coords in blanks_coords:
-                moving_coords["robot"] = robot_moving_coords
-        elif direction[1] == "P":
-            if robot_moving_coords in boxes_coords and box_moving_coords in blanks_coords and box_coords in boxes_coords:
-                moving_coords["robot"] = robot_moving_coords
-                moving_coords["box"] = box_moving_coords
-                moving_coords["box_prior_coords"] = box_coords 
-        elif direction[1] == "p":
-            if robot_moving_coords in blanks_coords and box_coords in boxes_coords:
-                moving_coords["robot"] = robot_moving_coords
-                moving_coords["box"] = box_moving_coords
-                moving_coords["box_prior_coords"] = box_coords 
-        
-        return moving_coords
-       
-    def check_action(self, direction):
-        """Checks if the robot can move in the given direction
-        Args:
-            direction (tuple): (Direction to move in, type of movement)
-        Returns:
-            True if the robot can move in the given direction, False otherwise
-        """
-        moving_coords = self.get_moving_coords(direction).copy()
-        current_boxes = self.boxes.copy()
-        
-        # 1. Check if the coordinates are not empty (the movement is valid)
-        invalid_movement = False
-        if not moving_coords:
-            invalid_movement = True
-            
-        # 2. Check if the robot is moving into a box (not when pushing or pulling)
-        robot_into_box = False
-        # if not invalid_movement:
-        if "robot" in moving_coords.keys() and "box" not in moving_coords.keys():
-            if moving_coords["robot"] in current_boxes:
-                robot_into_box = True
-        
-        # 3. Check if a box is moved into a position where there is another box
-        colliding_boxes = False
-        if "box" in moving_coords.keys():
-            for box in current_boxes:
-                if box == moving_coords["box"]:
-                    colliding_boxes = True
-
-        if invalid_movement or colliding_boxes or robot_into_box:
-            return False
-        else:    
-            return True
-
-    def state_after_action(self, direction):
-        """Computes the state of the game after the robot moves in the given direction
-
-        Args:
-            direction (tuple): (Direction to move in, type of movement)
-        """
-        if not self.check_action(direction):
-            return("Invalid movement")
-        else:
-            moving_coordinates = {}
-            state_after_action = {}
-            current_state = {}
-            moving_coordinates = copy.deepcopy(self.get_moving_coords(direction))
-            current_state = copy.deepcopy(self.get_current_state())
-            state_after_action = copy.deepcopy(current_state)
-            
-            if "box" not in moving_coordinates.keys():
-                state_after_action["robot"] = moving_coordinates["robot"]
-            else:
-                if direction[1] == "P":
-                    state_after_action["boxes"].remove(moving_coordinates["box_prior_coords"])
-                    state_after_action["boxes"].append(moving_coordinates["box"])
-                    
-                    state_after_action["robot"] = moving_coordinates["robot"]
-                if direction[1] == "p":
-                    state_after_action["boxes"].remove(moving_coordinates["box_prior_coords"])
-                    state_after_action["boxes"].append(moving_coordinates["box"])
-                
-                    state_after_action["robot"] = moving_coordinates["robot"]
-            return(state_after_action)
-
-          
-    def get_current_state(self):
-        """Returns the current state of the game
-        Returns:
-            current_state list: coordinates of the robot, the boxes, the storages, and the blanks
-        """
-        robot_coords = self.robot
-        boxes_coords = self.boxes
-        storages_coords = self.storages
-        
-        current_state_list = {"robot":robot_coords, "boxes":boxes_coords, "storages":storages_coords}
-        return current_state_list
-    
-    def successor_function(self):
-        """Generates all possible states from the current state
-            Parameters:
-                None
-            Returns:
-                next_states (list): List of possible movements of the robot
-        """
-        directions = ["L", "R", "U", "D"]
-        movements = ["-", "P", "p"]
-        next_states = []
-        for direction in directions:
-            for movement in movements:
-                if self.check_action((direction, movement)):
-                    next_states = next_states + [self.state_after_action((direction, movement))]    
-        return next_states
-    
\ No newline at end of file
+import random
+from collections import namedtuple
+
+# Compact state of a node in the search tree. The storages and blanks never change
+# during a game, so they are kept outside of the state. The boxes are stored as a
+# sorted tuple so two states with the same boxes in a different order are equal.
+State = namedtuple("State", ["robot", "boxes"])
+
+# 1. Map to objects function
+def map2objects(game_map):
+    """Generates a dictionary with the coordinates of the robot, the boxes and the storages from a given map
+    Args:
+        my_map (str): Map of the game
+    Returns:
+        objects (list): Dictionary with the coordinates of the robot, the boxes, the storages and the blanks
+    """
+    blanks = []
+    boxes = []
+    storages = []
+    y = game_map.count("\n")
+    x = 0
+    
+    # Blanks are the empty spaces where the robot and the boxes can move.
+    # In this case, the blanks are the spaces that are not walls. 
+    for i in game_map:
+        if i == "R":
+            blanks.append((x,y))
+            robot = (x,y)
+        elif i==" ":
+            blanks.append((x,y))
+        elif i=="B":
+            boxes.append((x,y))
+            blanks.append((x,y))
+        elif i=="S":
+            # Storages are also blanks
+            storages.append((x,y))
+            blanks.append((x,y))
+        elif i == "\n":
+            y -= 1
+            x = -1
+        x += 1
+    objects = {"state": {"robot":robot, "boxes":boxes, "storages":storages}, "blanks":blanks, "board": Board(blanks)}
+    return objects
+
+def state_from_dict(state):
+    """Builds the compact, hashable state from a state dictionary
+    Args:
+        state (dict): Dictionary with the coordinates of the robot, the boxes and the storages
+    Returns:
+        compact_state (State): Robot coordinates and sorted tuple of box coordinates
+    """
+    return State(tuple(state["robot"]), tuple(sorted(tuple(box) for box in state["boxes"])))
+
+def state_to_dict(compact_state, storages):
+    """Builds a state dictionary from a compact state
+    Args:
+        compact_state (State): Robot coordinates and sorted tuple of box coordinates
+        storages (list): Coordinates of the storages
+    Returns:
+        state (dict): Dictionary with the coordinates of the robot, the boxes and the storages
+    """
+    return {"robot": compact_state.robot, "boxes": list(compact_state.boxes), "storages": storages}
+
+# Offsets of the four directions of movement
+DIRECTION_OFFSETS = {"L": (-1, 0), "R": (1, 0), "U": (0, 1), "D": (0, -1)}
+OPPOSITE_DIRECTIONS = {"L": "R", "R": "L", "U": "D", "D": "U"}
+
+# Seed of the random Zobrist keys, fixed so the keys are the same in every process
+ZOBRIST_SEED = 20240128
+
+# Movements of the robot: (direction, type of movement), where "-" is a walk, "P" a push and "p" a pull
+MOVES = [(direction, movement) for direction in ["L", "R", "U", "D"] for movement in ["-", "P", "p"]]
+BOX_MOVES = [move for move in MOVES if move[1] != "-"]
+
+def moves_to_string(moves):
+    """Encodes a sequence of movements as a string, LURD style: the direction in upper case
+    followed by the type of movement ("-" walk, "P" push, "p" pull), e.g. "L-UPDp"
+    Args:
+        moves (list): Movements as (direction, type of movement) tuples
+    Returns:
+        moves_string (str): Encoded movements
+    """
+    return "".join(direction + movement for direction, movement in moves)
+
+def string_to_moves(moves_string):
+    """Decodes a string of movements encoded by moves_to_string
+    Args:
+        moves_string (str): Encoded movements
+    Returns:
+        moves (list): Movements as (direction, type of movement) tuples
+    """
+    return [(moves_string[i], moves_string[i + 1]) for i in range(0, len(moves_string), 2)]
+
+def reverse_move(move):
+    """Returns the movement that undoes the given one: a walk is undone by a walk in the opposite
+    direction, a push by a pull in the opposite direction and a pull by a push
+    Args:
+        move (tuple): (Direction to move in, type of movement)
+    Returns:
+        reversed_move (tuple): (Direction to move in, type of movement)
+    """
+    direction, movement = move
+    return (OPPOSITE_DIRECTIONS[direction], {"-": "-", "P": "p", "p": "P"}[movement])
+
+def reverse_macro_move(macro_move):
+    """Returns the macro movement that undoes the given one (see Game.macro_successors). The robot
+    moves one cell in the direction of each movement, so the reverse starts from the last cell and
+    undoes the movements backwards.
+    Args:
+        macro_move (tuple): (Robot coordinates before the movements, movements)
+    Returns:
+        reversed_macro_move (tuple): (Robot coordinates before the reversed movements, reversed movements)
+    """
+    (x, y), moves = macro_move
+    for direction, movement in moves:
+        dx, dy = DIRECTION_OFFSETS[direction]
+        x, y = x + dx, y + dy
+    return ((x, y), tuple(reverse_move(move) for move in reversed(moves)))
+
+# 2. Compiled board of a map
+class Board:
+    """Static part of a map compiled for fast lookups. Each cell of the bounding box of the
+    blanks is indexed by an integer, the blanks are kept as a bitmask and every blank cell has
+    its neighbour in each direction precomputed (-1 when the neighbour is a wall).
+    A board never changes during a game, so it is built once per map and shared by all the states.
+    """
+    def __init__(self, blanks_coords):
+        """Compiles the board from the coordinates of the blanks
+        Args:
+            blanks_coords (list): Coordinates of the blanks
+        """
+        xs = [blank[0] for blank in blanks_coords]
+        ys = [blank[1] for blank in blanks_coords]
+        self.min_x = min(xs)
+        self.min_y = min(ys)
+        self.width = max(xs) - self.min_x + 1
+        self.height = max(ys) - self.min_y + 1
+        self.size = self.width * self.height
+        
+        self.blank_mask = 0
+        for blank in blanks_coords:
+            self.blank_mask |= 1 << self.cell(blank)
+        
+        # neighbours[direction][cell] is the blank cell next to cell in that direction, or -1
+        self.neighbours = {}
+        for direction, (dx, dy) in DIRECTION_OFFSETS.items():
+            table = [-1] * self.size
+            for blank in blanks_coords:
+                next_coords = (blank[0] + dx, blank[1] + dy)
+                if self.is_inside(next_coords) and self.is_blank(self.cell(next_coords)):
+                    table[self.cell(blank)] = self.cell(next_coords)
+            self.neighbours[direction] = table
+        
+        # tunnels[direction] is the bitmask of the blank cells with walls on both sides across the direction:
+        # a box and the robot in a row of them along the direction can only move along it
+        self.tunnels = {}
+        for direction in DIRECTION_OFFSETS:
+            sides = [side for side in DIRECTION_OFFSETS if side not in (direction, OPPOSITE_DIRECTIONS[direction])]
+            self.tunnels[direction] = self.mask(
+                blank for blank in blanks_coords if all(self.neighbours[side][self.cell(blank)] < 0 for side in sides))
+        
+        # Dead cells masks and goal rooms, indexed by the storages they were computed for
+        self.dead_masks = {}
+        self.goal_rooms_lists = {}
+        
+        # Random 64-bit keys of the robot and of a box in each cell. The Zobrist key of a state is the
+        # xor of the keys of its robot and boxes cells, so a movement updates it in O(1)
+        generator = random.Random(ZOBRIST_SEED)
+        self.robot_keys = [generator.getrandbits(64) for _ in range(self.size)]
+        self.box_keys = [generator.getrandbits(64) for _ in range(self.size)]
+    
+    def is_inside(self, coords):
+        """Checks if the coordinates are inside the bounding box of the board"""
+        return 0 <= coords[0] - self.min_x < self.width and 0 <= coords[1] - self.min_y < self.height
+    
+    def is_blank(self, cell):
+        """Checks if the cell is a blank"""
+        return cell >= 0 and (self.blank_mask >> cell) & 1 == 1
+    
+    def cell(self, coords):
+        """Returns the cell index of the given coordinates"""
+        return (coords[1] - self.min_y) * self.width + coords[0] - self.min_x
+    
+    def coords(self, cell):
+        """Returns the coordinates of the given cell index"""
+        return (cell % self.width + self.min_x, cell // self.width + self.min_y)
+    
+    def mask(self, coords_list):
+        """Returns the bitmask of the cells of the given coordinates"""
+        mask = 0
+        for coords in coords_list:
+            mask |= 1 << self.cell(coords)
+        return mask
+    
+    def zobrist_key(self, robot_coords, boxes_coords):
+        """Returns the Zobrist key of a state
+        Args:
+            robot_coords (tuple): Coordinates of the robot
+            boxes_coords (list): Coordinates of the boxes
+        Returns:
+            key (int): 64-bit key of the state
+        """
+        key = self.robot_keys[self.cell(robot_coords)]
+        for box in boxes_coords:
+            key ^= self.box_keys[self.cell(box)]
+        return key
+    
+    def dead_mask(self, storages):
+        """Returns the bitmask of the blank cells from which a box can never reach a storage.
+        A box moves to a neighbour cell when the robot has room behind it to push it, or room
+        after the neighbour cell to pull it, so the live cells are found with a backwards search
+        from the storages. The mask is computed once per set of storages.
+        Args:
+            storages (list): Coordinates of the storages
+        Returns:
+            dead_mask (int): Bitmask of the dead cells
+        """
+        key = tuple(sorted(tuple(storage) for storage in storages))
+        if key not in self.dead_masks:
+            live_mask = self.mask(key)
+            cells = [self.cell(storage) for storage in key]
+            for cell in cells:
+                for direction in DIRECTION_OFFSETS:
+                    opposite = OPPOSITE_DIRECTIONS[direction]
+                    prior_cell = self.neighbours[opposite][cell]
+                    if prior_cell < 0 or (live_mask >> prior_cell) & 1:
+                        continue
+                    if self.neighbours[opposite][prior_cell] >= 0 or self.neighbours[direction][cell] >= 0:
+                        live_mask |= 1 << prior_cell
+                        cells.append(prior_cell)
+            self.dead_masks[key] = self.blank_mask & ~live_mask
+        return self.dead_masks[key]
+    
+    def region(self, start_cell, blocked_mask):
+        """Returns the cells connected to a cell without crossing the blocked cells, with their distance to it
+        Args:
+            start_cell (int): First cell of the region
+            blocked_mask (int): Bitmask of the cells that can't be crossed
+        Returns:
+            distances (dict): Distance of each cell of the region, in breadth first order, including start_cell
+        """
+        tables = list(self.neighbours.values())
+        blocked = blocked_mask | (1 << start_cell)
+        distances = {start_cell: 0}
+        cells = [start_cell]
+        for cell in cells:
+            for table in tables:
+                next_cell = table[cell]
+                if next_cell >= 0 and not (blocked >> next_cell) & 1:
+                    blocked |= 1 << next_cell
+                    distances[next_cell] = distances[cell] + 1
+                    cells.append(next_cell)
+        return distances
+    
+    def goal_rooms(self, storages):
+        """Returns the goal rooms of the map: areas with at least two storages that are only connected to the
+        rest of the map through one entrance cell, and smaller than the rest of the map. The storages of a room
+        get a fill order, farthest from the entrance first, such that the storages left empty and the entrance
+        stay connected after each one is filled. A room with no such order is left out. The rooms are computed
+        once per set of storages.
+        Args:
+            storages (list): Coordinates of the storages
+        Returns:
+            rooms (list): Tuples (entrance cell, bitmask of the room cells, storage cells in fill order)
+        """
+        key = tuple(sorted(tuple(storage) for storage in storages))
+        if key in self.goal_rooms_lists:
+            return self.goal_rooms_lists[key]
+        storages_mask = self.mask(key)
+        blanks_count = bin(self.blank_mask).count("1")
+        candidates = {}
+        for entrance in range(self.size):
+            if not self.is_blank(entrance) or (storages_mask >> entrance) & 1:
+                continue
+            seen_mask = 1 << entrance
+            for table in self.neighbours.values():
+                start_cell = table[entrance]
+                if start_cell < 0 or (seen_mask >> start_cell) & 1:
+                    continue
+                cells = list(self.region(start_cell, 1 << entrance))
+                room_mask = 0
+                for cell in cells:
+                    room_mask |= 1 << cell
+                seen_mask |= room_mask
+                if bin(room_mask & storages_mask).count("1") >= 2 and 2 * len(cells) < blanks_count:
+                    # The entrance next to the room is kept when a corridor leads to it
+                    if room_mask not in candidates or len(cells) < len(candidates[room_mask][1]):
+                        candidates[room_mask] = (entrance, cells)
+        
+        rooms = []
+        for room_mask, (entrance, cells) in candidates.items():
+            if any(other != room_mask and other & room_mask == other and other & storages_mask == room_mask & storages_mask
+                   for other in candidates):
+                continue
+            distances = self.region(entrance, self.blank_mask ^ room_mask)
+            filled_mask = 0
+            empty = [cell for cell in cells if (storages_mask >> cell) & 1]
+            fill_order = []
+            while empty:
+                for cell in sorted(empty, key=lambda cell: -distances[cell]):
+                    # The storages left and the entrance must stay connected once the cell is filled
+                    blocked_mask = (self.blank_mask ^ room_mask ^ (1 << entrance)) | filled_mask | (1 << cell)
+                    region = self.region(entrance, blocked_mask)
+                    if all(other in region for other in empty if other != cell):
+                        break
+                else:
+                    break
+                fill_order.append(cell)
+                filled_mask |= 1 << cell
+                empty.remove(cell)
+            if not empty:
+                rooms.append((entrance, room_mask, fill_order))
+        self.goal_rooms_lists[key] = rooms
+        return rooms
+    
+    def frozen_cluster(self, boxes_mask, box_cell):
+        """Checks if a box can never move again, and returns the boxes that freeze it.
+        A box can move towards a direction when the next cell is free and the robot has room to push
+        (free cell behind the box) or to pull (free cell after the next one). Walls and frozen boxes are
+        not free. To avoid cycles, the boxes being checked are taken as walls.
+        Args:
+            boxes_mask (int): Bitmask of the boxes
+            box_cell (int): Cell of the box to check
+        Returns:
+            cluster (set): Cells of the frozen boxes, including box_cell, or an empty set if the box can move
+        """
+        neighbours = self.neighbours
+        cluster = set()
+        
+        def solid(cell):
+            if cell < 0 or cell in cluster:
+                return True
+            return (boxes_mask >> cell) & 1 == 1 and frozen(cell)
+        
+        def blocked(cell, direction, opposite):
+            next_cell = neighbours[direction][cell]
+            if solid(next_cell):
+                return True
+            return solid(neighbours[opposite][cell]) and solid(neighbours[direction][next_cell])
+        
+        def frozen(cell):
+            before = set(cluster)
+            cluster.add(cell)
+            if (blocked(cell, "L", "R") and blocked(cell, "R", "L")
+                    and blocked(cell, "U", "D") and blocked(cell, "D", "U")):
+                return True
+            # The boxes found frozen while checking this one took it as a wall, so they are not frozen either
+            cluster.intersection_update(before)
+            return False
+        
+        return cluster if frozen(box_cell) else set()
+
+# 3. Game class for the Pukoban game
+class Game:
+    # Constructor
+    def __init__(self, initialization_state, blanks_coords, board=None, prune_deadlocks=False, box_costs=None, compound_macros=False):
+        """Initializes the game from a given state
+        Args:
+            state (dict): Dictionary with the coordinates of the robot, the boxes and the storages
+            blanks_coords (list): Coordinates of the blanks. Blanks are the empty spaces where the robot and the boxes can move.
+            board (Board): Compiled board of the map. It is built from the blanks if not given.
+            prune_deadlocks (bool): Leave out of the successors the states from which the goal can't be reached
+            box_costs (list): Heuristic cost of a box in each cell. When given, the heuristic value of the state
+                (sum of the costs of its boxes) is kept up to date as the boxes move.
+            compound_macros (bool): In macro mode, push or pull a box through a whole tunnel and into its storage in
+                a goal room in one macro movement (see compound_moves)
+        """
+        self.robot = initialization_state["robot"]
+        self.boxes = list(initialization_state["boxes"]) # Own copy, apply and undo move the boxes in place
+        self.storages = initialization_state["storages"]
+        self.blanks = blanks_coords
+        self.board = board if board is not None else Board(blanks_coords)
+        self.robot_cell = self.board.cell(self.robot)
+        self.boxes_mask = self.board.mask(self.boxes)
+        self.prune_deadlocks = prune_deadlocks
+        self.storages_mask = self.board.mask(self.storages)
+        self.dead_mask = self.board.dead_mask(self.storages) if prune_deadlocks else 0
+        self.key = self.board.zobrist_key(self.robot, self.boxes)
+        self.box_costs = box_costs
+        self.heuristic = sum(box_costs[self.board.cell(box)] for box in self.boxes) if box_costs is not None else None
+        self.compound_macros = compound_macros
+        
+    def check_win(self):
+        #Check if all the storages are filled with boxes (can have more boxes than storages)
+        if all(item in self.storages for item in self.boxes):
+            return True
+        else:
+            return False
+        
+    def get_moving_coords(self, direction):
+        """
+        Check if the robot can move in the given direction
+            Parameters:
+                direction (tuple): (Direction to move in, type of movement)
+            Returns:
+                moving_coords (list): Coordinates of the robot and box after moving, 
+        """
+        board = self.board
+        robot_cell = self.robot_cell
+        boxes_mask = self.boxes_mask
+        
+        # Cell of the robot after moving (-1 if it is a wall)
+        robot_moving_cell = board.neighbours[direction[0]][robot_cell]
+        
+        moving_coords = {}
+        
+        # Check if the robot can move in the given direction
+        # If it can, return the coordinates of the robot and the box after moving
+        # If it can't, return an empty dictionary
+        if robot_moving_cell < 0:
+            return moving_coords
+        
+        if direction[1] == "-":
+            moving_coords["robot"] = board.coords(robot_moving_cell)
+        elif direction[1] == "P":
+            # The box is in front of the robot and moves one cell further
+            box_cell = robot_moving_cell
+            box_moving_cell = board.neighbours[direction[0]][box_cell]
+            if box_moving_cell >= 0 and (boxes_mask >> box_cell) & 1:
+                moving_coords["robot"] = board.coords(robot_moving_cell)
+                moving_coords["box"] = board.coords(box_moving_cell)
+                moving_coords["box_prior_coords"] = board.coords(box_cell)
+        elif direction[1] == "p":
+            # The box is behind the robot and moves to the cell the robot leaves
+            box_cell = board.neighbours[OPPOSITE_DIRECTIONS[direction[0]]][robot_cell]
+            if box_cell >= 0 and (boxes_mask >> box_cell) & 1:
+                moving_coords["robot"] = board.coords(robot_moving_cell)
+                moving_coords["box"] = self.robot
+                moving_coords["box_prior_coords"] = board.coords(box_cell)
+        
+        return moving_coords
+       
+    def get_legal_moving_coords(self, direction):
+        """Returns the coordinates of the robot and box after moving, only if the movement is legal
+        Args:
+            direction (tuple): (Direction to move in, type of movement)
+        Returns:
+            moving_coords (dict): Coordinates of the robot and box after moving, empty if the movement is not legal
+        """
+        moving_coords = self.get_moving_coords(direction)
+        
+        # 1. Check if the coordinates are not empty (the movement is valid)
+        if not moving_coords:
+            return moving_coords
+        
+        # 2. Check if the robot is moving into a box (not when pushing, the pushed box makes room)
+        if direction[1] != "P" and (self.boxes_mask >> self.board.cell(moving_coords["robot"])) & 1:
+            return {}
+        
+        # 3. Check if a box is moved into a position where there is another box
+        if "box" in moving_coords and (self.boxes_mask >> self.board.cell(moving_coords["box"])) & 1:
+            return {}
+        
+        return moving_coords
+    
+    def is_deadlock(self, moving_coords):
+        """Checks if a movement leaves the game in a state from which the goal can't be reached:
+        the box is moved to a dead cell, or it gets frozen with some box out of a storage
+        Args:
+            moving_coords (dict): Coordinates of the robot and box after moving
+        Returns:
+            True if the movement leads to a deadlock, False otherwise
+        """
+        if "box" not in moving_coords:
+            return False
+        board = self.board
+        box_cell = board.cell(moving_coords["box"])
+        if (self.dead_mask >> box_cell) & 1:
+            return True
+        boxes_mask = self.boxes_mask ^ (1 << board.cell(moving_coords["box_prior_coords"])) ^ (1 << box_cell)
+        cluster = board.frozen_cluster(boxes_mask, box_cell)
+        return any(not (self.storages_mask >> cell) & 1 for cell in cluster)
+    
+    def check_action(self, direction):
+        """Checks if the robot can move in the given direction
+        Args:
+            direction (tuple): (Direction to move in, type of movement)
+        Returns:
+            True if the robot can move in the given direction, False otherwise
+        """
+        return bool(self.get_legal_moving_coords(direction))
+
+    def state_after_action(self, direction):
+        """Computes the state of the game after the robot moves in the given direction
+
+        Args:
+            direction (tuple): (Direction to move in, type of movement)
+        """
+        moving_coords = self.get_legal_moving_coords(direction)
+        if not moving_coords:
+            return("Invalid movement")
+        return self.state_from_moving_coords(moving_coords)
+    
+    def state_from_moving_coords(self, moving_coords):
+        """Builds the state after a legal movement. Only the list of boxes is copied, the
+        coordinates are immutable tuples and the storages are shared with the current game.
+        Args:
+            moving_coords (dict): Coordinates of the robot and box after moving
+        Returns:
+            state (dict): Dictionary with the coordinates of the robot, the boxes and the storages
+        """
+        boxes = self.boxes.copy()
+        if "box" in moving_coords:
+            boxes[boxes.index(moving_coords["box_prior_coords"])] = moving_coords["box"]
+        return {"robot": moving_coords["robot"], "boxes": boxes, "storages": self.storages}
+    
+    def apply(self, direction):
+        """Moves the robot in the given direction in place, without creating a new state.
+        The movement must be legal (see check_action) and can be reverted with undo.
+        Args:
+            direction (tuple): (Direction to move in, type of movement)
+        """
+        moving_coords = self.get_moving_coords(direction)
+        if "box" in moving_coords:
+            self.move_box(moving_coords["box_prior_coords"], moving_coords["box"])
+        self.move_robot(moving_coords["robot"])
+    
+    def undo(self, direction):
+        """Reverts in place a movement done with apply
+        Args:
+            direction (tuple): (Direction the robot moved in, type of movement)
+        """
+        neighbours = self.board.neighbours
+        robot_cell = self.robot_cell
+        robot_prior_cell = neighbours[OPPOSITE_DIRECTIONS[direction[0]]][robot_cell]
+        if direction[1] == "P":
+            # The box went from the robot cell to the cell in front of it
+            box_cell = neighbours[direction[0]][robot_cell]
+            self.move_box(self.board.coords(box_cell), self.robot)
+        elif direction[1] == "p":
+            # The box went from behind the prior robot cell to the prior robot cell
+            box_prior_cell = neighbours[OPPOSITE_DIRECTIONS[direction[0]]][robot_prior_cell]
+            self.move_box(self.board.coords(robot_prior_cell), self.board.coords(box_prior_cell))
+        self.move_robot(self.board.coords(robot_prior_cell))
+    
+    def move_robot(self, coords):
+        """Moves the robot to the given coordinates"""
+        robot_keys = self.board.robot_keys
+        cell = self.board.cell(coords)
+        self.key ^= robot_keys[self.robot_cell] ^ robot_keys[cell]
+        self.robot = coords
+        self.robot_cell = cell
+    
+    def move_box(self, prior_coords, coords):
+        """Moves the box at prior_coords to coords"""
+        prior_cell = self.board.cell(prior_coords)
+        cell = self.board.cell(coords)
+        self.boxes[self.boxes.index(prior_coords)] = coords
+        self.boxes_mask ^= (1 << prior_cell) | (1 << cell)
+        self.key ^= self.board.box_keys[prior_cell] ^ self.board.box_keys[cell]
+        if self.box_costs is not None:
+            self.heuristic += self.box_costs[cell] - self.box_costs[prior_cell]
+          
+    def get_current_state(self):
+        """Returns the current state of the game
+        Returns:
+            current_state list: coordinates of the robot, the boxes, the storages, and the blanks
+        """
+        robot_coords = self.robot
+        boxes_coords = self.boxes
+        storages_coords = self.storages
+        
+        current_state_list = {"robot":robot_coords, "boxes":boxes_coords, "storages":storages_coords}
+        return current_state_list
+
+    def get_state(self, normalized=False):
+        """Returns the compact, hashable state of the game
+        Args:
+            normalized (bool): Replace the robot coordinates by the smallest cell the robot can walk to,
+                so all the states with the same boxes and the same robot region are equal
+        Returns:
+            state (State): Robot coordinates and sorted tuple of box coordinates
+        """
+        if normalized:
+            return state_from_dict(self.get_normalized_state())
+        return state_from_dict(self.get_current_state())
+    
+    def get_key(self, normalized=False):
+        """Returns the Zobrist key of the state of the game
+        Args:
+            normalized (bool): Key of the normalized state (see get_normalized_state)
+        Returns:
+            key (int): 64-bit key of the state
+        """
+        if normalized:
+            return self.board.zobrist_key(self.get_normalized_state()["robot"], self.boxes)
+        return self.key
+    
+    def get_normalized_state(self):
+        """Returns the current state of the game with the robot moved to the smallest cell it can walk to
+        Returns:
+            current_state (dict): Dictionary with the coordinates of the robot, the boxes and the storages
+        """
+        robot_coords = self.board.coords(min(self.reachable_cells()))
+        return {"robot": robot_coords, "boxes": self.boxes.copy(), "storages": self.storages}
+    
+    def reachable_cells(self):
+        """Returns the cells the robot can walk to without moving any box
+        Returns:
+            cells (list): Cells reachable by the robot, including its own cell
+        """
+        tables = list(self.board.neighbours.values())
+        blocked = self.boxes_mask | (1 << self.robot_cell)
+        cells = [self.robot_cell]
+        for cell in cells:
+            for table in tables:
+                next_cell = table[cell]
+                if next_cell >= 0 and not (blocked >> next_cell) & 1:
+                    blocked |= 1 << next_cell
+                    cells.append(next_cell)
+        return cells
+    
+    def walk_path(self, target_coords):
+        """Finds the shortest walk of the robot to the given coordinates without moving any box
+        Args:
+            target_coords (tuple): Coordinates the robot walks to
+        Returns:
+            moves (list): Walk movements to the target, None if the robot can't reach it
+        """
+        target_cell = self.board.cell(target_coords)
+        # Movement that reached each cell and the cell it came from
+        came_from = {self.robot_cell: None}
+        cells = [self.robot_cell]
+        for cell in cells:
+            if cell == target_cell:
+                break
+            for direction, table in self.board.neighbours.items():
+                next_cell = table[cell]
+                if next_cell >= 0 and next_cell not in came_from and not (self.boxes_mask >> next_cell) & 1:
+                    came_from[next_cell] = (cell, (direction, "-"))
+                    cells.append(next_cell)
+        if target_cell not in came_from:
+            return None
+        moves = []
+        cell = target_cell
+        while came_from[cell] is not None:
+            cell, move = came_from[cell]
+            moves.append(move)
+        moves.reverse()
+        return moves
+    
+    def successors(self, macro=False):
+        """Lazily generates the legal movements and the states they lead to
+            Parameters:
+                macro (bool): Generate macro movements instead (see macro_successors)
+            Returns:
+                successors (generator): Tuples (movement, next state) for every legal movement of the robot
+        """
+        if macro:
+            yield from self.macro_successors()
+            return
+        for move in MOVES:
+            moving_coords = self.get_legal_moving_coords(move)
+            if moving_coords and not (self.prune_deadlocks and self.is_deadlock(moving_coords)):
+                yield move, self.state_from_moving_coords(moving_coords)
+    
+    def successor_keys(self, macro=False):
+        """Generates the legal movements with the Zobrist key and heuristic value (None without box costs)
+        of the states they lead to, without building the states. Both are updated in O(1) from the cells
+        of the robot and of the moved box (in macro mode the robot region is normalized, see macro_successors).
+            Parameters:
+                macro (bool): Generate macro movements instead
+            Returns:
+                successors (generator): Tuples (movement, key, heuristic) for every legal movement of the robot
+        """
+        board = self.board
+        box_costs = self.box_costs
+        if macro:
+            for move, state in self.macro_successors():
+                heuristic = sum(box_costs[board.cell(box)] for box in state["boxes"]) if box_costs is not None else None
+                yield move, board.zobrist_key(state["robot"], state["boxes"]), heuristic
+            return
+        robot_keys = board.robot_keys
+        box_keys = board.box_keys
+        for move in MOVES:
+            moving_coords = self.get_legal_moving_coords(move)
+            if not moving_coords or (self.prune_deadlocks and self.is_deadlock(moving_coords)):
+                continue
+            key = self.key ^ robot_keys[self.robot_cell] ^ robot_keys[board.cell(moving_coords["robot"])]
+            heuristic = self.heuristic
+            if "box" in moving_coords:
+                prior_cell = board.cell(moving_coords["box_prior_coords"])
+                cell = board.cell(moving_coords["box"])
+                key ^= box_keys[prior_cell] ^ box_keys[cell]
+                if box_costs is not None:
+                    heuristic += box_costs[cell] - box_costs[prior_cell]
+            yield move, key, heuristic
+    
+    def successor_states(self, macro=False):
+        """Generates the legal movements with the compact state they lead to and its heuristic value (None
+        without box costs), built from the cells of the robot and of the moved box without playing the movement
+        (in macro mode the states come normalized from macro_successors).
+            Parameters:
+                macro (bool): Generate macro movements instead
+            Returns:
+                successors (generator): Tuples (movement, state, heuristic) for every legal movement of the robot
+        """
+        board = self.board
+        box_costs = self.box_costs
+        if macro:
+            for move, state in self.macro_successors():
+                heuristic = sum(box_costs[board.cell(box)] for box in state["boxes"]) if box_costs is not None else None
+                yield move, state_from_dict(state), heuristic
+            return
+        for move in MOVES:
+            moving_coords = self.get_legal_moving_coords(move)
+            if not moving_coords or (self.prune_deadlocks and self.is_deadlock(moving_coords)):
+                continue
+            boxes = self.boxes
+            heuristic = self.heuristic
+            if "box" in moving_coords:
+                prior_coords = moving_coords["box_prior_coords"]
+                boxes = [moving_coords["box"] if box == prior_coords else box for box in boxes]
+                if box_costs is not None:
+                    heuristic += box_costs[board.cell(moving_coords["box"])] - box_costs[board.cell(prior_coords)]
+            yield move, State(tuple(moving_coords["robot"]), tuple(sorted(tuple(box) for box in boxes))), heuristic
+    
+    def macro_successors(self):
+        """Generates every push and pull of a box the robot can walk to. A macro movement is
+        (robot coordinates before the push or pull, movements), the walk to those coordinates is
+        left out and can be recovered with expand_macro_moves. The movements are the push or pull,
+        followed by the compound movements with compound_macros (see compound_moves). The next
+        states are normalized (see get_normalized_state).
+            Returns:
+                successors (list): Tuples (macro movement, next state) for every push and pull
+        """
+        robot_coords = self.robot
+        rooms = self.board.goal_rooms(self.storages) if self.compound_macros else []
+        committed_mask = self.committed_mask(rooms)
+        successors = []
+        for cell in self.reachable_cells():
+            self.move_robot(self.board.coords(cell))
+            for move in BOX_MOVES:
+                moving_coords = self.get_legal_moving_coords(move)
+                if not moving_coords or (self.prune_deadlocks and self.is_deadlock(moving_coords)):
+                    continue
+                if (committed_mask >> self.board.cell(moving_coords["box_prior_coords"])) & 1:
+                    continue
+                self.apply(move)
+                moves = (move,)
+                if self.compound_macros:
+                    moves += self.compound_moves(move, self.board.cell(moving_coords["box"]), rooms)
+                successors.append(((self.board.coords(cell), moves), self.get_normalized_state()))
+                for step in reversed(moves):
+                    self.undo(step)
+        self.move_robot(robot_coords)
+        return successors
+    
+    def committed_mask(self, rooms):
+        """Returns the bitmask of the boxes on the storages of the goal rooms filled in their fill order so far.
+        Those boxes are never moved again.
+        Args:
+            rooms (list): Goal rooms of the map (see Board.goal_rooms)
+        Returns:
+            committed_mask (int): Bitmask of the committed boxes
+        """
+        committed_mask = 0
+        for entrance, room_mask, fill_order in rooms:
+            room_boxes_mask = self.boxes_mask & room_mask
+            if room_boxes_mask == sum(1 << cell for cell in fill_order[:bin(room_boxes_mask).count("1")]):
+                committed_mask |= room_boxes_mask
+        return committed_mask
+    
+    def compound_moves(self, move, box_cell, rooms):
+        """Plays in place the movements that follow a push or pull in a compound macro movement:
+        - Tunnel: while the box and the robot are in a tunnel along the direction of the movement (see
+          Board.tunnels), the robot can only keep moving the box along it or undo the movement, so the
+          movement is repeated until one of them leaves the tunnel or the box reaches a storage.
+        - Goal room: when the box ends at the entrance or inside a goal room (see Board.goal_rooms) filled
+          in its fill order so far, it is taken to the next storage of the fill order by the shortest path.
+        Args:
+            move (tuple): Push or pull just played
+            box_cell (int): Cell of the moved box
+            rooms (list): Goal rooms of the map
+        Returns:
+            moves (tuple): Movements played after the push or pull
+        """
+        board = self.board
+        tunnel_mask = board.tunnels[move[0]]
+        moves = []
+        while ((tunnel_mask >> box_cell) & 1 and (tunnel_mask >> self.robot_cell) & 1
+               and not (self.storages_mask >> box_cell) & 1):
+            moving_coords = self.get_legal_moving_coords(move)
+            if not moving_coords or (self.prune_deadlocks and self.is_deadlock(moving_coords)):
+                break
+            self.apply(move)
+            moves.append(move)
+            box_cell = board.cell(moving_coords["box"])
+        
+        for entrance, room_mask, fill_order in rooms:
+            if box_cell != entrance and not (room_mask >> box_cell) & 1:
+                continue
+            room_boxes_mask = self.boxes_mask & room_mask & ~(1 << box_cell)
+            filled = bin(room_boxes_mask).count("1")
+            if (filled < len(fill_order) and box_cell != fill_order[filled]
+                    and room_boxes_mask == sum(1 << cell for cell in fill_order[:filled])):
+                path = self.box_path(box_cell, fill_order[filled], room_mask | (1 << entrance))
+                for step in path or []:
+                    self.apply(step)
+                    moves.append(step)
+            break
+        return tuple(moves)
+    
+    def box_path(self, box_cell, target_cell, area_mask):
+        """Finds the shortest sequence of movements that takes a box to a cell without moving the other boxes
+        Args:
+            box_cell (int): Cell of the box
+            target_cell (int): Cell the box is taken to
+            area_mask (int): Bitmask of the cells the box can go through
+        Returns:
+            moves (list): Walk, push and pull movements, None if the box can't be taken to the cell
+        """
+        neighbours = self.board.neighbours
+        others_mask = self.boxes_mask & ~(1 << box_cell)
+        start = (self.robot_cell, box_cell)
+        # Movement that reached each pair of robot and box cells and the pair it came from
+        came_from = {start: None}
+        pairs = [start]
+        for pair in pairs:
+            robot_cell, box_cell = pair
+            if box_cell == target_cell:
+                break
+            for direction, movement in MOVES:
+                next_cell = neighbours[direction][robot_cell]
+                if next_cell < 0 or (others_mask >> next_cell) & 1:
+                    continue
+                if movement == "-":
+                    next_pair = (next_cell, box_cell) if next_cell != box_cell else None
+                elif movement == "P":
+                    beyond = neighbours[direction][next_cell]
+                    next_pair = (next_cell, beyond) if (next_cell == box_cell and beyond >= 0
+                        and (area_mask >> beyond) & 1 and not (others_mask >> beyond) & 1) else None
+                else:
+                    behind = neighbours[OPPOSITE_DIRECTIONS[direction]][robot_cell]
+                    next_pair = (next_cell, robot_cell) if (behind == box_cell and next_cell != box_cell
+                        and (area_mask >> robot_cell) & 1) else None
+                if next_pair is not None and next_pair not in came_from:
+                    came_from[next_pair] = (pair, (direction, movement))
+                    pairs.append(next_pair)
+        else:
+            return None
+        moves = []
+        while came_from[pair] is not None:
+            pair, move = came_from[pair]
+            moves.append(move)
+        moves.reverse()
+        return moves
+    
+    def expand_macro_moves(self, macro_moves):
+        """Plays the macro movements in place and returns the single movements they are made of
+        Args:
+            macro_moves (list): Macro movements (see macro_successors)
+        Returns:
+            moves (list): Walk, push and pull movements from the current state
+        """
+        moves = []
+        for robot_coords, macro_steps in macro_moves:
+            for step in self.walk_path(robot_coords) + list(macro_steps):
+                self.apply(step)
+                moves.append(step)
+        return moves
+    
+    def successor_function(self):
+        """Generates all possible states from the current state
+            Parameters:
+                None
+            Returns:
+                next_states (list): List of possible movements of the robot
+        """
+        return [state for move, state in self.successors()]
@@ -1,18 +1,26 @@
 # Description: This script is used to check the length of the solutions found by the different search algorithms.
-    
-import json
-
-tiny_map_breadth_first = json.load(open('solutions/solution_tiny_map_breadth_first.json'))
-print(f"Tiny map, Breadth first search, solution length: {len(tiny_map_breadth_first[1])}")
+# The compact solution files (.sol, see solution_format.py) are summarized without loading their moves at once.
+# The legacy JSON files, which store every state of the path, are read when there is no compact file.
 
-tiny_map_depth_first = json.load(open('solutions/solution_tiny_map_depth_first.json'))
-print(f"Tiny map, Depth first search, solution length: {len(tiny_map_depth_first[1])}")
-
-tiny_map_greedy = json.load(open('solutions/solution_tiny_map_greedy.json'))
-print(f"Tiny map, Greedy search, solution length: {len(tiny_map_greedy[1])}")
+import json
+import os
 
-tiny_map_a_star = json.load(open('solutions/solution_tiny_map_a_star.json'))
-print(f"Tiny map, A* search, solution length: {len(tiny_map_a_star[1])}")
+from solution_format import solution_summary
 
-large_map_greedy = json.load(open('solutions/solution_large_map_greedy.json'))
-print(f"Large map, Greedy search, solution length: {len(large_map_greedy[1])}")
\ No newline at end of file
+for map_size in ["tiny", "medium", "large"]:
+    for name in ["breadth_first", "depth_first", "greedy", "a_star", "ida_star", "bidirectional", "anytime_a_star"]:
+        title = f"{map_size.title()} map, {name.replace('_', ' ').title()} search"
+        filename = f"solutions/solution_{map_size}_map_{name}"
+        if os.path.exists(filename + ".sol"):
+            summary = solution_summary(filename + ".sol")
+            if "reason" not in summary:
+                print(f"{title}, solution length: {summary['length']} moves ({summary['pushes']} pushes, {summary['pulls']} pulls)")
+            else:
+                print(f"{title}, no solution: {summary['reason']}")
+        elif os.path.exists(filename + ".json"):
+            solution = json.load(open(filename + ".json"))
+            if isinstance(solution, list):
+                # The ids of the path include the initial state
+                print(f"{title}, solution length: {len(solution[1]) - 1} moves")
+            else:
+                print(f"{title}, no solution: {solution['reason']}")
\ No newline at end of file
@@ -0,0 +1,203 @@
+# Heuristic functions for the informed searching algorithms
+from collections import deque
+from functools import lru_cache
+
+from game import DIRECTION_OFFSETS, OPPOSITE_DIRECTIONS
+
+# Distance of a box that cannot reach a storage. It is finite so it can be added and matched.
+UNREACHABLE = 1000
+
+# 1. Manhatan distance function
+def manhattan_distance(point_a, point_b):
+    """Manhattan Distance algorithm
+        Parameters:
+            point_a (tuple): Coordinates of the first point
+            point_b (tuple): Coordinates of the second point
+        Returns:
+            distance (float): Manhattan distance between the two points
+    """
+    distance = abs(point_a[0] - point_b[0]) + abs(point_a[1] - point_b[1])
+    return distance
+
+# 2. Sum of distances from state function
+def sum_distances_from_state(state):
+    """Computes the sum of the manhattan distances between the boxes and the storages
+        Parameters:
+            state (dict): Dictionary with the coordinates of the robot, the boxes and the storages
+        Returns:
+            sum_distance (float): Sum of the manhattan distances between the boxes and the storages
+    """
+    boxes = state["boxes"]
+    storages = state["storages"]
+    sum_distance = 0
+
+    for box in boxes:
+        min_distance = 1000
+        for storage in storages:
+            distance = manhattan_distance(box, storage)
+            if distance < min_distance:
+                min_distance = distance
+        sum_distance = sum_distance + min_distance
+    return sum_distance
+
+# 3. Box distances to the storages
+@lru_cache(maxsize=None)
+def box_distances(board, storages):
+    """Computes the number of box moves from every cell to every storage, respecting the walls.
+    A box moves from a cell to its neighbour in a direction when the neighbour is a blank and the
+    robot has room to push it (blank behind the box) or to pull it (blank after the neighbour).
+    Other boxes and the position of the robot are ignored, so the distances are a lower bound.
+    The table is computed once per board and storages.
+        Parameters:
+            board (Board): Compiled board of the map
+            storages (tuple): Coordinates of the storages
+        Returns:
+            distances (list): For each cell, a tuple with the distance to each storage (UNREACHABLE if the box can't reach it)
+    """
+    neighbours = board.neighbours
+    columns = []
+    for storage in storages:
+        distance = [UNREACHABLE] * board.size
+        target = board.cell(storage)
+        distance[target] = 0
+        queue = deque([target])
+        # Backwards breadth first search: which cells can move a box into the current cell
+        while queue:
+            cell = queue.popleft()
+            for direction in DIRECTION_OFFSETS:
+                opposite = OPPOSITE_DIRECTIONS[direction]
+                prior_cell = neighbours[opposite][cell]
+                if prior_cell < 0 or distance[prior_cell] != UNREACHABLE:
+                    continue
+                can_push = neighbours[opposite][prior_cell] >= 0
+                can_pull = neighbours[direction][cell] >= 0
+                if can_push or can_pull:
+                    distance[prior_cell] = distance[cell] + 1
+                    queue.append(prior_cell)
+        columns.append(distance)
+    return [tuple(column[cell] for column in columns) for cell in range(board.size)]
+
+# 4. Nearest storage heuristic
+def sum_box_distances(boxes_cells, distances):
+    """Computes the sum of the box distances between each box and its nearest storage
+        Parameters:
+            boxes_cells (list): Cells of the boxes
+            distances (list): Box distances table (see box_distances)
+        Returns:
+            sum_distance (int): Sum of the distances to the nearest storages
+    """
+    return sum(min(distances[cell]) for cell in boxes_cells)
+
+# 5. Minimum cost matching heuristic
+def min_matching_distance(boxes_cells, distances):
+    """Computes the minimum sum of box distances when every box goes to a different storage,
+    with the Hungarian algorithm. It is O(boxes^2 * storages) and never overestimates.
+        Parameters:
+            boxes_cells (list): Cells of the boxes
+            distances (list): Box distances table (see box_distances)
+        Returns:
+            cost (int): Cost of the minimum matching between the boxes and the storages
+    """
+    rows = [distances[cell] for cell in boxes_cells]
+    n = len(rows)
+    m = len(rows[0]) if rows else 0
+    if n > m:
+        # Some box can't get a storage of its own
+        return UNREACHABLE * (n - m) + sum_box_distances(boxes_cells, distances)
+
+    # Potentials of the rows (u) and columns (v), and row matched to each column (1-indexed, 0 is free)
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    match = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for row in range(1, n + 1):
+        match[0] = row
+        column = 0
+        min_values = [float("inf")] * (m + 1)
+        used = [False] * (m + 1)
+        while match[column] != 0:
+            used[column] = True
+            current_row = match[column]
+            delta = float("inf")
+            next_column = 0
+            costs = rows[current_row - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = costs[j - 1] - u[current_row] - v[j]
+                    if reduced < min_values[j]:
+                        min_values[j] = reduced
+                        way[j] = column
+                    if min_values[j] < delta:
+                        delta = min_values[j]
+                        next_column = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_values[j] -= delta
+            column = next_column
+        # Augment along the alternating path
+        while column:
+            previous_column = way[column]
+            match[column] = match[previous_column]
+            column = previous_column
+    return sum(rows[match[j] - 1][j - 1] for j in range(1, m + 1) if match[j])
+
+HEURISTICS = ["manhattan", "distance", "matching"]
+
+# 6. Box costs of the heuristics
+def make_box_costs(kind, game):
+    """Computes the cost of a box in each cell for the heuristics that add an independent cost per box, so
+    the heuristic value can be updated in O(1) when a box moves (see Game.move_box)
+        Parameters:
+            kind (str): Type of heuristic (see make_heuristic)
+            game (Game): Game of the map
+        Returns:
+            box_costs (list): Cost of a box in each cell, None for the "matching" heuristic
+    """
+    if kind not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic '{kind}', expected one of {HEURISTICS}")
+    board = game.board
+    if kind == "manhattan":
+        return [min([manhattan_distance(board.coords(cell), storage) for storage in game.storages] + [1000]) for cell in range(board.size)]
+    if kind == "distance":
+        distances = box_distances(board, tuple(tuple(storage) for storage in game.storages))
+        return [min(row) for row in distances]
+    return None
+
+# 7. Heuristic factory
+def make_heuristic(kind, game):
+    """Creates the heuristic function of a map. The tables it needs are computed here, once per map.
+        Parameters:
+            kind (str): Type of heuristic: "manhattan" (nearest storage, manhattan distance),
+                "distance" (nearest storage, box distance) or "matching" (minimum matching, box distance)
+            game (Game): Game of the map
+        Returns:
+            heuristic (function): Function from a state dictionary to its estimated cost
+    """
+    if kind not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic '{kind}', expected one of {HEURISTICS}")
+    if kind == "manhattan":
+        return sum_distances_from_state
+
+    board = game.board
+    distances = box_distances(board, tuple(tuple(storage) for storage in game.storages))
+    estimate = sum_box_distances if kind == "distance" else min_matching_distance
+
+    def heuristic(state):
+        return estimate([board.cell(box) for box in state["boxes"]], distances)
+    return heuristic
+
+# 8. Maximum of heuristics
+def max_heuristic(heuristics):
+    """Combines heuristic functions by taking the maximum of their estimates, which never overestimates
+    when none of them does
+        Parameters:
+            heuristics (list): Heuristic functions of a state dictionary
+        Returns:
+            heuristic (function): Function from a state dictionary to the highest estimate
+    """
+    def heuristic(state):
+        return max(estimate(state) for estimate in heuristics)
+    return heuristic
@@ -0,0 +1,206 @@
+# Instrumentation of the searching algorithms
+import json
+from time import perf_counter
+
+# Seconds between two progress reports of a search
+REPORT_INTERVAL = 1.0
+
+class SearchStats:
+    """Counters of a search: nodes expanded, generated and dropped as duplicates, sizes of the open and
+    closed lists, f(n) of the last expanded node, lowest h(n) expanded, maximum depth, and time spent
+    building the successors, computing the heuristic and in the rest of the search (bookkeeping).
+    Every interval seconds the counters are passed to the callback and written as a JSON line to the
+    trace file, and once more when the search finishes.
+        Parameters:
+            callback (function): Function called with a snapshot of the counters (see snapshot), None for no callback
+            trace_file (str): File where a JSON line is appended per report, None for no trace
+            interval (float): Seconds between two progress reports
+    """
+    def __init__(self, callback=None, trace_file=None, interval=REPORT_INTERVAL):
+        self.callback = callback
+        self.trace_file = trace_file
+        self.interval = interval
+        self.trace = None
+        self.start("search")
+
+    def start(self, algorithm):
+        """Resets the counters at the start of a search
+            Parameters:
+                algorithm (str): Name of the search algorithm, added to the reports
+        """
+        self.algorithm = algorithm
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.frontier_size = 0
+        self.closed_size = 0
+        self.f = None # f(n) of the last expanded node
+        self.best_h = None # Lowest h(n) of the expanded nodes
+        self.max_depth = 0
+        self.successor_time = 0.0
+        self.heuristic_time = 0.0
+        self.start_time = perf_counter()
+        self.next_report = self.start_time + self.interval
+        if self.trace_file is not None and self.trace is None:
+            self.trace = open(self.trace_file, "a")
+
+    def expand(self, depth, frontier_size, closed_size, f=None, h=None, count=1):
+        """Counts the expansion of a node (or of a batch of nodes), and reports the counters when the interval is over
+            Parameters:
+                depth (int): Depth of the node (number of movements, box movements in macro mode)
+                frontier_size (int): Number of nodes in the open list
+                closed_size (int): Number of nodes in the closed list
+                f (float): f(n) of the node, None for the uninformed searches
+                h (float): h(n) of the node, None for the uninformed searches
+                count (int): Number of nodes expanded at once
+        """
+        self.expanded += count
+        self.frontier_size = frontier_size
+        self.closed_size = closed_size
+        if depth > self.max_depth:
+            self.max_depth = depth
+        if f is not None:
+            self.f = f
+        if h is not None and (self.best_h is None or h < self.best_h):
+            self.best_h = h
+        self.tick()
+
+    def duplicate(self, count=1):
+        """Counts the nodes dropped because their state was already visited"""
+        self.duplicates += count
+
+    def tick(self):
+        """Reports the counters when the interval since the last report is over"""
+        if perf_counter() >= self.next_report:
+            self.report()
+
+    def successors(self, successors):
+        """Counts the nodes generated by a successor generator and the time spent in it
+            Parameters:
+                successors (iterable): Successors of a node
+            Returns:
+                successors (generator): The same successors
+        """
+        successors = iter(successors)
+        while True:
+            start = perf_counter()
+            heuristic_time = self.heuristic_time
+            try:
+                successor = next(successors)
+            except StopIteration:
+                # The heuristic computed while generating the successors is counted apart
+                self.successor_time += perf_counter() - start - (self.heuristic_time - heuristic_time)
+                return
+            self.successor_time += perf_counter() - start - (self.heuristic_time - heuristic_time)
+            self.generated += 1
+            yield successor
+
+    def generate(self, count, seconds):
+        """Counts the nodes generated at once by a batch expansion and the time it took"""
+        self.generated += count
+        self.successor_time += seconds
+
+    def heuristic(self, estimate):
+        """Wraps a heuristic function to count the time spent in it
+            Parameters:
+                estimate (function): Heuristic function (see make_heuristic)
+            Returns:
+                estimate (function): The same function, timed
+        """
+        def timed_estimate(state):
+            start = perf_counter()
+            distance = estimate(state)
+            self.heuristic_time += perf_counter() - start
+            return distance
+        return timed_estimate
+
+    def combine(self, snapshots):
+        """Sets the counters to the sum of the counters of other searches, e.g. the workers of a parallel
+        search. The times are added over the searches, f(n) and h(n) are the lowest ones.
+            Parameters:
+                snapshots (list): Counters of the other searches (see snapshot)
+        """
+        self.expanded = sum(snapshot["expanded"] for snapshot in snapshots)
+        self.generated = sum(snapshot["generated"] for snapshot in snapshots)
+        self.duplicates = sum(snapshot["duplicates"] for snapshot in snapshots)
+        self.frontier_size = sum(snapshot["frontier_size"] for snapshot in snapshots)
+        self.closed_size = sum(snapshot["closed_size"] for snapshot in snapshots)
+        self.max_depth = max([snapshot["max_depth"] for snapshot in snapshots] + [0])
+        self.f = min([snapshot["f"] for snapshot in snapshots if snapshot["f"] is not None], default=None)
+        self.best_h = min([snapshot["best_h"] for snapshot in snapshots if snapshot["best_h"] is not None], default=None)
+        self.successor_time = sum(snapshot["successor_time"] for snapshot in snapshots)
+        self.heuristic_time = sum(snapshot["heuristic_time"] for snapshot in snapshots)
+
+    def restore(self, snapshot):
+        """Sets the counters to the ones of a previous run of the same search, when it resumes from a checkpoint.
+        The elapsed time of the snapshot is counted as already spent.
+            Parameters:
+                snapshot (dict): Counters of the previous run (see snapshot)
+        """
+        self.expanded = snapshot["expanded"]
+        self.generated = snapshot["generated"]
+        self.duplicates = snapshot["duplicates"]
+        self.frontier_size = snapshot["frontier_size"]
+        self.closed_size = snapshot["closed_size"]
+        self.f = snapshot["f"]
+        self.best_h = snapshot["best_h"]
+        self.max_depth = snapshot["max_depth"]
+        self.successor_time = snapshot["successor_time"]
+        self.heuristic_time = snapshot["heuristic_time"]
+        self.start_time = perf_counter() - snapshot["elapsed"]
+
+    def snapshot(self):
+        """Returns the current counters
+            Returns:
+                snapshot (dict): Counters of the search, times in seconds
+        """
+        elapsed = perf_counter() - self.start_time
+        return {
+            "algorithm": self.algorithm,
+            "elapsed": elapsed,
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "frontier_size": self.frontier_size,
+            "closed_size": self.closed_size,
+            "f": self.f,
+            "best_h": self.best_h,
+            "max_depth": self.max_depth,
+            "branching_factor": self.generated / self.expanded if self.expanded else 0.0,
+            "successor_time": self.successor_time,
+            "heuristic_time": self.heuristic_time,
+            "bookkeeping_time": max(0.0, elapsed - self.successor_time - self.heuristic_time)
+        }
+
+    def report(self, event="progress", reason=None):
+        """Passes the counters to the callback and writes them to the trace file
+            Parameters:
+                event (str): "progress" for the periodic reports, "finish" for the last one
+                reason (str): How the search ended, for the last report
+            Returns:
+                snapshot (dict): Counters of the search (see snapshot)
+        """
+        snapshot = self.snapshot()
+        record = dict(snapshot, event=event)
+        if reason is not None:
+            record["reason"] = reason
+        if self.callback is not None:
+            self.callback(record)
+        if self.trace is not None:
+            self.trace.write(json.dumps(record) + "\n")
+            self.trace.flush()
+        self.next_report = perf_counter() + self.interval
+        return snapshot
+
+    def finish(self, reason):
+        """Makes the last report of a search and closes the trace file
+            Parameters:
+                reason (str): "Solution found", "No solution found" or "Time exceeded"
+            Returns:
+                snapshot (dict): Final counters of the search (see snapshot)
+        """
+        snapshot = self.report("finish", reason)
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+        return snapshot
@@ -1,44 +1,207 @@
 import os
-import json
+import multiprocessing
+import queue
+from functools import partial
+from time import time
 
+from checkpoint import Checkpoint
 from game import Game, map2objects
 from search import (
     breadth_first_search,
     depth_first_search,
     greedy_best_search,
     a_star_search,
-    get_solution_path
+    ida_star_search,
+    bidirectional_search,
+    anytime_a_star_search
 )
+from solution_cache import SolutionCache
+from solution_format import SolutionWriter
 
-def run_search_algorithms(game, blanks, max_time, map_size):
+# Search algorithms run for every map, by name
+ALGORITHMS = {
+    'greedy': greedy_best_search,
+    'a_star': a_star_search,
+    'breadth_first': breadth_first_search,
+    'depth_first': depth_first_search,
+    'ida_star': ida_star_search,
+    'bidirectional': bidirectional_search,
+    'anytime_a_star': anytime_a_star_search
+}
+
+# Heuristic variants, only run in the parallel portfolio
+VARIANTS = {
+    'greedy_matching': partial(greedy_best_search, heuristic="matching"),
+    'a_star_matching': partial(a_star_search, heuristic="matching"),
+    'ida_star_matching': partial(ida_star_search, heuristic="matching"),
+    'anytime_a_star_matching': partial(anytime_a_star_search, heuristic="matching")
+}
+
+# Algorithms that return solutions with the minimum number of movements. The anytime searches tell in
+# their output whether they proved their solution optimal.
+OPTIMAL_ALGORITHMS = {'a_star', 'breadth_first', 'ida_star', 'bidirectional', 'a_star_matching', 'ida_star_matching'}
+
+# Seconds the workers are given after the deadline to return their results before they are stopped
+DEADLINE_GRACE = 5
+
+# Directory of the checkpoints of the searches, resumed when the solver is run again
+CHECKPOINT_DIRECTORY = 'checkpoints'
+
+def save_solution(result, game, map_size, name):
+    """
+    Saves the solution of a search result to solutions/solution_<map_size>_map_<name>.sol, in the compact
+    format of solution_format.py: the map and the initial state, the moves, and the time of the search
+    (and the reason when there is no solution).
+
+    Args:
+        result (dict): Output of the search algorithm.
+        game (Game): The game instance, in the initial state of the search.
+        map_size (str): Size of the map ('tiny', 'medium', 'large').
+        name (str): Name of the algorithm.
+    """
+    filename = f'solutions/solution_{map_size}_map_{name}.sol'
+    footer = {key: result[key] for key in ("time", "reason") if key in result}
+    with SolutionWriter(filename, game, name) as writer:
+        writer.write(result.get("moves", ""))
+        writer.close(**footer)
+    print(f"Solution saved to {filename}\n")
+
+def search_checkpoint(map_size, name, checkpoints):
+    """
+    Returns the checkpoint files of an algorithm on a map.
+
+    Args:
+        map_size (str): Size of the map ('tiny', 'medium', 'large').
+        name (str): Name of the algorithm.
+        checkpoints (str): Directory of the checkpoints, None for no checkpoints.
+    Returns:
+        checkpoint (Checkpoint): Checkpoint files <checkpoints>/<map_size>_<name>.ckpt, None for no checkpoints.
+    """
+    if checkpoints is None:
+        return None
+    return Checkpoint(os.path.join(checkpoints, f'{map_size}_{name}.ckpt'))
+
+def run_search_algorithms(game, blanks, max_time, map_size, parallel=False, workers=None, stop_on=None, cache=None, checkpoints=None):
     """
     Runs various search algorithms on the provided game and saves the solutions.
 
     Args:
         game (Game): The game instance.
         blanks (list): List of blank objects in the game.
-        max_time (int): Maximum time to run the algorithm (in minutes).
+        max_time (int): Maximum time to run the algorithm (in minutes). In parallel it is one budget shared by all the algorithms.
+        map_size (str): Size of the map ('tiny', 'medium', 'large').
+        parallel (bool): Run the algorithms and the heuristic variants as a portfolio in a process pool.
+        workers (int): Number of worker processes in parallel (one per algorithm, up to the number of CPUs, by default).
+        stop_on (str): In parallel, cancel the other algorithms once a solution is found ('any') or
+            an optimal solution is found ('optimal'). None runs all of them.
+        cache (SolutionCache): Cache of the solutions. The algorithms with a cached solution for the map are
+            not run, and the new solutions are added to it. None runs every algorithm.
+        checkpoints (str): Directory where the searches save checkpoints, and resume from the ones of a previous
+            run that was stopped (see Checkpoint). The time a search already spent is charged to max_time, so
+            it resumes with the rest of its budget, and a search with no time left stops at once. None for no
+            checkpoints.
+    """
+    if parallel:
+        run_portfolio(game, blanks, max_time, map_size, {**ALGORITHMS, **VARIANTS}, workers, stop_on, cache, checkpoints)
+        return
+
+    for name, algorithm in ALGORITHMS.items():
+        result = cache.get(game, name) if cache else None
+        if result is not None:
+            print(f"Cached solution of {name.replace('_', ' ').title()} for {map_size} map")
+        else:
+            print(f"Running {name.replace('_', ' ').title()} for {map_size} map...")
+            result = algorithm(game, blanks, max_time, checkpoint=search_checkpoint(map_size, name, checkpoints))
+            if cache:
+                cache.put(game, result, name, {"max_time": max_time})
+        save_solution(result, game, map_size, name)
+
+def run_algorithm(algorithm, game, blanks, deadline, checkpoint=None):
+    """
+    Runs a search algorithm in a worker process with the time left until the deadline.
+
+    Args:
+        algorithm (function): Search algorithm.
+        game (Game): The game instance.
+        blanks (list): List of blank objects in the game.
+        deadline (float): Time (as returned by time.time) at which the budget runs out.
+        checkpoint (Checkpoint): Checkpoint files of the search, None for no checkpoints.
+    Returns:
+        result (dict): Output of the search algorithm.
+    """
+    return algorithm(game, blanks, max(deadline - time(), 0) / 60, checkpoint=checkpoint)
+
+def run_portfolio(game, blanks, max_time, map_size, algorithms, workers=None, stop_on=None, cache=None, checkpoints=None):
+    """
+    Runs the search algorithms in a process pool with one shared wall-clock budget and saves the solutions.
+    The algorithms still running when the budget runs out, or when the stop_on condition is met, are stopped
+    and saved with the reason "Time exceeded" or "Cancelled".
+
+    Args:
+        game (Game): The game instance.
+        blanks (list): List of blank objects in the game.
+        max_time (int): Maximum time to run all the algorithms (in minutes).
         map_size (str): Size of the map ('tiny', 'medium', 'large').
+        algorithms (dict): Search algorithms by name.
+        workers (int): Number of worker processes.
+        stop_on (str): Cancel the other algorithms once a solution ('any') or an optimal solution ('optimal') is found.
+        cache (SolutionCache): Cache of the solutions, looked up before running the algorithms and updated with
+            the new solutions.
+        checkpoints (str): Directory of the checkpoints of the searches, None for no checkpoints. The searches
+            stopped at the deadline keep their last periodic checkpoint.
     """
-    algorithms = {
-        'greedy': greedy_best_search,
-        'a_star': a_star_search,
-        'breadth_first': breadth_first_search,
-        'depth_first': depth_first_search
-    }
-
-    for name, algorithm in algorithms.items():
-        print(f"Running {name.replace('_', ' ').title()} for {map_size} map...")
-        result = algorithm(game, blanks, max_time)
-        solution = get_solution_path(result)
-        filename = f'solutions/solution_{map_size}_map_{name}.json'
-        with open(filename, 'w') as outfile:
-            json.dump(solution, outfile)
-        print(f"Solution saved to {filename}\n")
+    if stop_on not in (None, 'any', 'optimal'):
+        raise ValueError(f"Unknown stop condition '{stop_on}', expected None, 'any' or 'optimal'")
+    start = time()
+    if cache:
+        cached = {name: cache.get(game, name) for name in algorithms}
+        for name, result in cached.items():
+            if result is not None:
+                print(f"Cached solution of {name.replace('_', ' ').title()} for {map_size} map")
+                save_solution(result, game, map_size, name)
+        algorithms = {name: algorithm for name, algorithm in algorithms.items() if cached[name] is None}
+        if not algorithms or stop_on and any(
+                result is not None and (stop_on == 'any' or name in OPTIMAL_ALGORITHMS) for name, result in cached.items()):
+            return
+    deadline = start + max_time * 60
+    workers = workers or min(len(algorithms), os.cpu_count() or 1)
+    print(f"Running {len(algorithms)} algorithms in {workers} processes for {map_size} map...")
+
+    finished = queue.Queue()
+    reason = "Time exceeded"
+    with multiprocessing.Pool(workers) as pool:
+        for name, algorithm in algorithms.items():
+            pool.apply_async(
+                run_algorithm, (algorithm, game, blanks, deadline, search_checkpoint(map_size, name, checkpoints)),
+                callback=lambda result, name=name: finished.put((name, result)),
+                error_callback=lambda error, name=name: finished.put((name, {"time": (time() - start) / 60, "reason": f"Error: {error}"}))
+            )
+
+        pending = set(algorithms)
+        while pending:
+            try:
+                name, result = finished.get(timeout=max(deadline - time(), 0) + DEADLINE_GRACE)
+            except queue.Empty:
+                break
+            pending.discard(name)
+            save_solution(result, game, map_size, name)
+            if cache:
+                cache.put(game, result, name, {"max_time": max_time})
+            solved = "states" in result
+            optimal = name in OPTIMAL_ALGORITHMS or result.get("optimal", False)
+            if solved and (stop_on == 'any' or (stop_on == 'optimal' and optimal)):
+                print(f"{name.replace('_', ' ').title()} found a solution, cancelling the other algorithms")
+                reason = "Cancelled"
+                break
+        # Leaving the pool terminates the workers that are still running
+
+    for name in pending:
+        save_solution({"time": (time() - start) / 60, "reason": reason}, game, map_size, name)
 
 def main():
-    # Create solutions directory if it doesn't exist
+    # Create solutions and checkpoints directories if they don't exist
     os.makedirs('solutions', exist_ok=True)
+    os.makedirs(CHECKPOINT_DIRECTORY, exist_ok=True)
 
     # Define maps
     tiny_map = """OOOOOO
@@ -70,29 +233,35 @@ OOOOOOOOO"""
     objects_tiny_map = map2objects(tiny_map)
     state_tiny_map = objects_tiny_map["state"]
     blanks_tiny_map = objects_tiny_map["blanks"]
+    board_tiny_map = objects_tiny_map["board"]
 
     objects_medium_map = map2objects(medium_map)
     state_medium_map = objects_medium_map["state"]
     blanks_medium_map = objects_medium_map["blanks"]
+    board_medium_map = objects_medium_map["board"]
 
     objects_large_map = map2objects(large_map)
     state_large_map = objects_large_map["state"]
     blanks_large_map = objects_large_map["blanks"]
+    board_large_map = objects_large_map["board"]
 
     # Initialize games with parsed states and blanks
-    game_tiny_map = Game(state_tiny_map, blanks_tiny_map)
+    game_tiny_map = Game(state_tiny_map, blanks_tiny_map, board_tiny_map)
     max_time_tiny_map = 5  # in minutes
 
-    game_medium_map = Game(state_medium_map, blanks_medium_map)
+    game_medium_map = Game(state_medium_map, blanks_medium_map, board_medium_map)
     max_time_medium_map = 5 * 60  # in minutes
 
-    game_large_map = Game(state_large_map, blanks_large_map)
+    game_large_map = Game(state_large_map, blanks_large_map, board_large_map)
     max_time_large_map = 4 * 60  # in minutes
 
-    # Run search algorithms for each map size
-    run_search_algorithms(game_tiny_map, blanks_tiny_map, max_time_tiny_map, 'tiny')
-    run_search_algorithms(game_medium_map, blanks_medium_map, max_time_medium_map, 'medium')
-    run_search_algorithms(game_large_map, blanks_large_map, max_time_large_map, 'large')
+    # Run search algorithms for each map size, as a parallel portfolio sharing the time budget of the map.
+    # The solutions found in previous runs are taken from the cache, and the searches stopped in previous runs
+    # resume from their checkpoints.
+    cache = SolutionCache()
+    run_search_algorithms(game_tiny_map, blanks_tiny_map, max_time_tiny_map, 'tiny', parallel=True, cache=cache, checkpoints=CHECKPOINT_DIRECTORY)
+    run_search_algorithms(game_medium_map, blanks_medium_map, max_time_medium_map, 'medium', parallel=True, cache=cache, checkpoints=CHECKPOINT_DIRECTORY)
+    run_search_algorithms(game_large_map, blanks_large_map, max_time_large_map, 'large', parallel=True, cache=cache, checkpoints=CHECKPOINT_DIRECTORY)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
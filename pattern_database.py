@@ -0,0 +1,152 @@
+# Pattern database heuristic, built once per map and memory-mapped from disk
+import hashlib
+import mmap
+import os
+from collections import deque
+from itertools import combinations
+from math import comb
+
+from game import Game, state_from_dict, state_to_dict
+from heuristics import UNREACHABLE
+
+# Directory of the pattern database files
+PATTERN_DIRECTORY = "patterns"
+
+# Value of the abstract states from which the boxes can't reach the storages (the costs are stored in one byte)
+UNSOLVED = 255
+
+def map_hash(game):
+    """Computes a hash of the static part of a map, the key of its pattern database files
+        Parameters:
+            game (Game): Game of the map
+        Returns:
+            key (str): Hexadecimal digest of the blanks and the storages
+    """
+    blanks = sorted(tuple(blank) for blank in game.blanks)
+    storages = sorted(tuple(storage) for storage in game.storages)
+    return hashlib.sha1(repr((blanks, storages)).encode()).hexdigest()[:16]
+
+def pattern_path(game, size, directory=PATTERN_DIRECTORY):
+    """Returns the path of the pattern database file of a map for patterns of the given number of boxes"""
+    return os.path.join(directory, f"pdb_{map_hash(game)}_{size}.bin")
+
+class PatternIndex:
+    """Indexes the abstract states of a pattern: a set of boxes, ranked in the combinatorial number system
+    over the blank cells, and the cell of the robot.
+        Parameters:
+            board (Board): Compiled board of the map
+            size (int): Number of boxes of the pattern
+    """
+    def __init__(self, board, size):
+        self.size = size
+        blank_cells = [cell for cell in range(board.size) if board.is_blank(cell)]
+        self.blanks = len(blank_cells)
+        self.blank_index = [-1] * board.size
+        for index, cell in enumerate(blank_cells):
+            self.blank_index[cell] = index
+        self.length = comb(self.blanks, size) * self.blanks
+
+    def index(self, boxes_cells, robot_cell):
+        """Returns the position of an abstract state in the table
+            Parameters:
+                boxes_cells (list): Cells of the boxes of the pattern
+                robot_cell (int): Cell of the robot
+        """
+        rank = 0
+        for position, box_index in enumerate(sorted(self.blank_index[cell] for cell in boxes_cells)):
+            rank += comb(box_index, position + 1)
+        return rank * self.blanks + self.blank_index[robot_cell]
+
+def build_pattern_database(game, size, directory=PATTERN_DIRECTORY):
+    """Builds the pattern database of a map for patterns of size boxes, unless its file already exists.
+    A pattern is an abstraction of the map with only size boxes: a backward breadth first search over
+    box configurations from every goal of the pattern (the boxes on any of the storages) finds the exact
+    number of box movements to solve each pattern. Every movement can be undone, so the successors of an
+    abstract state are also its predecessors. The cost is stored for every cell of the robot region.
+    The file is written to a temporary name and renamed, so concurrent builders never share a partial file.
+        Parameters:
+            game (Game): Game of the map
+            size (int): Number of boxes of a pattern
+            directory (str): Directory of the pattern database files
+        Returns:
+            path (str): Path of the pattern database file
+    """
+    path = pattern_path(game, size, directory)
+    if os.path.exists(path):
+        return path
+    board = game.board
+    storages = game.storages
+    index = PatternIndex(board, size)
+    table = bytearray([UNSOLVED]) * index.length
+
+    # Goal states of the pattern, with the robot in each of its regions
+    visited = set()
+    queue = deque()
+    blank_cells = [cell for cell in range(board.size) if board.is_blank(cell)]
+    for boxes in combinations(sorted(tuple(storage) for storage in storages), size):
+        boxes_mask = board.mask(boxes)
+        for cell in blank_cells:
+            if not (boxes_mask >> cell) & 1:
+                goal_state = {"robot": board.coords(cell), "boxes": list(boxes), "storages": storages}
+                state = Game(goal_state, game.blanks, board).get_state(True)
+                if state not in visited:
+                    visited.add(state)
+                    queue.append((state, 0))
+
+    while queue:
+        state, cost = queue.popleft()
+        pattern_game = Game(state_to_dict(state, storages), game.blanks, board)
+        boxes_cells = [board.cell(box) for box in state.boxes]
+        for cell in pattern_game.reachable_cells():
+            table[index.index(boxes_cells, cell)] = min(cost, UNSOLVED - 1)
+        for move, s in pattern_game.macro_successors():
+            next_state = state_from_dict(s)
+            if next_state not in visited:
+                visited.add(next_state)
+                queue.append((next_state, cost + 1))
+
+    os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as outfile:
+        outfile.write(table)
+    os.replace(temporary_path, path)
+    return path
+
+class PatternDatabase:
+    """Pattern database heuristic of a map. The boxes, sorted by coordinates, are split into disjoint patterns
+    of size boxes (the last one may be smaller) and the costs of the patterns are added: every movement moves
+    a single box, so the sum never overestimates the number of movements. The tables are built once per map
+    (see build_pattern_database) and memory-mapped read only, so the solver processes share one copy.
+        Parameters:
+            game (Game): Game of the map
+            size (int): Number of boxes of a pattern
+            directory (str): Directory of the pattern database files
+    """
+    def __init__(self, game, size=2, directory=PATTERN_DIRECTORY):
+        self.board = game.board
+        boxes = len(game.boxes)
+        size = max(1, min(size, boxes))
+        self.groups = [(start, min(start + size, boxes)) for start in range(0, boxes, size)]
+        self.indexes = {}
+        self.tables = {}
+        for group_size in {end - start for start, end in self.groups}:
+            with open(build_pattern_database(game, group_size, directory), "rb") as infile:
+                self.tables[group_size] = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+            self.indexes[group_size] = PatternIndex(self.board, group_size)
+
+    def __call__(self, state):
+        """Estimates the cost of a state
+            Parameters:
+                state (dict): Dictionary with the coordinates of the robot, the boxes and the storages
+            Returns:
+                cost (int): Sum of the costs of the patterns, UNREACHABLE for each unsolvable pattern
+        """
+        cell = self.board.cell
+        boxes_cells = [cell(box) for box in sorted(tuple(box) for box in state["boxes"])]
+        robot_cell = cell(state["robot"])
+        cost = 0
+        for start, end in self.groups:
+            pattern_cells = boxes_cells[start:end]
+            value = self.tables[end - start][self.indexes[end - start].index(pattern_cells, robot_cell)]
+            cost += UNREACHABLE if value == UNSOLVED else value
+        return cost
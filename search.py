@@ -1,296 +1,1728 @@
-# Functions for searching algorithms
-import copy
-
-from game import Game, map2objects
-
-# 1. Breadth First Search algorithm
-def breadth_first_search(initial_game, blanks, max_time):
-    """Breadth First Search algorithm
-        Parameters:
-            game (object): Game object
-            max_time (int): Maximum time to run the algorithm (in minutes)
-        Returns:
-            output (dict): Dictionary with the ids, parent ids and states of the visited nodes
-    """
-    from time import time
-    start = time()
-    compute_time = 0
-    current_state = copy.deepcopy(initial_game.get_current_state())
-    fringe = [[0, -1, current_state]] # [state id, parent id, state]
-    visited = []
-    ids = []
-    parent_ids = []
-    next_id = 1
-    while fringe and compute_time < max_time*60:
-        state_id, parent_id, state = fringe.pop(0)
-            
-        if state not in visited:
-            visited.append(state)
-            ids.append(state_id)
-            parent_ids.append(parent_id)
-            iter_game = Game(state, blanks)
-            
-            if iter_game.check_win():
-                total_time = (time() - start) / 60
-                print(f"Solution found in {total_time} minutes")
-                output = {"time": total_time, "ids" : ids, "parent_ids": parent_ids, "states" : visited}
-                return output
-            else:
-                current_state = iter_game.get_current_state()
-                next_states = iter_game.successor_function()
-                for s in next_states:
-                    fringe.append([next_id, state_id, s])
-                    next_id = next_id + 1
-                    
-            compute_time = time() - start
-            
-    if not iter_game.check_win():
-        if (compute_time < max_time*60):
-            print("No solution found")
-            return {"time": compute_time, "reason": "No solution found"}
-        else:
-            print("Time exceeded")
-            return {"time": compute_time, "reason": "Time exceeded"}
-
-#2. Depth First Search algorithm
-def depth_first_search(initial_game, blanks, max_time):
-    """Depth First Search algorithm
-        Parameters:
-            game (object): Game object
-            max_time (int): Maximum time to run the algorithm (in minutes)
-        Returns:
-            output (dict): Dictionary with the ids, parent ids and states of the visited nodes
-    """
-    from time import time
-    start = time()
-    compute_time = 0
-    current_state = copy.deepcopy(initial_game.get_current_state())
-    fringe = [[0, -1, current_state]] # [state id, parent id, state]
-    visited = []
-    ids = []
-    parent_ids = []
-    next_id = 1
-    
-    while fringe and compute_time < max_time*60:
-        state_id, parent_id, state = fringe.pop(0)
-        
-        if state not in visited:
-            visited.append(state)
-            ids.append(state_id)
-            parent_ids.append(parent_id)
-            iter_game = Game(state, blanks)
-            
-            if iter_game.check_win():
-                total_time = (time() - start) / 60
-                print(f"Solution found in {total_time} minutes")
-                output = {"time": total_time, "ids" : ids, "parent_ids": parent_ids, "states" : visited}
-                return output
-            else:
-                current_state = iter_game.get_current_state()
-                next_states = iter_game.successor_function()
-                for s in next_states:
-                    # Add the next states to the beginning of the fringe
-                    fringe.insert(0, [next_id, state_id, s])
-                    next_id = next_id + 1
-            compute_time = time() - start
-            
-    if not iter_game.check_win():
-        if (compute_time < max_time*60):
-            print("No solution found")
-            return {"time": compute_time, "reason": "No solution found"}
-        else:
-            print("Time exceeded")
-            return {"time": compute_time, "reason": "Time exceeded"}
-
-#3. Greedy Best Search algorithm
-def greedy_best_search(initial_game, blanks, max_time):
-    """Greedy Best Search algorithm
-        Parameters:
-            game (object): Game object
-            max_time (int): Maximum time to run the algorithm (in minutes)
-        Returns:
-            output (dict): Dictionary with the ids, parent ids and states of the visited nodes
-    """
-    from time import time
-    start = time()
-    compute_time = 0
-    current_state = copy.deepcopy(initial_game.get_current_state())
-    initial_distance = sum_distances_from_state(current_state)
-    fringe = [[initial_distance, 0, -1, current_state]] # [sum of distances, state id, parent id, state]
-    visited = []
-    ids = []
-    parent_ids = []
-    next_id = 1
-    
-    while fringe and  compute_time < max_time*60:
-        distance, state_id, parent_id, state = fringe.pop(0)
-        
-        if state not in visited:
-            visited.append(state)
-            ids.append(state_id)
-            parent_ids.append(parent_id)
-            iter_game = Game(state, blanks)
-            
-            if iter_game.check_win():
-                total_time = (time() - start) / 60
-                print(f"Solution found in {total_time} minutes")
-                output = {"time": total_time, "ids" : ids, "parent_ids": parent_ids, "states" : visited}
-                return output
-            else:
-                current_state = iter_game.get_current_state()
-                next_states = iter_game.successor_function()
-                for s in next_states:
-                    # Add the next states to the fringe
-                    distance = sum_distances_from_state(s)
-                    fringe.append([distance, next_id, state_id, s])
-                    next_id = next_id + 1
-                    
-                # sort the states by the sum of distances
-                fringe.sort()
-            compute_time = time() - start
-            
-    if not iter_game.check_win():
-        if (compute_time < max_time*60):
-            print("No solution found")
-            return {"time": compute_time, "reason": "No solution found"}
-        else:
-            print("Time exceeded")
-            return {"time": compute_time, "reason": "Time exceeded"}
-
-# 4. A* Search algorithm
-def a_star_search(initial_game, blanks, max_time):
-    """A* Search algorithm
-        Parameters:
-            game (object): Game object
-            max_time (int): Maximum time to run the algorithm (in minutes)
-        Returns:
-            output (dict): Dictionary with the ids, parent ids and states of the visited nodes
-    """
-    from time import time
-    start = time()
-    compute_time = 0
-    current_state = copy.deepcopy(initial_game.get_current_state())
-    initial_distance = sum_distances_from_state(current_state)
-    
-    # f(n): total cost
-    # f(n)=g(n)+h(n)
-    # • g(n): Gives the path cost from the start node to node n
-    # • h(n): Heuristic function (Manhattan distance)
-
-    # We store for each node [f(n)=g(n)+h(n), g(n), state id, parent id, state].
-    # g(n) is stored since it is historical, but to save memory h(n) is just computed every time we need it.
-    fringe = [[initial_distance, 0, 0, -1, current_state]]
-    visited = []
-    ids = []
-    parent_ids = []
-    next_id = 1
-    
-
-    while fringe and compute_time < max_time*60:
-        cost, path_cost, state_id, parent_id, state = fringe.pop(0)
-        
-        if state not in visited:
-            visited.append(state)
-            ids.append(state_id)
-            parent_ids.append(parent_id)
-            iter_game = Game(state, blanks)
-            
-            if iter_game.check_win():
-                total_time = (time() - start) / 60
-                print(f"Solution found in {total_time} minutes")
-                output = {"time": total_time, "ids" : ids, "parent_ids": parent_ids, "states" : visited}
-                return output
-            else:
-                current_state = iter_game.get_current_state()
-                next_states = iter_game.successor_function()
-                
-                path_cost = path_cost + 1 # We increase the path cost by 1 for the children nodes
-                for s in next_states:
-                    
-                    # Add the next states to the fringe
-                    distance = sum_distances_from_state(s)
-                    cost = path_cost + distance # cost = f(n)
-                    fringe.append([cost, path_cost, next_id, state_id, s])
-                    
-                    next_id = next_id + 1
-                    
-                # sort the states by the total cost
-                fringe.sort()
-            compute_time = time() - start
-            
-    if not iter_game.check_win():
-        if (compute_time < max_time*60):
-            print("No solution found")
-            return {"time": compute_time, "reason": "No solution found"}
-        else:
-            print("Time exceeded")
-            return {"time": compute_time, "reason": "Time exceeded"}    
-    
-# 5. Manhatan distance function
-def manhattan_distance(point_a, point_b):
-    """Manhattan Distance algorithm
-        Parameters:
-            point_a (tuple): Coordinates of the first point
-            point_b (tuple): Coordinates of the second point
-        Returns:
-            distance (float): Manhattan distance between the two points
-    """
-    distance = abs(point_a[0] - point_b[0]) + abs(point_a[1] - point_b[1])
-    return distance
-
-# 6. Sum of distances from state function
-def sum_distances_from_state(state):
-    """Computes the sum of the manhattan distances between the boxes and the storages
-        Parameters:
-            state (dict): Dictionary with the coordinates of the robot, the boxes and the storages
-        Returns:
-            sum_distance (float): Sum of the manhattan distances between the boxes and the storages
-    """
-    boxes = state["boxes"]
-    storages = state["storages"]
-    sum_distance = 0
-    
-    for box in boxes:
-        min_distance = 1000
-        for storage in storages:
-            distance = manhattan_distance(box, storage)
-            if distance < min_distance:
-                min_distance = distance
-        sum_distance = sum_distance + min_distance
-    return sum_distance
-
-# 7. Get solution path from visited list
-def get_solution_path(search_output):
-    """Returns the solution path from the visited list
-        Parameters:
-            visited_list (list): List of visited states in the format [(depth,state1), (depth,state2), ...]
-        Returns:
-            time (float): Time in minutes that the search took
-            ids (list): List of ids of the states in the solution path
-            parent_ids (list): List of parent ids of the states in the solution path
-            states (list): List of states in the solution path
-    """
-    #Check that a solution was found
-    if "states" in search_output.keys():
-        states = [search_output["states"][-1]]
-        ids = [search_output["ids"][-1]]
-        parent_ids = [search_output["parent_ids"][-1]]
-        parent = parent_ids[0]
-        
-        while parent >= 0:
-            for i in range(len(search_output["ids"])):
-                if search_output["ids"][i] == parent:
-                    # Get the parent state, id and its parent id
-                    parent_state = search_output["states"][i]
-                    states.append(parent_state)
-                    
-                    parent_id = search_output["ids"][i]
-                    ids.append(parent_id)
-                    
-                    parent_parent_id = search_output["parent_ids"][i]
-                    parent_ids.append(parent_parent_id)
-                    parent = parent_parent_id
-        
-        return search_output["time"], ids, parent_ids, states
-    else:
+# Functions for searching algorithms
+import heapq
+import mmap
+import struct
+from collections import OrderedDict
+from itertools import combinations
+from sys import getsizeof
+
+from game import MOVES, Game, State, map2objects, moves_to_string, reverse_macro_move, reverse_move, state_from_dict, state_to_dict
+from frontier import make_frontier
+from heuristics import make_box_costs, make_heuristic, manhattan_distance, max_heuristic, sum_distances_from_state
+from instrumentation import SearchStats
+from pattern_database import PatternDatabase, map_hash
+from state_table import FILTERED, NO_PARENT, PackedStateTable
+
+# 1. Breadth First Search algorithm
+def breadth_first_search(initial_game, blanks, max_time, frontier="fifo", full_output=False, macro=False, stats=None, memory_mb=None, on_memory_full="stop", checkpoint=None):
+    """Breadth First Search algorithm
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            frontier (str): Type of frontier used as open list ("fifo", "lifo" or "priority")
+            full_output (bool): Also return the ids, parent ids and states of all the visited nodes
+            macro (bool): Search over box configurations: each node is a set of boxes with the robot region and
+                each successor is a push or pull of a box the robot can walk to (see Game.macro_successors)
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats)
+            memory_mb (float): Memory cap in MB of the states, stored packed (see packed_breadth_first_search), None
+                for no cap. The packed search has a FIFO open list, and no full output nor checkpoints.
+            on_memory_full (str): What to do when the memory cap is reached: "stop" or "partial" (see packed_breadth_first_search)
+            checkpoint (Checkpoint): Checkpoint files to save the search to periodically and resume it from (see
+                Checkpoint), None for no checkpoints
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    if memory_mb is not None:
+        if frontier != "fifo" or full_output or checkpoint is not None:
+            raise ValueError("memory_mb cannot be combined with another frontier than 'fifo', full_output or checkpoint")
+        return packed_breadth_first_search(initial_game, blanks, max_time, macro, memory_mb, on_memory_full, stats)
+    from time import time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("breadth_first")
+    storages = initial_game.storages
+    board = initial_game.board
+    current_state = initial_game.get_state(macro)
+    fringe = make_frontier(frontier)
+    fringe.push([0, -1, None, current_state, 0], 0) # [state id, parent id, move, state, depth], priority = state id (oldest first)
+    visited = set() # Closed list of compact states, O(1) membership test
+    nodes = {} # Parent id, move and state of each visited node, indexed by state id
+    next_id = 1
+    signature = checkpoint_signature(initial_game, frontier, macro) if checkpoint is not None else None
+    resumed, records = resume_search(checkpoint, "breadth_first", signature, stats)
+    if resumed is not None and resumed["time"] >= max_time*60:
+        return resumed_out_of_time(resumed, stats)
+    if resumed is not None:
+        # The time already spent is counted in the output and charged to the budget
+        compute_time = resumed["time"]
+        fringe, next_id = resumed["fringe"], resumed["next_id"]
+        nodes = dict(records["nodes"])
+        visited = {node[2] for node in nodes.values()}
+        start = time() - resumed["time"] # Loading the checkpoint is not charged to the budget
+    while fringe and compute_time < max_time*60:
+        state_id, parent_id, move, state, depth = fringe.pop()
+            
+        if state not in visited:
+            visited.add(state)
+            nodes[state_id] = (parent_id, move, state)
+            stats.expand(depth, len(fringe), len(visited))
+            iter_game = Game(state_to_dict(state, storages), blanks, board, initial_game.prune_deadlocks, compound_macros=initial_game.compound_macros)
+            
+            if iter_game.check_win():
+                total_time = (time() - start) / 60
+                print(f"Solution found in {total_time} minutes")
+                if checkpoint is not None:
+                    checkpoint.clear()
+                return build_search_output(total_time, nodes, state_id, storages, full_output, initial_game if macro else None, stats)
+            else:
+                for move, s in stats.successors(iter_game.successors(macro)):
+                    fringe.push([next_id, state_id, move, state_from_dict(s), depth + 1], next_id)
+                    next_id = next_id + 1
+                    
+            compute_time = time() - start
+            if checkpoint is not None and checkpoint.due():
+                save_checkpoint(checkpoint, "breadth_first", signature, compute_time, stats.snapshot(),
+                                {"fringe": fringe, "next_id": next_id}, {"nodes": nodes})
+        else:
+            stats.duplicate()
+            
+    # The search returns as soon as it finds a solution, so here the fringe is empty or the time is over
+    if (compute_time < max_time*60):
+        print("No solution found")
+        if checkpoint is not None:
+            checkpoint.clear()
+        return {"time": compute_time, "reason": "No solution found", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("No solution found")}
+    else:
+        print("Time exceeded")
+        if checkpoint is not None:
+            save_checkpoint(checkpoint, "breadth_first", signature, compute_time, stats.snapshot(),
+                            {"fringe": fringe, "next_id": next_id}, {"nodes": nodes})
+        return {"time": compute_time, "reason": "Time exceeded", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+
+#2. Depth First Search algorithm
+def depth_first_search(initial_game, blanks, max_time, frontier="lifo", full_output=False, macro=False, stats=None, checkpoint=None):
+    """Depth First Search algorithm
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            frontier (str): Type of frontier used as open list ("fifo", "lifo" or "priority")
+            full_output (bool): Also return the ids, parent ids and states of all the visited nodes
+            macro (bool): Search over box configurations: each node is a set of boxes with the robot region and
+                each successor is a push or pull of a box the robot can walk to (see Game.macro_successors)
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats)
+            checkpoint (Checkpoint): Checkpoint files to save the search to periodically and resume it from (see
+                Checkpoint), None for no checkpoints
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    from time import time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("depth_first")
+    storages = initial_game.storages
+    board = initial_game.board
+    current_state = initial_game.get_state(macro)
+    fringe = make_frontier(frontier)
+    fringe.push([0, -1, None, current_state, 0], 0) # [state id, parent id, move, state, depth], priority = -state id (newest first)
+    visited = set() # Closed list of compact states, O(1) membership test
+    nodes = {} # Parent id, move and state of each visited node, indexed by state id
+    next_id = 1
+    signature = checkpoint_signature(initial_game, frontier, macro) if checkpoint is not None else None
+    resumed, records = resume_search(checkpoint, "depth_first", signature, stats)
+    if resumed is not None and resumed["time"] >= max_time*60:
+        return resumed_out_of_time(resumed, stats)
+    if resumed is not None:
+        # The time already spent is counted in the output and charged to the budget
+        compute_time = resumed["time"]
+        fringe, next_id = resumed["fringe"], resumed["next_id"]
+        nodes = dict(records["nodes"])
+        visited = {node[2] for node in nodes.values()}
+        start = time() - resumed["time"] # Loading the checkpoint is not charged to the budget
+    
+    while fringe and compute_time < max_time*60:
+        state_id, parent_id, move, state, depth = fringe.pop()
+        
+        if state not in visited:
+            visited.add(state)
+            nodes[state_id] = (parent_id, move, state)
+            stats.expand(depth, len(fringe), len(visited))
+            iter_game = Game(state_to_dict(state, storages), blanks, board, initial_game.prune_deadlocks, compound_macros=initial_game.compound_macros)
+            
+            if iter_game.check_win():
+                total_time = (time() - start) / 60
+                print(f"Solution found in {total_time} minutes")
+                if checkpoint is not None:
+                    checkpoint.clear()
+                return build_search_output(total_time, nodes, state_id, storages, full_output, initial_game if macro else None, stats)
+            else:
+                for move, s in stats.successors(iter_game.successors(macro)):
+                    # Add the next states to the top of the fringe
+                    fringe.push([next_id, state_id, move, state_from_dict(s), depth + 1], -next_id)
+                    next_id = next_id + 1
+            compute_time = time() - start
+            if checkpoint is not None and checkpoint.due():
+                save_checkpoint(checkpoint, "depth_first", signature, compute_time, stats.snapshot(),
+                                {"fringe": fringe, "next_id": next_id}, {"nodes": nodes})
+        else:
+            stats.duplicate()
+            
+    # The search returns as soon as it finds a solution, so here the fringe is empty or the time is over
+    if (compute_time < max_time*60):
+        print("No solution found")
+        if checkpoint is not None:
+            checkpoint.clear()
+        return {"time": compute_time, "reason": "No solution found", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("No solution found")}
+    else:
+        print("Time exceeded")
+        if checkpoint is not None:
+            save_checkpoint(checkpoint, "depth_first", signature, compute_time, stats.snapshot(),
+                            {"fringe": fringe, "next_id": next_id}, {"nodes": nodes})
+        return {"time": compute_time, "reason": "Time exceeded", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+
+#3. Greedy Best Search algorithm
+def greedy_best_search(initial_game, blanks, max_time, frontier="priority", full_output=False, macro=False, heuristic="manhattan", stats=None, pattern_size=None, checkpoint=None):
+    """Greedy Best Search algorithm
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            frontier (str): Type of frontier used as open list ("fifo", "lifo" or "priority")
+            full_output (bool): Also return the ids, parent ids and states of all the visited nodes
+            macro (bool): Search over box configurations: each node is a set of boxes with the robot region and
+                each successor is a push or pull of a box the robot can walk to (see Game.macro_successors)
+            heuristic (str): Heuristic function: "manhattan", "distance" or "matching" (see make_heuristic)
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats)
+            pattern_size (int): Boxes per pattern of a pattern database combined with the heuristic by taking the
+                maximum (see PatternDatabase), None for no pattern database
+            checkpoint (Checkpoint): Checkpoint files to save the search to periodically and resume it from (see
+                Checkpoint), None for no checkpoints
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    from time import time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("greedy")
+    storages = initial_game.storages
+    board = initial_game.board
+    current_state = initial_game.get_state(macro)
+    estimate = make_heuristic(heuristic, initial_game)
+    box_costs = make_box_costs(heuristic, initial_game)
+    if pattern_size:
+        # The maximum is not updated incrementally, it is computed on every state
+        estimate = max_heuristic([estimate, PatternDatabase(initial_game, pattern_size)])
+        box_costs = None
+    estimate = stats.heuristic(estimate)
+    initial_distance = estimate(initial_game.get_current_state())
+    # The nodes keep the state of their parent and the move from it, the state itself is only built when the
+    # node is expanded. The Zobrist key and the heuristic of a child are updated in O(1) from its parent.
+    fringe = make_frontier(frontier)
+    fringe.push([0, -1, None, current_state, initial_game.get_key(macro), 0, initial_distance], initial_distance) # [state id, parent id, move, parent state, key, depth, heuristic], priority = heuristic
+    visited = set() # Closed list of Zobrist keys, O(1) membership test
+    nodes = {} # Parent id, move and state of each visited node, indexed by state id
+    next_id = 1
+    signature = checkpoint_signature(initial_game, frontier, macro, heuristic, pattern_size) if checkpoint is not None else None
+    resumed, records = resume_search(checkpoint, "greedy", signature, stats)
+    if resumed is not None and resumed["time"] >= max_time*60:
+        return resumed_out_of_time(resumed, stats)
+    if resumed is not None:
+        # The time already spent is counted in the output and charged to the budget
+        compute_time = resumed["time"]
+        fringe, next_id = resumed["fringe"], resumed["next_id"]
+        nodes = dict(records["nodes"])
+        visited = {board.zobrist_key(node[2].robot, node[2].boxes) for node in nodes.values()}
+        start = time() - resumed["time"] # Loading the checkpoint is not charged to the budget
+    
+    while fringe and  compute_time < max_time*60:
+        state_id, parent_id, move, parent_state, key, depth, distance = fringe.pop()
+        
+        if key not in visited:
+            visited.add(key)
+            iter_game = node_game(parent_state, move, macro, initial_game, box_costs)
+            state = iter_game.get_state(macro)
+            nodes[state_id] = (parent_id, move, state)
+            stats.expand(depth, len(fringe), len(visited), h=distance)
+            
+            if iter_game.check_win():
+                total_time = (time() - start) / 60
+                print(f"Solution found in {total_time} minutes")
+                if checkpoint is not None:
+                    checkpoint.clear()
+                return build_search_output(total_time, nodes, state_id, storages, full_output, initial_game if macro else None, stats)
+            else:
+                for move, next_key, distance in stats.successors(successor_keys(iter_game, macro, estimate)):
+                    # Add the next states to the fringe
+                    if next_key not in visited:
+                        fringe.push([next_id, state_id, move, state, next_key, depth + 1, distance], distance)
+                        next_id = next_id + 1
+                    else:
+                        stats.duplicate()
+            compute_time = time() - start
+            if checkpoint is not None and checkpoint.due():
+                save_checkpoint(checkpoint, "greedy", signature, compute_time, stats.snapshot(),
+                                {"fringe": fringe, "next_id": next_id}, {"nodes": nodes})
+        else:
+            stats.duplicate()
+            
+    # The search returns as soon as it finds a solution, so here the fringe is empty or the time is over
+    if (compute_time < max_time*60):
+        print("No solution found")
+        if checkpoint is not None:
+            checkpoint.clear()
+        return {"time": compute_time, "reason": "No solution found", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("No solution found")}
+    else:
+        print("Time exceeded")
+        if checkpoint is not None:
+            save_checkpoint(checkpoint, "greedy", signature, compute_time, stats.snapshot(),
+                            {"fringe": fringe, "next_id": next_id}, {"nodes": nodes})
+        return {"time": compute_time, "reason": "Time exceeded", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+
+# 4. A* Search algorithm
+def a_star_search(initial_game, blanks, max_time, frontier="priority", full_output=False, macro=False, heuristic="manhattan", stats=None, pattern_size=None, memory_mb=None, on_memory_full="stop", checkpoint=None):
+    """A* Search algorithm
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            frontier (str): Type of frontier used as open list ("fifo", "lifo" or "priority")
+            full_output (bool): Also return the ids, parent ids and states of all the visited nodes
+            macro (bool): Search over box configurations: each node is a set of boxes with the robot region and
+                each successor is a push or pull of a box the robot can walk to (see Game.macro_successors)
+            heuristic (str): Heuristic function: "manhattan", "distance" or "matching" (see make_heuristic)
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats)
+            pattern_size (int): Boxes per pattern of a pattern database combined with the heuristic by taking the
+                maximum (see PatternDatabase), None for no pattern database
+            memory_mb (float): Memory cap in MB of the states and the open list, stored packed (see packed_a_star_search),
+                None for no cap. The packed search has a priority open list, and no full output nor checkpoints.
+            on_memory_full (str): What to do when the memory cap is reached: "stop" or "partial" (see packed_breadth_first_search)
+            checkpoint (Checkpoint): Checkpoint files to save the search to periodically and resume it from (see
+                Checkpoint), None for no checkpoints
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    if memory_mb is not None:
+        if frontier != "priority" or full_output or checkpoint is not None:
+            raise ValueError("memory_mb cannot be combined with another frontier than 'priority', full_output or checkpoint")
+        return packed_a_star_search(initial_game, blanks, max_time, macro, heuristic, pattern_size, memory_mb, on_memory_full, stats)
+    from time import time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("a_star")
+    storages = initial_game.storages
+    board = initial_game.board
+    current_state = initial_game.get_state(macro)
+    estimate = make_heuristic(heuristic, initial_game)
+    box_costs = make_box_costs(heuristic, initial_game)
+    if pattern_size:
+        # The maximum is not updated incrementally, it is computed on every state
+        estimate = max_heuristic([estimate, PatternDatabase(initial_game, pattern_size)])
+        box_costs = None
+    estimate = stats.heuristic(estimate)
+    initial_distance = estimate(initial_game.get_current_state())
+    
+    # f(n): total cost
+    # f(n)=g(n)+h(n)
+    # • g(n): Gives the path cost from the start node to node n
+    # • h(n): Heuristic function (Manhattan distance by default, see make_heuristic)
+
+    # We store for each node [g(n), state id, parent id, move, parent state, key, h(n)] with priority (f(n), h(n)),
+    # so on equal f(n) the node closer to the goal is expanded first.
+    # The state of a node is only built when it is expanded, from the state of its parent and the move.
+    # The Zobrist key and h(n) of a child are updated in O(1) from its parent.
+    fringe = make_frontier(frontier)
+    fringe.push([0, 0, -1, None, current_state, initial_game.get_key(macro), initial_distance], (initial_distance, initial_distance))
+    visited = set() # Closed list of Zobrist keys, O(1) membership test
+    nodes = {} # Parent id, move and state of each visited node, indexed by state id
+    next_id = 1
+    signature = checkpoint_signature(initial_game, frontier, macro, heuristic, pattern_size) if checkpoint is not None else None
+    resumed, records = resume_search(checkpoint, "a_star", signature, stats)
+    if resumed is not None and resumed["time"] >= max_time*60:
+        return resumed_out_of_time(resumed, stats)
+    if resumed is not None:
+        # The time already spent is counted in the output and charged to the budget
+        compute_time = resumed["time"]
+        fringe, next_id = resumed["fringe"], resumed["next_id"]
+        nodes = dict(records["nodes"])
+        visited = {board.zobrist_key(node[2].robot, node[2].boxes) for node in nodes.values()}
+        start = time() - resumed["time"] # Loading the checkpoint is not charged to the budget
+    
+
+    while fringe and compute_time < max_time*60:
+        path_cost, state_id, parent_id, move, parent_state, key, distance = fringe.pop()
+        
+        if key not in visited:
+            visited.add(key)
+            iter_game = node_game(parent_state, move, macro, initial_game, box_costs)
+            state = iter_game.get_state(macro)
+            nodes[state_id] = (parent_id, move, state)
+            stats.expand(path_cost, len(fringe), len(visited), path_cost + distance, distance)
+            
+            if iter_game.check_win():
+                total_time = (time() - start) / 60
+                print(f"Solution found in {total_time} minutes")
+                if checkpoint is not None:
+                    checkpoint.clear()
+                return build_search_output(total_time, nodes, state_id, storages, full_output, initial_game if macro else None, stats)
+            else:
+                path_cost = path_cost + 1 # We increase the path cost by 1 for the children nodes (one box move in macro mode)
+                for move, next_key, distance in stats.successors(successor_keys(iter_game, macro, estimate)):
+                    
+                    # Add the next states to the fringe
+                    if next_key not in visited:
+                        cost = path_cost + distance # cost = f(n)
+                        fringe.push([path_cost, next_id, state_id, move, state, next_key, distance], (cost, distance))
+                        next_id = next_id + 1
+                    else:
+                        stats.duplicate()
+            compute_time = time() - start
+            if checkpoint is not None and checkpoint.due():
+                save_checkpoint(checkpoint, "a_star", signature, compute_time, stats.snapshot(),
+                                {"fringe": fringe, "next_id": next_id}, {"nodes": nodes})
+        else:
+            stats.duplicate()
+            
+    # The search returns as soon as it finds a solution, so here the fringe is empty or the time is over
+    if (compute_time < max_time*60):
+        print("No solution found")
+        if checkpoint is not None:
+            checkpoint.clear()
+        return {"time": compute_time, "reason": "No solution found", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("No solution found")}
+    else:
+        print("Time exceeded")
+        if checkpoint is not None:
+            save_checkpoint(checkpoint, "a_star", signature, compute_time, stats.snapshot(),
+                            {"fringe": fringe, "next_id": next_id}, {"nodes": nodes})
+        return {"time": compute_time, "reason": "Time exceeded", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+    
+def node_game(parent_state, move, macro, initial_game, box_costs):
+    """Builds the game of a node of greedy and A* from the state of its parent and the move from it
+        Parameters:
+            parent_state (State): Compact state of the parent (of the node itself for the root, with move None)
+            move (tuple): Movement (or macro movement) from the parent
+            macro (bool): Macro search (see Game.macro_successors)
+            initial_game (Game): Initial game of the search
+            box_costs (list): Heuristic cost of a box in each cell (see make_box_costs)
+        Returns:
+            game (Game): Game in the state of the node
+    """
+    game = Game(state_to_dict(parent_state, initial_game.storages), initial_game.blanks, initial_game.board, initial_game.prune_deadlocks,
+                box_costs, initial_game.compound_macros)
+    if move is not None:
+        play_move(game, move, macro)
+    return game
+
+def successor_keys(game, macro, estimate):
+    """Generates the successors of a game with their Zobrist key and heuristic value. The heuristic is
+    updated in O(1) when it adds independent costs per box, otherwise it is computed on the next state.
+        Parameters:
+            game (Game): Game to expand
+            macro (bool): Macro search (see Game.macro_successors)
+            estimate (function): Heuristic function (see make_heuristic)
+        Returns:
+            successors (generator): Tuples (movement, key, heuristic)
+    """
+    for move, key, distance in game.successor_keys(macro):
+        if distance is None:
+            robot_coords = play_move(game, move, macro)
+            distance = estimate(game.get_current_state())
+            undo_move(game, move, macro, robot_coords)
+        yield move, key, distance
+
+# 5. IDA* Search algorithm
+def ida_star_search(initial_game, blanks, max_time, macro=False, heuristic="manhattan", memory_mb=256, stats=None, checkpoint=None):
+    """IDA* Search algorithm. It runs depth first searches bounded by f(n) = g(n) + h(n), raising the bound to
+    the smallest f(n) over it after every iteration, so it finds optimal solutions (with an admissible heuristic)
+    while only keeping the current path in memory. The game is walked in place with Game.apply and Game.undo.
+    A transposition table capped to memory_mb drops the states already expanded with a lower g(n) in the
+    same iteration; when it is full, the least recently used state is replaced.
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            macro (bool): Search over box configurations (see Game.macro_successors)
+            heuristic (str): Heuristic function: "manhattan", "distance" or "matching" (see make_heuristic)
+            memory_mb (float): Memory cap of the transposition table in MB, None for plain IDA* without table
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats).
+                The open list of IDA* is the current path and its closed list the transposition table.
+            checkpoint (Checkpoint): Checkpoint files to save the search to periodically and resume it from (see
+                Checkpoint), None for no checkpoints. A checkpoint holds the bound of the current iteration and the
+                branch taken at each node of the current path, so the search resumes on that path and does not
+                search the branches before it again.
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    from time import time
+    start = time()
+    stats = stats or SearchStats()
+    stats.start("ida_star")
+    storages = initial_game.storages
+    # Own copy of the game, since it is moved in place
+    game = Game(initial_game.get_current_state(), blanks, initial_game.board, initial_game.prune_deadlocks,
+                compound_macros=initial_game.compound_macros)
+    estimate = stats.heuristic(make_heuristic(heuristic, game))
+    current_state = game.get_state(macro)
+    
+    table = OrderedDict() # Transposition table: lowest g(n) each state was expanded with in the iteration
+    table_size = transposition_table_size(current_state, memory_mb)
+    path = [(None, current_state)] # Move and state of each node of the current path
+    on_path = {current_state}
+    branches = [] # Index of the successor taken and smallest f(n) over the bound so far at each expanded node of the path
+    
+    def bounded_search(path_cost, bound, resume=None):
+        """Depth first search from the current state of the game
+            Parameters:
+                path_cost (int): g(n) of the current state
+                bound (float): Bound of f(n) of the iteration
+                resume (list): Branches of the path to go back down to when the search resumes from a checkpoint
+                    (see branches), None to search every branch
+            Returns:
+                result: FOUND, TIME_EXCEEDED or the smallest f(n) over the bound
+        """
+        distance = estimate(game.get_current_state())
+        cost = path_cost + distance
+        if cost > bound:
+            return cost
+        if game.check_win():
+            return FOUND
+        if time() - start >= max_time*60:
+            return TIME_EXCEEDED
+        if checkpoint is not None and not resume and checkpoint.due():
+            save_checkpoint(checkpoint, "ida_star", signature, time() - start, stats.snapshot(), search_state())
+        
+        state = path[-1][1]
+        if table_size:
+            if state in table and table[state] <= path_cost:
+                stats.duplicate()
+                return float("inf")
+            table[state] = path_cost
+            table.move_to_end(state)
+            if len(table) > table_size:
+                table.popitem(last=False)
+        
+        if resume:
+            # Expanded and counted before the checkpoint, the branches before the saved one are already searched
+            first, next_bound = resume[0]
+            successors = list(game.successors(macro))
+        else:
+            first, next_bound = 0, float("inf")
+            stats.expand(path_cost, len(path), len(table), cost, distance)
+            successors = list(stats.successors(game.successors(macro)))
+        branches.append([first, next_bound])
+        for index in range(first, len(successors)):
+            move = successors[index][0]
+            branches[-1][0] = index
+            robot_coords = play_move(game, move, macro)
+            child_state = game.get_state(macro)
+            if child_state not in on_path:
+                path.append((move, child_state))
+                on_path.add(child_state)
+                result = bounded_search(path_cost + 1, bound, resume[1:] if resume and index == first else None)
+                if result is FOUND or result is TIME_EXCEEDED:
+                    return result
+                path.pop()
+                on_path.discard(child_state)
+                next_bound = min(next_bound, result)
+                branches[-1][1] = next_bound
+            else:
+                stats.duplicate()
+            undo_move(game, move, macro, robot_coords)
+        branches.pop()
+        return next_bound
+    
+    def search_state():
+        """State of the search to save in a checkpoint"""
+        return {"bound": bound, "branches": [tuple(branch) for branch in branches]}
+    
+    bound = estimate(game.get_current_state())
+    signature = checkpoint_signature(initial_game, macro, heuristic, memory_mb) if checkpoint is not None else None
+    resumed, _ = resume_search(checkpoint, "ida_star", signature, stats)
+    if resumed is not None and resumed["time"] >= max_time*60:
+        return resumed_out_of_time(resumed, stats)
+    resume = None
+    if resumed is not None:
+        # The time already spent is counted in the output and charged to the budget
+        bound, resume = resumed["bound"], resumed["branches"]
+        start = time() - resumed["time"] # Loading the checkpoint is not charged to the budget
+    result = None
+    while result is not FOUND and result is not TIME_EXCEEDED and bound != float("inf"):
+        table.clear()
+        result = bounded_search(0, bound, resume)
+        resume = None
+        if result is not TIME_EXCEEDED:
+            bound = result
+    
+    if result is FOUND:
+        total_time = (time() - start) / 60
+        print(f"Solution found in {total_time} minutes")
+        if checkpoint is not None:
+            checkpoint.clear()
+        nodes = {state_id: (state_id - 1, move, state) for state_id, (move, state) in enumerate(path)}
+        return build_search_output(total_time, nodes, len(path) - 1, storages, False, initial_game if macro else None, stats)
+    compute_time = time() - start
+    if result is TIME_EXCEEDED:
+        print("Time exceeded")
+        if checkpoint is not None:
+            save_checkpoint(checkpoint, "ida_star", signature, compute_time, stats.snapshot(), search_state())
+        return {"time": compute_time, "reason": "Time exceeded", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+    print("No solution found")
+    if checkpoint is not None:
+        checkpoint.clear()
+    return {"time": compute_time, "reason": "No solution found", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("No solution found")}
+
+# Results of a bounded search of IDA* other than the next bound
+FOUND = "found"
+TIME_EXCEEDED = "time exceeded"
+
+# Estimated memory of a transposition table entry besides the state (hash table slot and LRU links)
+TABLE_ENTRY_OVERHEAD = 150
+
+def transposition_table_size(state, memory_mb):
+    """Computes how many states fit in a transposition table of the given size
+        Parameters:
+            state (State): Compact state, used to estimate the memory of a state
+            memory_mb (float): Memory cap of the table in MB, None for no table
+        Returns:
+            size (int): Maximum number of states in the table
+    """
+    if memory_mb is None:
+        return 0
+    state_bytes = getsizeof(state) + getsizeof(state.robot) + getsizeof(state.boxes) + sum(getsizeof(box) for box in state.boxes)
+    return int(memory_mb * 1024 * 1024 // (state_bytes + TABLE_ENTRY_OVERHEAD))
+
+def play_move(game, move, macro):
+    """Plays a movement (or a macro movement) in place
+        Returns:
+            robot_coords (tuple): Coordinates of the robot before the movement, needed by undo_move
+    """
+    robot_coords = game.robot
+    if macro:
+        game.move_robot(move[0])
+        for step in move[1]:
+            game.apply(step)
+    else:
+        game.apply(move)
+    return robot_coords
+
+def undo_move(game, move, macro, robot_coords):
+    """Reverts in place a movement played with play_move"""
+    if macro:
+        for step in reversed(move[1]):
+            game.undo(step)
+    else:
+        game.undo(move)
+    game.move_robot(robot_coords)
+
+# 6. Bidirectional Breadth First Search algorithm
+def bidirectional_search(initial_game, blanks, max_time, macro=False, stats=None, checkpoint=None):
+    """Bidirectional Breadth First Search algorithm. Every movement can be undone by another one (a pull
+    undoes a push and the other way around), so the successors of a state are also its predecessors and
+    the same successor function searches backwards from the goal states. Both searches expand whole
+    layers, the smaller one first, until a layer reaches a state visited by the other search. The
+    solution has the minimum number of movements (box movements in macro mode).
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            macro (bool): Search over box configurations (see Game.macro_successors)
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats).
+                The open list is the current layer of both searches and the closed list their visited states.
+            checkpoint (Checkpoint): Checkpoint files to save the search to periodically and resume it from (see
+                Checkpoint), None for no checkpoints
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    from time import time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("bidirectional")
+    storages = initial_game.storages
+    board = initial_game.board
+    current_state = initial_game.get_state(macro)
+    
+    # Closed lists of both searches: parent state, move from the parent and depth of each visited state
+    forward = {current_state: (None, None, 0)}
+    backward = {state: (None, None, 0) for state in goal_states(initial_game, macro)}
+    forward_layer = [current_state]
+    backward_layer = list(backward)
+    meeting_state = current_state if current_state in backward else None
+    side = None # Search expanding its layer, None between two layers
+    position = 0 # Index of the next state to expand in the layer
+    next_layer = []
+    signature = checkpoint_signature(initial_game, macro) if checkpoint is not None else None
+    resumed, records = resume_search(checkpoint, "bidirectional", signature, stats)
+    if resumed is not None and resumed["time"] >= max_time*60:
+        return resumed_out_of_time(resumed, stats)
+    if resumed is not None:
+        # The time already spent is counted in the output and charged to the budget
+        compute_time = resumed["time"]
+        forward, backward = dict(records["forward"]), dict(records["backward"])
+        forward_layer, backward_layer = resumed["forward_layer"], resumed["backward_layer"]
+        side, position, next_layer = resumed["side"], resumed["position"], resumed["next_layer"]
+        meeting_state = resumed["meeting_state"]
+        start = time() - resumed["time"] # Loading the checkpoint is not charged to the budget
+    
+    def search_state():
+        """State of the search to save in a checkpoint"""
+        return {"forward_layer": forward_layer, "backward_layer": backward_layer, "side": side, "position": position,
+                "next_layer": next_layer, "meeting_state": meeting_state}
+    
+    while meeting_state is None and forward_layer and backward_layer and compute_time < max_time*60:
+        # Expand the smaller layer
+        if side is None:
+            side = "forward" if len(forward_layer) <= len(backward_layer) else "backward"
+            position = 0
+            next_layer = []
+        if side == "forward":
+            visited, other, layer = forward, backward, forward_layer
+        else:
+            visited, other, layer = backward, forward, backward_layer
+        while position < len(layer):
+            state = layer[position]
+            position = position + 1
+            depth = visited[state][2] + 1
+            iter_game = Game(state_to_dict(state, storages), blanks, board, initial_game.prune_deadlocks)
+            stats.expand(depth - 1, len(forward_layer) + len(backward_layer), len(forward) + len(backward))
+            for move, s in stats.successors(iter_game.successors(macro)):
+                next_state = state_from_dict(s)
+                if next_state not in visited:
+                    visited[next_state] = (state, move, depth)
+                    next_layer.append(next_state)
+                    # Keep the shortest solution among the states of the layer visited by the other search
+                    if next_state in other and (meeting_state is None or other[next_state][2] < other[meeting_state][2]):
+                        meeting_state = next_state
+                else:
+                    stats.duplicate()
+            compute_time = time() - start
+            if checkpoint is not None and checkpoint.due():
+                save_checkpoint(checkpoint, "bidirectional", signature, compute_time, stats.snapshot(), search_state(),
+                                {"forward": forward, "backward": backward})
+        if visited is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+        side = None
+    
+    if meeting_state is None:
+        if (compute_time < max_time*60):
+            print("No solution found")
+            if checkpoint is not None:
+                checkpoint.clear()
+            return {"time": compute_time, "reason": "No solution found", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("No solution found")}
+        else:
+            print("Time exceeded")
+            if checkpoint is not None:
+                save_checkpoint(checkpoint, "bidirectional", signature, compute_time, stats.snapshot(), search_state(),
+                                {"forward": forward, "backward": backward})
+            return {"time": compute_time, "reason": "Time exceeded", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+    
+    # Path from the initial state to the meeting state, then from the meeting state to the goal,
+    # reversing the movements of the backward search
+    path = []
+    state = meeting_state
+    while state is not None:
+        parent, move, depth = forward[state]
+        path.append((move, state))
+        state = parent
+    path.reverse()
+    state = meeting_state
+    while backward[state][0] is not None:
+        parent, move, depth = backward[state]
+        path.append((reverse_macro_move(move) if macro else reverse_move(move), parent))
+        state = parent
+    
+    total_time = (time() - start) / 60
+    print(f"Solution found in {total_time} minutes")
+    if checkpoint is not None:
+        checkpoint.clear()
+    nodes = {state_id: (state_id - 1, move, state) for state_id, (move, state) in enumerate(path)}
+    return build_search_output(total_time, nodes, len(path) - 1, storages, False, initial_game if macro else None, stats)
+
+def goal_states(game, macro=False):
+    """Generates the goal states of a game: every set of storages that can hold all the boxes, with the
+    robot on any other blank (on the smallest cell of each robot region in macro mode)
+        Parameters:
+            game (Game): Game of the map
+            macro (bool): Normalize the robot coordinates (see Game.get_normalized_state)
+        Returns:
+            states (set): Compact goal states
+    """
+    board = game.board
+    blank_cells = [cell for cell in range(board.size) if board.is_blank(cell)]
+    states = set()
+    for boxes in combinations(sorted(game.storages), len(game.boxes)):
+        boxes_mask = board.mask(boxes)
+        for cell in blank_cells:
+            if not (boxes_mask >> cell) & 1:
+                goal_state = {"robot": board.coords(cell), "boxes": list(boxes), "storages": game.storages}
+                states.add(Game(goal_state, game.blanks, board).get_state(macro))
+    return states
+
+# 7. Hash Distributed A* Search algorithm
+def hda_star_search(initial_game, blanks, max_time, workers=None, macro=False, heuristic="manhattan", stats=None):
+    """Hash Distributed A* (HDA*) Search algorithm. The states are split across worker processes by their hash:
+    each worker owns the open and closed lists of its states, expands them like A* and sends the children it
+    generates to their owners in batches. Each worker shares the lowest f(n) of its open list and only expands
+    the nodes up to the lowest one over all the workers, so the workers follow the order of A* together and a
+    state is seldom expanded again with a lower g(n). The cost of the best solution found so far is shared, and
+    the nodes whose f(n) reaches it are dropped. The search ends when every worker is idle and every batch sent
+    has been received, so with an admissible heuristic the solution is optimal.
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            workers (int): Number of worker processes (the number of CPUs by default)
+            macro (bool): Search over box configurations (see Game.macro_successors)
+            heuristic (str): Heuristic function: "manhattan", "distance" or "matching" (see make_heuristic)
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats).
+                They are the sum of the counters of the workers, which report them to this process.
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path, the
+                nodes expanded and generated, and the ones of each worker ("worker_expanded", "worker_generated")
+    """
+    import multiprocessing
+    from queue import Empty
+    from time import sleep, time
+    start = time()
+    stats = stats or SearchStats()
+    stats.start("hda_star")
+    workers = workers or multiprocessing.cpu_count()
+    storages = initial_game.storages
+    current_state = initial_game.get_state(macro)
+    
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+    # Batches sent and received by each worker (the last slot is this process), idle flags, lowest f(n) of the
+    # open list of each worker and cost of the best solution
+    sent = multiprocessing.Array("q", workers + 1)
+    received = multiprocessing.Array("q", workers + 1)
+    idle = multiprocessing.Array("b", workers)
+    lowest_f = multiprocessing.Array("d", [float("inf")] * workers)
+    incumbent = multiprocessing.Value("d", float("inf"))
+    processes = [
+        multiprocessing.Process(
+            target=hda_star_worker,
+            args=(worker_id, initial_game, macro, heuristic, inboxes, results, sent, received, idle, lowest_f, incumbent, stats.interval),
+            daemon=True
+        )
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    
+    sent[workers] += 1
+    initial_distance = make_heuristic(heuristic, initial_game)(initial_game.get_current_state())
+    inboxes[hash(current_state) % workers].put(("nodes", [(current_state, 0, None, None, initial_distance)]))
+    
+    # Termination detection: the counts of batches only grow, and a batch is counted as sent before it is put
+    # and as received after it is taken. If the batches sent and received are the same count before and after
+    # the idle flags are read, none was sent or in flight in between, so a worker idle then stays idle.
+    goal_state = None
+    worker_stats = {} # Last counters reported by each worker
+    compute_time = 0
+    while compute_time < max_time*60:
+        try:
+            while True:
+                message = results.get_nowait()
+                if message[0] == "goal" and message[2] <= incumbent.value:
+                    goal_state = message[1]
+                elif message[0] == "progress":
+                    worker_stats[message[1]] = message[2]
+        except Empty:
+            pass
+        stats.combine(list(worker_stats.values()))
+        stats.tick()
+        counts = (sum(sent), sum(received))
+        if counts[0] == counts[1] and all(idle) and (sum(sent), sum(received)) == counts:
+            break
+        sleep(0.01)
+        compute_time = time() - start
+    
+    # Late goal messages of the last expansions
+    try:
+        while True:
+            message = results.get_nowait()
+            if message[0] == "goal" and message[2] <= incumbent.value:
+                goal_state = message[1]
+    except Empty:
+        pass
+    
+    path = []
+    if compute_time < max_time*60 and goal_state is not None:
+        # Walk the parent pointers back from the goal, asking each state to its owner
+        state = goal_state
+        while state is not None:
+            inboxes[hash(state) % workers].put(("parent", state))
+            message = results.get()
+            while message[0] != "parent":
+                message = results.get()
+            _, state, parent_state, move = message
+            path.append((move, state))
+            state = parent_state
+        path.reverse()
+    
+    for inbox in inboxes:
+        inbox.put(("stop",))
+    expanded = [0] * workers
+    generated = [0] * workers
+    for _ in range(workers):
+        message = results.get()
+        while message[0] != "stats":
+            message = results.get()
+        expanded[message[1]] = message[2]["expanded"]
+        generated[message[1]] = message[2]["generated"]
+        worker_stats[message[1]] = message[2]
+    for process in processes:
+        process.join()
+    stats.combine(list(worker_stats.values()))
+    
+    if path:
+        total_time = (time() - start) / 60
+        print(f"Solution found in {total_time} minutes")
+        nodes = {state_id: (state_id - 1, move, state) for state_id, (move, state) in enumerate(path)}
+        output = build_search_output(total_time, nodes, len(path) - 1, storages, False, initial_game if macro else None, stats)
+    elif compute_time < max_time*60:
+        print("No solution found")
+        output = {"time": compute_time, "reason": "No solution found", "stats": stats.finish("No solution found")}
+    else:
+        print("Time exceeded")
+        output = {"time": compute_time, "reason": "Time exceeded", "stats": stats.finish("Time exceeded")}
+    output["expanded"] = stats.expanded
+    output["generated"] = stats.generated
+    output["worker_expanded"] = expanded
+    output["worker_generated"] = generated
+    return output
+
+# Nodes expanded by a HDA* worker between two reads of its inbox
+HDA_STAR_EXPANSIONS = 100
+
+def hda_star_worker(worker_id, initial_game, macro, heuristic, inboxes, results, sent, received, idle, lowest_f, incumbent, interval):
+    """Worker process of HDA* (see hda_star_search). It owns the states whose hash modulo the number of
+    workers is worker_id. Its inbox receives batches of nodes ("nodes", [(state, g(n), parent state, move, h(n))]),
+    questions about the parent of a state ("parent", state) and the order to stop ("stop",).
+    Its counters are sent every interval seconds ("progress", worker_id, counters) and when it stops.
+    It waits while the lowest f(n) of its open list is over the one of another worker.
+    """
+    from queue import Empty
+    workers = len(inboxes)
+    storages = initial_game.storages
+    blanks = initial_game.blanks
+    board = initial_game.board
+    stats = SearchStats(lambda counters: results.put(("progress", worker_id, counters)), interval=interval)
+    stats.start("hda_star")
+    estimate = stats.heuristic(make_heuristic(heuristic, initial_game))
+    fringe = make_frontier("priority")
+    best = {} # Lowest g(n), parent state and move of each state seen, the open and closed lists together
+    outgoing = [[] for _ in range(workers)]
+    waiting = False # The lowest f(n) of the open list is over the one of another worker
+    
+    def add_node(state, path_cost, parent_state, move, distance):
+        if state in best and best[state][0] <= path_cost:
+            stats.duplicate()
+            return
+        best[state] = (path_cost, parent_state, move)
+        fringe.push((path_cost, state), (path_cost + distance, distance))
+    
+    while True:
+        # Read the inbox, waiting for it when there is nothing to expand
+        try:
+            if not fringe:
+                message = inboxes[worker_id].get(timeout=0.01)
+            elif waiting:
+                message = inboxes[worker_id].get(timeout=0.001)
+            else:
+                message = inboxes[worker_id].get_nowait()
+        except Empty:
+            message = None
+        while message is not None:
+            if message[0] == "stop":
+                results.put(("stats", worker_id, stats.snapshot()))
+                return
+            if message[0] == "parent":
+                path_cost, parent_state, move = best[message[1]]
+                results.put(("parent", message[1], parent_state, move))
+            else:
+                idle[worker_id] = 0
+                received[worker_id] += 1
+                for state, path_cost, parent_state, move, distance in message[1]:
+                    add_node(state, path_cost, parent_state, move, distance)
+            try:
+                message = inboxes[worker_id].get_nowait()
+            except Empty:
+                message = None
+        
+        # Lowest f(n) of the other workers and of the nodes sent to them. The batches sent stay in the lowest
+        # f(n) shared by this worker until its next round, so their owners have time to read them.
+        bound = min([f for owner, f in enumerate(lowest_f) if owner != worker_id], default=float("inf"))
+        sent_f = float("inf")
+        waiting = False
+        for _ in range(HDA_STAR_EXPANSIONS):
+            if not fringe:
+                break
+            if fringe.peek()[0] > bound:
+                waiting = True
+                break
+            path_cost, state = fringe.pop()
+            if best[state][0] < path_cost:
+                stats.duplicate()
+                continue
+            iter_game = Game(state_to_dict(state, storages), blanks, board, initial_game.prune_deadlocks, compound_macros=initial_game.compound_macros)
+            distance = estimate(iter_game.get_current_state())
+            if path_cost + distance >= incumbent.value:
+                # Every node left has a higher f(n), none of them can improve the solution
+                fringe = make_frontier("priority")
+                break
+            if iter_game.check_win():
+                with incumbent.get_lock():
+                    if path_cost < incumbent.value:
+                        incumbent.value = path_cost
+                        results.put(("goal", state, path_cost))
+                continue
+            stats.expand(path_cost, len(fringe), len(best), path_cost + distance, distance)
+            for move, s in stats.successors(iter_game.successors(macro)):
+                next_state = state_from_dict(s)
+                owner = hash(next_state) % workers
+                next_distance = estimate(s)
+                if owner == worker_id:
+                    add_node(next_state, path_cost + 1, state, move, next_distance)
+                else:
+                    outgoing[owner].append((next_state, path_cost + 1, state, move, next_distance))
+                    sent_f = min(sent_f, path_cost + 1 + next_distance)
+                    bound = min(bound, sent_f)
+        
+        for owner, batch in enumerate(outgoing):
+            if batch:
+                sent[worker_id] += 1
+                inboxes[owner].put(("nodes", batch))
+                outgoing[owner] = []
+        lowest_f[worker_id] = min(fringe.peek()[0] if fringe else float("inf"), sent_f)
+        idle[worker_id] = 0 if fringe else 1
+
+# 8. External memory Breadth First Search algorithm
+def external_breadth_first_search(initial_game, blanks, max_time, macro=False, directory=None, buffer_mb=64, stats=None):
+    """External memory Breadth First Search algorithm. Each layer of the search is a file of fixed-width state
+    records (see StatePacker), sorted and without duplicates, so the memory used does not grow with the number
+    of states. The children of a layer are collected in a buffer of buffer_mb, written as a sorted run when it
+    is full, and the runs are merged into the next layer, removing the duplicates in bulk. Every movement can
+    be undone, so a child already visited is in the current layer or in the previous one. The solution path is
+    read back through the memory-mapped layer files, looking for a parent of each state in the previous layer.
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            macro (bool): Search over box configurations (see Game.macro_successors)
+            directory (str): Directory of the layer files (the temporary directory by default), removed at the end
+            buffer_mb (float): Memory of the buffer of children in MB
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats).
+                The open list is the rest of the current layer and the closed list all the layers written.
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    import os
+    import shutil
+    import tempfile
+    from time import time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("external_breadth_first")
+    storages = initial_game.storages
+    board = initial_game.board
+    packer = StatePacker(board, len(initial_game.boxes))
+    buffer_records = max(1, int(buffer_mb * 1024 * 1024 // (packer.size + BUFFER_RECORD_OVERHEAD)))
+    work_directory = tempfile.mkdtemp(prefix="layers_", dir=directory)
+    
+    def layer_path(depth):
+        return os.path.join(work_directory, f"layer_{depth}.bin")
+    
+    try:
+        with open(layer_path(0), "wb") as outfile:
+            outfile.write(packer.pack(initial_game.get_state(macro)))
+        layer_sizes = [1]
+        depth = 0
+        goal_state = None
+        while goal_state is None and layer_sizes[depth] and compute_time < max_time*60:
+            runs = []
+            buffer = []
+            children = 0
+            remaining = layer_sizes[depth]
+            for record in read_records(layer_path(depth), packer.size):
+                remaining -= 1
+                state = packer.unpack(record)
+                stats.expand(depth, remaining, sum(layer_sizes))
+                iter_game = Game(state_to_dict(state, storages), blanks, board, initial_game.prune_deadlocks)
+                if iter_game.check_win():
+                    goal_state = state
+                    break
+                for move, s in stats.successors(iter_game.successors(macro)):
+                    buffer.append(packer.pack(state_from_dict(s)))
+                    children = children + 1
+                    if len(buffer) >= buffer_records:
+                        runs.append(write_run(buffer, os.path.join(work_directory, f"run_{len(runs)}.bin")))
+                        buffer = []
+                compute_time = time() - start
+                if compute_time >= max_time*60:
+                    break
+            if goal_state is not None or compute_time >= max_time*60:
+                break
+            
+            # Merge the runs into the next layer, dropping the states of the current and previous layers
+            if buffer:
+                runs.append(write_run(buffer, os.path.join(work_directory, f"run_{len(runs)}.bin")))
+                buffer = []
+            previous_layers = [layer_path(depth)] + ([layer_path(depth - 1)] if depth else [])
+            size = merge_layer(runs, previous_layers, layer_path(depth + 1), packer.size)
+            stats.duplicate(children - size)
+            for run in runs:
+                os.remove(run)
+            layer_sizes.append(size)
+            depth = depth + 1
+        
+        if goal_state is None:
+            if (compute_time < max_time*60):
+                print("No solution found")
+                return {"time": compute_time, "reason": "No solution found", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("No solution found")}
+            else:
+                print("Time exceeded")
+                return {"time": compute_time, "reason": "Time exceeded", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+        
+        # Walk back from the goal: the successors of a state are also its predecessors, and one of
+        # them is in the previous layer
+        states = [goal_state]
+        moves = []
+        for layer in range(depth - 1, -1, -1):
+            iter_game = Game(state_to_dict(states[-1], storages), blanks, board, initial_game.prune_deadlocks)
+            with open(layer_path(layer), "rb") as infile, mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as records:
+                for move, s in iter_game.successors(macro):
+                    parent = state_from_dict(s)
+                    if contains_record(records, packer.pack(parent), packer.size):
+                        moves.append(reverse_macro_move(move) if macro else reverse_move(move))
+                        states.append(parent)
+                        break
+        states.reverse()
+        moves.reverse()
+        path = [(None, states[0])] + list(zip(moves, states[1:]))
+        
+        total_time = (time() - start) / 60
+        print(f"Solution found in {total_time} minutes")
+        nodes = {state_id: (state_id - 1, move, state) for state_id, (move, state) in enumerate(path)}
+        return build_search_output(total_time, nodes, len(path) - 1, storages, False, initial_game if macro else None, stats)
+    finally:
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+# Memory of a record in the buffer besides its data: header of the bytes object and slot of the list
+BUFFER_RECORD_OVERHEAD = 41
+
+# Number of records read from a file at once
+READ_CHUNK_RECORDS = 4096
+
+class StatePacker:
+    """Packs compact states into fixed-width records: the cell of the robot and the cells of the sorted
+    boxes, as big-endian unsigned 16-bit integers, so the records sort like the tuples of their cells.
+        Parameters:
+            board (Board): Compiled board of the map
+            boxes (int): Number of boxes
+    """
+    def __init__(self, board, boxes):
+        self.board = board
+        self.struct = struct.Struct(f">{boxes + 1}H")
+        self.size = self.struct.size
+    
+    def pack(self, state):
+        """Returns the record of a compact state"""
+        cell = self.board.cell
+        return self.struct.pack(cell(state.robot), *[cell(box) for box in state.boxes])
+    
+    def unpack(self, record):
+        """Returns the compact state of a record"""
+        coords = self.board.coords
+        cells = self.struct.unpack(record)
+        return State(coords(cells[0]), tuple(coords(cell) for cell in cells[1:]))
+
+def read_records(path, record_size):
+    """Reads the records of a file in order
+        Returns:
+            records (generator): Records of the file, as bytes
+    """
+    with open(path, "rb") as infile:
+        while True:
+            chunk = infile.read(record_size * READ_CHUNK_RECORDS)
+            if not chunk:
+                return
+            for offset in range(0, len(chunk), record_size):
+                yield chunk[offset:offset + record_size]
+
+def write_run(buffer, path):
+    """Writes the records of a buffer to a file, sorted and without duplicates
+        Returns:
+            path (str): Path of the file
+    """
+    with open(path, "wb") as outfile:
+        outfile.write(b"".join(sorted(set(buffer))))
+    return path
+
+def merge_layer(runs, previous_layers, path, record_size):
+    """Merges sorted runs of records into a layer file, without duplicates and without the records of the
+    previous layers (sorted files too), with a single sequential pass over every file
+        Returns:
+            size (int): Number of records of the layer
+    """
+    previous = heapq.merge(*[read_records(layer, record_size) for layer in previous_layers])
+    previous_record = next(previous, None)
+    last_record = None
+    size = 0
+    with open(path, "wb") as outfile:
+        for record in heapq.merge(*[read_records(run, record_size) for run in runs]):
+            if record == last_record:
+                continue
+            last_record = record
+            while previous_record is not None and previous_record < record:
+                previous_record = next(previous, None)
+            if record != previous_record:
+                outfile.write(record)
+                size = size + 1
+    return size
+
+def contains_record(records, record, record_size):
+    """Binary search of a record in a memory-mapped file of sorted records"""
+    low = 0
+    high = len(records) // record_size
+    while low < high:
+        middle = (low + high) // 2
+        current = records[middle * record_size:(middle + 1) * record_size]
+        if current < record:
+            low = middle + 1
+        elif current > record:
+            high = middle
+        else:
+            return True
+    return False
+
+# 9. Anytime Weighted A* Search algorithm
+# Weights of h(n), the next one is used after each solution
+ANYTIME_WEIGHTS = (3, 2, 1.5, 1.25, 1)
+
+def anytime_a_star_search(initial_game, blanks, max_time, weights=ANYTIME_WEIGHTS, macro=False, heuristic="manhattan", stats=None, checkpoint=None):
+    """Anytime Weighted A* Search algorithm. It runs A* with the priority f(n) = g(n) + w * h(n), which finds a
+    first solution quickly, and keeps searching after it: every solution found lowers w to the next weight,
+    the nodes whose g(n) + h(n) reaches the cost of the best solution are dropped, and the states reached with
+    a lower g(n) are reopened. It returns the best solution found when the open list runs out (the solution is
+    then optimal with an admissible heuristic) or when the time is over, with a lower bound of the optimal cost:
+    the smallest g(n) + h(n) over the open list.
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            weights (tuple): Decreasing weights of h(n), the next one is used after each solution
+            macro (bool): Search over box configurations (see Game.macro_successors)
+            heuristic (str): Heuristic function: "manhattan", "distance" or "matching" (see make_heuristic)
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats)
+            checkpoint (Checkpoint): Checkpoint files to save the search to periodically and resume it from (see
+                Checkpoint), None for no checkpoints. The nodes are reopened, so every checkpoint saves them whole.
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the best solution path, its
+                cost, the lower bound, whether it is optimal and the time and cost of every solution found
+                (costs in box movements in macro mode)
+    """
+    from time import time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("anytime_a_star")
+    storages = initial_game.storages
+    estimate = stats.heuristic(make_heuristic(heuristic, initial_game))
+    box_costs = make_box_costs(heuristic, initial_game)
+    initial_distance = estimate(initial_game.get_current_state())
+    weight_index = 0
+    
+    # We store for each node [g(n), key, parent key, move, parent state, h(n)] with priority (g(n) + w * h(n), h(n))
+    root_key = initial_game.get_key(macro)
+    fringe = make_frontier("priority")
+    fringe.push([0, root_key, None, None, initial_game.get_state(macro), initial_distance], (weights[0] * initial_distance, initial_distance))
+    best_costs = {root_key: 0} # Lowest g(n) each state was reached with
+    nodes = {} # Parent key, move and state of each expanded node, indexed by key
+    incumbent = float("inf") # Cost of the best solution
+    solution = None
+    improvements = []
+    signature = checkpoint_signature(initial_game, weights, macro, heuristic) if checkpoint is not None else None
+    resumed, _ = resume_search(checkpoint, "anytime_a_star", signature, stats)
+    if resumed is not None:
+        # The time already spent is counted in the output and charged to the budget
+        compute_time = resumed["time"]
+        fringe, best_costs, nodes = resumed["fringe"], resumed["best_costs"], resumed["nodes"]
+        incumbent, solution, improvements = resumed["incumbent"], resumed["solution"], resumed["improvements"]
+        weight_index = resumed["weight_index"]
+        start = time() - resumed["time"] # Loading the checkpoint is not charged to the budget
+    
+    def search_state():
+        """State of the search to save in a checkpoint"""
+        return {"fringe": fringe, "best_costs": best_costs, "nodes": nodes, "incumbent": incumbent,
+                "solution": solution, "improvements": improvements, "weight_index": weight_index}
+    
+    while fringe and compute_time < max_time*60:
+        path_cost, key, parent_key, move, parent_state, distance = fringe.pop()
+        if path_cost > best_costs[key] or path_cost + distance >= incumbent:
+            # Reached again with a lower g(n), or unable to improve the best solution
+            stats.duplicate()
+            continue
+        iter_game = node_game(parent_state, move, macro, initial_game, box_costs)
+        state = iter_game.get_state(macro)
+        nodes[key] = (parent_key, move, state)
+        stats.expand(path_cost, len(fringe), len(nodes), path_cost + distance, distance)
+        
+        if iter_game.check_win():
+            incumbent = path_cost
+            solution = anytime_path(nodes, key)
+            improvements.append({"time": (time() - start) / 60, "cost": path_cost, "weight": weights[weight_index]})
+            if weight_index + 1 < len(weights):
+                weight_index = weight_index + 1
+                fringe = reprioritize(fringe, weights[weight_index])
+        else:
+            weight = weights[weight_index]
+            path_cost = path_cost + 1
+            for move, next_key, next_distance in stats.successors(successor_keys(iter_game, macro, estimate)):
+                if path_cost >= best_costs.get(next_key, float("inf")) or path_cost + next_distance >= incumbent:
+                    stats.duplicate()
+                    continue
+                best_costs[next_key] = path_cost
+                fringe.push([path_cost, next_key, key, move, state, next_distance], (path_cost + weight * next_distance, next_distance))
+        compute_time = time() - start
+        if checkpoint is not None and checkpoint.due():
+            save_checkpoint(checkpoint, "anytime_a_star", signature, compute_time, stats.snapshot(), search_state())
+    
+    if checkpoint is not None:
+        if fringe:
+            # The time is over: the open list is saved before it is emptied for the lower bound
+            save_checkpoint(checkpoint, "anytime_a_star", signature, compute_time, stats.snapshot(), search_state())
+        else:
+            checkpoint.clear()
+    
+    # The node of an optimal path with the optimal g(n) is still open, unless the best solution is optimal
+    lower_bound = incumbent
+    while fringe:
+        path_cost, key, parent_key, move, parent_state, distance = fringe.pop()
+        if path_cost == best_costs[key]:
+            lower_bound = min(lower_bound, path_cost + distance)
+    
+    if solution is None:
+        if (compute_time < max_time*60):
+            print("No solution found")
+            return {"time": compute_time, "reason": "No solution found", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("No solution found")}
+        else:
+            print("Time exceeded")
+            return {"time": compute_time, "reason": "Time exceeded", "lower_bound": lower_bound, "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+    
+    total_time = (time() - start) / 60
+    print(f"Solution found in {total_time} minutes")
+    nodes = {state_id: (state_id - 1, move, state) for state_id, (move, state) in enumerate(solution)}
+    output = build_search_output(total_time, nodes, len(solution) - 1, storages, False, initial_game if macro else None, stats)
+    output["cost"] = incumbent
+    output["lower_bound"] = lower_bound
+    output["optimal"] = lower_bound >= incumbent
+    output["improvements"] = improvements
+    return output
+
+def anytime_path(nodes, key):
+    """Walks the parent keys back from a node of Anytime Weighted A*. A node is only expanded again with a
+    lower g(n), so the parent keys never make a cycle.
+        Returns:
+            path (list): Move and state of each node from the initial state to the node
+    """
+    path = []
+    while key is not None:
+        parent_key, move, state = nodes[key]
+        path.append((move, state))
+        key = parent_key
+    path.reverse()
+    return path
+
+def reprioritize(fringe, weight):
+    """Moves the nodes of Anytime Weighted A* to a new open list with the priorities of a new weight"""
+    new_fringe = make_frontier("priority")
+    while fringe:
+        node = fringe.pop()
+        new_fringe.push(node, (node[0] + weight * node[5], node[5]))
+    return new_fringe
+
+# 10. Batch Breadth First Search algorithm
+def batch_breadth_first_search(initial_game, blanks, max_time, macro=False, heuristic="manhattan", stats=None):
+    """Breadth First Search algorithm over whole layers with NumPy (see BatchBoard). Each layer is a batch of
+    robot cells and box cell matrices: its successors are generated with legality masks over the batch, and
+    the duplicates are removed by sorting their Zobrist keys. Every movement can be undone, so a successor
+    already visited is in the current layer or in the previous one. The layers are kept as arrays, with the
+    index of the parent and the movement of each state, to rebuild the solution path.
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            macro (bool): Box movements as actions, the robot region is not vectorized so it runs breadth_first_search
+            heuristic (str): Heuristic evaluated on every layer, for the best h(n) of the counters:
+                "manhattan" or "distance" (see make_box_costs), "matching" for none
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats)
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    if macro:
+        return breadth_first_search(initial_game, blanks, max_time, macro=True, stats=stats)
+    import numpy as np
+    from batch import BatchBoard, unique_unvisited
+    from time import perf_counter, time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("batch_breadth_first")
+    storages = initial_game.storages
+    board = initial_game.board
+    engine = BatchBoard(board, storages, initial_game.prune_deadlocks, make_box_costs(heuristic, initial_game))
+    
+    robots, boxes = engine.batch([initial_game.get_state()])
+    keys = engine.keys(robots, boxes)
+    previous_keys = keys[:0]
+    layers = [(robots, boxes, np.array([-1]), np.array([-1]))] # Robot cells, box cells, parent index and movement of each state
+    closed_size = 1
+    goal_index = None
+    
+    while len(robots) and compute_time < max_time*60:
+        depth = len(layers) - 1
+        best_h = int(engine.heuristic(boxes).min()) if engine.box_costs is not None else None
+        stats.expand(depth, 0, closed_size, h=best_h, count=len(robots))
+        goals = np.nonzero(engine.is_goal(boxes))[0]
+        if len(goals):
+            goal_index = goals[0]
+            break
+        expansion_start = perf_counter()
+        parents, moves, robots, boxes = engine.expand(robots, boxes)
+        stats.generate(len(parents), perf_counter() - expansion_start)
+        next_keys = engine.keys(robots, boxes)
+        fresh = unique_unvisited(next_keys, np.concatenate([keys, previous_keys]))
+        stats.duplicate(len(next_keys) - len(fresh))
+        robots, boxes = robots[fresh], boxes[fresh]
+        layers.append((robots, boxes, parents[fresh], moves[fresh]))
+        previous_keys, keys = keys, next_keys[fresh]
+        closed_size = closed_size + len(fresh)
+        compute_time = time() - start
+    
+    if goal_index is None:
+        if (compute_time < max_time*60):
+            print("No solution found")
+            return {"time": compute_time, "reason": "No solution found", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("No solution found")}
+        else:
+            print("Time exceeded")
+            return {"time": compute_time, "reason": "Time exceeded", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+    
+    # Walk the parent indices back through the layers
+    path = []
+    index = goal_index
+    for layer_robots, layer_boxes, layer_parents, layer_moves in reversed(layers):
+        state = State(board.coords(int(layer_robots[index])), tuple(board.coords(int(cell)) for cell in layer_boxes[index]))
+        path.append((MOVES[layer_moves[index]] if layer_moves[index] >= 0 else None, state))
+        index = layer_parents[index]
+    path.reverse()
+    
+    total_time = (time() - start) / 60
+    print(f"Solution found in {total_time} minutes")
+    nodes = {state_id: (state_id - 1, move, state) for state_id, (move, state) in enumerate(path)}
+    return build_search_output(total_time, nodes, len(path) - 1, storages, False, None, stats)
+
+# 11. Memory-budgeted searches over packed states
+# Estimated bytes of an item of the packed A* open list: an integer (see encode_priority) and its slot in the heap
+HEAP_ITEM_BYTES = 48
+
+def packed_breadth_first_search(initial_game, blanks, max_time, macro=False, memory_mb=256, on_memory_full="stop", stats=None):
+    """Breadth First Search algorithm over a PackedStateTable: every state is stored once as a fixed-width record
+    with its parent and depth, and the table is also the queue, since the states are appended in the order they
+    are reached. A state takes a few tens of bytes instead of the hundreds of the tuples and dicts of
+    breadth_first_search, and the table never goes over memory_mb.
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            macro (bool): Search over box configurations (see Game.macro_successors)
+            memory_mb (float): Memory cap of the table in MB
+            on_memory_full (str): "stop" to end the search with the reason "Memory exceeded" when the table is full,
+                "partial" to carry on with partial duplicate detection first (see PackedStateTable.degrade)
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats)
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    from time import time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("packed_breadth_first")
+    storages = initial_game.storages
+    board = initial_game.board
+    packer = StatePacker(board, len(initial_game.boxes))
+    table = PackedStateTable(packer.size, memory_mb)
+    table.append(packer.pack(initial_game.get_state(macro)), NO_PARENT, 0)
+    head = 0 # Next entry to expand, the entries after it are the open list
+    goal_entry = None
+    reason = None
+    
+    while head < len(table) and reason is None and compute_time < max_time*60:
+        state = packer.unpack(table.state(head))
+        depth = table.payload(head)[1]
+        stats.expand(depth, len(table) - head - 1, head + 1)
+        iter_game = Game(state_to_dict(state, storages), blanks, board, initial_game.prune_deadlocks, compound_macros=initial_game.compound_macros)
+        if iter_game.check_win():
+            goal_entry = head
+            break
+        for move, s in stats.successors(iter_game.successors(macro)):
+            record = packer.pack(state_from_dict(s))
+            if table.find(record) != -1:
+                stats.duplicate()
+                continue
+            if table.append(record, head, depth + 1) < 0:
+                if on_memory_full == "partial" and table.degrade():
+                    print("Memory cap reached, switching to partial duplicate detection")
+                    if table.find(record) != -1:
+                        stats.duplicate()
+                        continue
+                    if table.append(record, head, depth + 1) >= 0:
+                        continue
+                reason = "Memory exceeded"
+                break
+        head = head + 1
+        compute_time = time() - start
+    
+    if goal_entry is None:
+        return packed_search_failure(reason, compute_time, max_time, stats)
+    total_time = (time() - start) / 60
+    print(f"Solution found in {total_time} minutes")
+    return build_search_output(total_time, packed_path(table, packer, goal_entry, initial_game, macro), goal_entry, storages,
+                               False, initial_game if macro else None, stats)
+
+def packed_a_star_search(initial_game, blanks, max_time, macro=False, heuristic="manhattan", pattern_size=None, memory_mb=256, on_memory_full="stop", stats=None):
+    """A* Search algorithm over a PackedStateTable (see packed_breadth_first_search). Each state is stored once,
+    when it is generated, with its parent and g(n). The open list is a heap of integers encoding f(n), h(n) and the
+    entry of the state (see encode_priority), counted in the memory cap. When a shorter path to a stored state is
+    found, its parent and g(n) are updated and it is pushed again, the stale items are skipped when popped.
+        Parameters:
+            game (object): Game object
+            max_time (int): Maximum time to run the algorithm (in minutes)
+            macro (bool): Search over box configurations (see Game.macro_successors)
+            heuristic (str): Heuristic function: "manhattan", "distance" or "matching" (see make_heuristic)
+            pattern_size (int): Boxes per pattern of a pattern database combined with the heuristic (see a_star_search)
+            memory_mb (float): Memory cap of the table and the open list in MB
+            on_memory_full (str): "stop" or "partial" (see packed_breadth_first_search)
+            stats (SearchStats): Counters of the search, with the progress callback and trace file (see SearchStats)
+        Returns:
+            output (dict): Dictionary with the ids, parent ids, states and moves of the solution path
+    """
+    from time import time
+    start = time()
+    compute_time = 0
+    stats = stats or SearchStats()
+    stats.start("packed_a_star")
+    storages = initial_game.storages
+    board = initial_game.board
+    estimate = make_heuristic(heuristic, initial_game)
+    box_costs = make_box_costs(heuristic, initial_game)
+    if pattern_size:
+        estimate = max_heuristic([estimate, PatternDatabase(initial_game, pattern_size)])
+        box_costs = None
+    estimate = stats.heuristic(estimate)
+    initial_distance = estimate(initial_game.get_current_state())
+    
+    packer = StatePacker(board, len(initial_game.boxes))
+    table = PackedStateTable(packer.size, memory_mb)
+    root = table.append(packer.pack(initial_game.get_state(macro)), NO_PARENT, 0)
+    fringe = [encode_priority(initial_distance, initial_distance, root)]
+    goal_entry = None
+    reason = None
+    
+    while fringe and reason is None and compute_time < max_time*60:
+        f, distance, entry = decode_priority(heapq.heappop(fringe))
+        parent, path_cost = table.payload(entry)
+        if path_cost < f - distance:
+            # A shorter path to the state was found after this item was pushed
+            stats.duplicate()
+            continue
+        state = packer.unpack(table.state(entry))
+        iter_game = Game(state_to_dict(state, storages), blanks, board, initial_game.prune_deadlocks, box_costs, initial_game.compound_macros)
+        stats.expand(path_cost, len(fringe), len(table), f, distance)
+        if iter_game.check_win():
+            goal_entry = entry
+            break
+        path_cost = path_cost + 1
+        for move, next_state, distance in stats.successors(iter_game.successor_states(macro)):
+            if distance is None:
+                distance = estimate(state_to_dict(next_state, storages))
+            record = packer.pack(next_state)
+            next_entry = table.find(record)
+            if next_entry == FILTERED or (next_entry >= 0 and table.payload(next_entry)[1] <= path_cost):
+                stats.duplicate()
+                continue
+            if next_entry >= 0:
+                table.set_payload(next_entry, entry, path_cost)
+            else:
+                next_entry = table.append(record, entry, path_cost, len(fringe) * HEAP_ITEM_BYTES)
+                if next_entry < 0 and on_memory_full == "partial" and table.degrade():
+                    print("Memory cap reached, switching to partial duplicate detection")
+                    if table.find(record) == FILTERED:
+                        stats.duplicate()
+                        continue
+                    next_entry = table.append(record, entry, path_cost, len(fringe) * HEAP_ITEM_BYTES)
+                if next_entry < 0:
+                    reason = "Memory exceeded"
+                    break
+            heapq.heappush(fringe, encode_priority(path_cost + distance, distance, next_entry))
+        compute_time = time() - start
+    
+    if goal_entry is None:
+        return packed_search_failure(reason, compute_time, max_time, stats)
+    total_time = (time() - start) / 60
+    print(f"Solution found in {total_time} minutes")
+    return build_search_output(total_time, packed_path(table, packer, goal_entry, initial_game, macro), goal_entry, storages,
+                               False, initial_game if macro else None, stats)
+
+def encode_priority(f, h, entry):
+    """Encodes an item of the packed A* open list as one integer, ordered by f(n), then h(n), then entry"""
+    return (f << 80) | (h << 40) | entry
+
+def decode_priority(priority):
+    """Decodes an item of the packed A* open list (see encode_priority)"""
+    return priority >> 80, (priority >> 40) & ((1 << 40) - 1), priority & ((1 << 40) - 1)
+
+def packed_path(table, packer, goal_entry, initial_game, macro):
+    """Rebuilds the solution path of a packed search from the parents of the entries. The moves are not stored:
+    the move from each parent is found again among the successors of the parent.
+        Returns:
+            nodes (dict): Parent id, move and compact state of each node of the path, indexed by entry
+    """
+    entries = [goal_entry]
+    while table.payload(entries[-1])[0] != NO_PARENT:
+        entries.append(table.payload(entries[-1])[0])
+    entries.reverse()
+    nodes = {entries[0]: (-1, None, packer.unpack(table.state(entries[0])))}
+    for parent, entry in zip(entries, entries[1:]):
+        state = packer.unpack(table.state(entry))
+        parent_game = Game(state_to_dict(nodes[parent][2], initial_game.storages), initial_game.blanks, initial_game.board,
+                           initial_game.prune_deadlocks, compound_macros=initial_game.compound_macros)
+        move = next(move for move, s in parent_game.successors(macro) if state_from_dict(s) == state)
+        nodes[entry] = (parent, move, state)
+    return nodes
+
+def packed_search_failure(reason, compute_time, max_time, stats):
+    """Builds the output of a packed search that found no solution"""
+    if reason is None:
+        reason = "No solution found" if compute_time < max_time*60 else "Time exceeded"
+    print(reason)
+    return {"time": compute_time, "reason": reason, "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish(reason)}
+
+# 12. Checkpoints of the searches
+def checkpoint_signature(initial_game, *parameters):
+    """Identifies a search for its checkpoints, so a checkpoint is only resumed by the same search
+        Parameters:
+            initial_game (Game): Initial game of the search
+            parameters: Parameters of the search that change its result (e.g. macro, heuristic)
+        Returns:
+            signature (str): Map hash (see map_hash), initial state, pruning options and parameters
+    """
+    return repr((map_hash(initial_game), initial_game.get_state(), initial_game.prune_deadlocks,
+                 initial_game.compound_macros, parameters))
+
+def resume_search(checkpoint, algorithm, signature, stats):
+    """Loads the last checkpoint of a search and restores its counters
+        Parameters:
+            checkpoint (Checkpoint): Checkpoint files of the search, None for no checkpoints
+            algorithm (str): Name of the search algorithm
+            signature (str): Map and parameters of the search (see checkpoint_signature)
+            stats (SearchStats): Counters of the search, restored from the checkpoint
+        Returns:
+            state (dict): Search state of the checkpoint, with the time already spent in seconds under "time",
+                None to start from the beginning
+            records (dict): Dictionaries saved incrementally (see Checkpoint.load)
+    """
+    if checkpoint is None:
+        return None, {}
+    state, records = checkpoint.load(algorithm, signature)
+    if state is not None:
+        stats.restore(state["stats"])
+        print(f"Resuming {algorithm} from a checkpoint after {state['time']} seconds")
+    return state, records
+
+def resumed_out_of_time(resumed, stats):
+    """Builds the output of a search resumed with no time left: the time of its checkpoint is charged to max_time,
+    and the checkpoint is kept as it is for a run with a larger max_time
+        Parameters:
+            resumed (dict): Search state of the checkpoint (see resume_search)
+            stats (SearchStats): Counters of the search, restored from the checkpoint
+        Returns:
+            output (dict): Time spent, reason "Time exceeded" and counters
+    """
+    print("Time exceeded")
+    return {"time": resumed["time"], "reason": "Time exceeded", "expanded": stats.expanded, "generated": stats.generated, "stats": stats.finish("Time exceeded")}
+
+def save_checkpoint(checkpoint, algorithm, signature, compute_time, snapshot, state, records=None):
+    """Saves a checkpoint of a search
+        Parameters:
+            checkpoint (Checkpoint): Checkpoint files of the search
+            algorithm (str): Name of the search algorithm
+            signature (str): Map and parameters of the search (see checkpoint_signature)
+            compute_time (float): Seconds spent in the search
+            snapshot (dict): Counters of the search (see SearchStats.snapshot)
+            state (dict): Open list and the rest of the search state
+            records (dict): Dictionaries that only grow, saved incrementally (see Checkpoint.save)
+    """
+    checkpoint.save(algorithm, signature, dict(state, time=compute_time, stats=snapshot), records)
+
+# 13. Search output from the visited nodes
+def build_search_output(total_time, nodes, goal_id, storages, full_output=False, initial_game=None, stats=None):
+    """Builds the output of a search by walking the parent pointers back from the goal
+        Parameters:
+            total_time (float): Time in minutes that the search took
+            nodes (dict): Parent id, move and compact state of each visited node, indexed by state id
+            goal_id (int): Id of the goal state
+            storages (list): Coordinates of the storages
+            full_output (bool): Also add the ids, parent ids and states of all the visited nodes
+            initial_game (Game): Initial game of a macro search, used to recover the walks between the macro moves
+            stats (SearchStats): Counters of the search, finished and added to the output when given
+        Returns:
+            output (dict): Dictionary with the time and the ids, parent ids, states and moves of the
+                solution path. The path goes from the goal to the initial state, the moves from the
+                initial state to the goal.
+    """
+    ids = []
+    parent_ids = []
+    states = []
+    moves = []
+    state_id = goal_id
+    while state_id >= 0:
+        parent_id, move, state = nodes[state_id]
+        ids.append(state_id)
+        parent_ids.append(parent_id)
+        states.append(state_to_dict(state, storages))
+        if move is not None:
+            moves.append(move)
+        state_id = parent_id
+    moves.reverse()
+    if initial_game is not None:
+        replay_game = Game(initial_game.get_current_state(), initial_game.blanks, initial_game.board)
+        moves = replay_game.expand_macro_moves(moves)
+    
+    output = {"time": total_time, "ids": ids, "parent_ids": parent_ids, "states": states, "moves": moves_to_string(moves)}
+    if stats is not None:
+        output["expanded"] = stats.expanded
+        output["generated"] = stats.generated
+        output["stats"] = stats.finish("Solution found")
+    if full_output:
+        output["visited"] = {
+            "ids": list(nodes),
+            "parent_ids": [node[0] for node in nodes.values()],
+            "states": [state_to_dict(node[2], storages) for node in nodes.values()]
+        }
+    return output
+
+# 14. Get solution path from search output
+def get_solution_path(search_output):
+    """Returns the solution path of a search
+        Parameters:
+            search_output (dict): Output of a search algorithm
+        Returns:
+            time (float): Time in minutes that the search took
+            ids (list): List of ids of the states in the solution path
+            parent_ids (list): List of parent ids of the states in the solution path
+            states (list): List of states in the solution path
+            moves (str): Moves from the initial state to the goal (see moves_to_string)
+    """
+    #Check that a solution was found
+    if "states" in search_output.keys():
+        return search_output["time"], search_output["ids"], search_output["parent_ids"], search_output["states"], search_output["moves"]
+    else:
         return search_output
\ No newline at end of file
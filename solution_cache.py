@@ -0,0 +1,190 @@
+# Persistent cache of the solutions, keyed by the canonical form of a map
+import hashlib
+import json
+import os
+from time import time
+
+from game import DIRECTION_OFFSETS, Game, moves_to_string, string_to_moves
+
+# Directory of the cache files and maximum size of the cache
+CACHE_DIRECTORY = "cache"
+CACHE_MAX_MB = 64
+
+# The 8 rotations and reflections of the grid, as matrices (a, b, c, d) mapping (x, y) to (ax + by, cx + dy).
+# They are orthogonal, so the inverse of each one is its transpose.
+SYMMETRIES = [
+    (1, 0, 0, 1), (0, -1, 1, 0), (-1, 0, 0, -1), (0, 1, -1, 0),
+    (-1, 0, 0, 1), (1, 0, 0, -1), (0, 1, 1, 0), (0, -1, -1, 0)
+]
+
+def transform(symmetry, coords):
+    """
+    Applies a symmetry of the grid to coordinates (or to a direction offset).
+
+    Args:
+        symmetry (tuple): Matrix of the symmetry (see SYMMETRIES).
+        coords (tuple): Coordinates.
+    Returns:
+        coords (tuple): Transformed coordinates.
+    """
+    a, b, c, d = symmetry
+    return (a * coords[0] + b * coords[1], c * coords[0] + d * coords[1])
+
+def inverse(symmetry):
+    """Returns the inverse of a symmetry of the grid."""
+    a, b, c, d = symmetry
+    return (a, c, b, d)
+
+def transform_moves(symmetry, moves):
+    """
+    Applies a symmetry of the grid to the directions of a list of movements.
+
+    Args:
+        symmetry (tuple): Matrix of the symmetry (see SYMMETRIES).
+        moves (list): Movements (direction, type of movement).
+    Returns:
+        moves (list): Transformed movements.
+    """
+    directions = {offset: direction for direction, offset in DIRECTION_OFFSETS.items()}
+    return [(directions[transform(symmetry, DIRECTION_OFFSETS[direction])], movement) for direction, movement in moves]
+
+def canonical_form(game):
+    """
+    Computes the canonical form of a game: the smallest, over the 8 rotations and reflections of the grid,
+    of its blanks (the walls are the rest of the grid), boxes, storages and robot region, translated so the
+    blanks start at (0, 0). The robot region is represented by its smallest cell.
+
+    Args:
+        game (Game): The game instance.
+    Returns:
+        form (tuple): Canonical form of the game.
+        symmetry (tuple): Symmetry that maps the game to its canonical form.
+        offset (tuple): Translation applied after the symmetry.
+    """
+    region = [game.board.coords(cell) for cell in game.reachable_cells()]
+    best = None
+    for symmetry in SYMMETRIES:
+        blanks = [transform(symmetry, blank) for blank in game.blanks]
+        offset = (-min(x for x, y in blanks), -min(y for x, y in blanks))
+
+        def place(coords_list):
+            return sorted((x + offset[0], y + offset[1]) for x, y in (transform(symmetry, coords) for coords in coords_list))
+
+        form = (tuple(place(game.blanks)), tuple(place(game.boxes)), tuple(place(game.storages)), place(region)[0])
+        if best is None or form < best[0]:
+            best = (form, symmetry, offset)
+    return best
+
+class SolutionCache:
+    """
+    On-disk cache of the solutions of the search algorithms. Each map is keyed by a hash of its canonical
+    form (see canonical_form), so the rotations and reflections of a map and the other robot positions of
+    the same robot region share their solutions. The file of a map keeps, for each algorithm, the solution
+    in canonical coordinates along with the limits and the time of the search that found it. When the
+    cache goes over max_mb, the least recently used maps are evicted.
+
+    Args:
+        directory (str): Directory of the cache files.
+        max_mb (float): Maximum size of the cache in MB.
+    """
+    def __init__(self, directory=CACHE_DIRECTORY, max_mb=CACHE_MAX_MB):
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 * 1024
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, form):
+        """Returns the path of the cache file of a canonical form."""
+        return os.path.join(self.directory, hashlib.sha1(repr(form).encode()).hexdigest() + ".json")
+
+    def get(self, game, algorithm):
+        """
+        Looks up the solution of a game found by an algorithm. The robot walks first to the cell the cached
+        solution starts from, in the same robot region.
+
+        Args:
+            game (Game): The game instance.
+            algorithm (str): Name of the algorithm.
+        Returns:
+            output (dict): Output of the search, as built by build_search_output, with the metadata of the
+                entry under "cache". None if the solution is not in the cache.
+        """
+        from search import build_search_output
+        start = time()
+        form, symmetry, offset = canonical_form(game)
+        path = self.path(form)
+        try:
+            with open(path) as infile:
+                entry = json.load(infile)[algorithm]
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(path) # Most recently used
+
+        # Back to the original orientation
+        robot = transform(inverse(symmetry), (entry["robot"][0] - offset[0], entry["robot"][1] - offset[1]))
+        moves = transform_moves(inverse(symmetry), string_to_moves(entry["moves"]))
+
+        replay_game = Game(game.get_current_state(), game.blanks, game.board)
+        walk = replay_game.walk_path(robot)
+        if walk is None:
+            return None
+        nodes = {0: (-1, None, replay_game.get_state())}
+        for move in walk + moves:
+            if not replay_game.check_action(move):
+                return None
+            replay_game.apply(move)
+            nodes[len(nodes)] = (len(nodes) - 1, move, replay_game.get_state())
+        if not replay_game.check_win():
+            return None
+        output = build_search_output((time() - start) / 60, nodes, len(nodes) - 1, game.storages)
+        output["cache"] = {key: value for key, value in entry.items() if key not in ("robot", "moves")}
+        return output
+
+    def put(self, game, output, algorithm, limits=None):
+        """
+        Stores the solution of a search, if it found one, and evicts the least recently used maps
+        when the cache goes over its size.
+
+        Args:
+            game (Game): The game instance, in the initial state of the search.
+            output (dict): Output of the search algorithm.
+            algorithm (str): Name of the algorithm.
+            limits (dict): Limits of the search, e.g. {"max_time": 5}.
+        """
+        if "moves" not in output or "cache" in output:
+            return
+        form, symmetry, offset = canonical_form(game)
+        robot = transform(symmetry, game.robot)
+        entry = {
+            "robot": (robot[0] + offset[0], robot[1] + offset[1]),
+            "moves": moves_to_string(transform_moves(symmetry, string_to_moves(output["moves"]))),
+            "algorithm": algorithm,
+            "limits": limits or {},
+            "search_time": output["time"],
+            "created": time()
+        }
+        path = self.path(form)
+        try:
+            with open(path) as infile:
+                entries = json.load(infile)
+        except (OSError, ValueError):
+            entries = {}
+        entries[algorithm] = entry
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as outfile:
+            json.dump(entries, outfile)
+        os.replace(temporary_path, path)
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used maps until the cache fits in its size."""
+        files = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".json"):
+                stat = os.stat(os.path.join(self.directory, filename))
+                files.append((stat.st_mtime, stat.st_size, filename))
+        total = sum(size for _, size, _ in files)
+        for _, size, filename in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, filename))
+            total -= size
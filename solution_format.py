@@ -0,0 +1,260 @@
+# Compact solution files: a header with the map and the initial state, followed by the moves
+import gzip
+import json
+import struct
+
+from game import MOVES, Game, moves_to_string, string_to_moves
+from pattern_database import map_hash
+
+# Name and version of the format, in the header of every file
+SOLUTION_FORMAT = "pukoban-solution"
+SOLUTION_VERSION = 1
+
+# Binary files start with the magic bytes and the length of the header. Each move is a nibble (its index in
+# MOVES), two per byte, and the moves end with the END_OF_MOVES nibble.
+BINARY_MAGIC = b"PKSB"
+END_OF_MOVES = 0xF
+MOVE_CODES = {move: code for code, move in enumerate(MOVES)}
+
+# Number of characters (or bytes in binary files) read at once
+READ_CHUNK_SIZE = 1 << 16
+
+def solution_variant(path):
+    """
+    Returns the variant of a solution file from its name: "binary" for .solb, "gzip" for .gz
+    (e.g. .sol.gz) and "text" otherwise.
+    """
+    if path.endswith(".solb"):
+        return "binary"
+    if path.endswith(".gz"):
+        return "gzip"
+    return "text"
+
+def solution_header(game, algorithm=None):
+    """
+    Builds the header of the solution of a game.
+
+    Args:
+        game (Game): The game instance, in the initial state of the solution.
+        algorithm (str): Name of the algorithm that found the solution.
+    Returns:
+        header (dict): Format, map hash (see map_hash), algorithm, blanks and initial state.
+    """
+    return {
+        "format": SOLUTION_FORMAT,
+        "version": SOLUTION_VERSION,
+        "map_hash": map_hash(game),
+        "algorithm": algorithm,
+        "blanks": [list(blank) for blank in game.blanks],
+        "robot": list(game.robot),
+        "boxes": [list(box) for box in game.boxes],
+        "storages": [list(storage) for storage in game.storages]
+    }
+
+class SolutionWriter:
+    """
+    Writes a solution file incrementally: the header when it is opened, the moves as they are passed to
+    write, and a footer (the number of moves and any other fields, e.g. the time of the search or the reason
+    why there is no solution) when it is closed. A text file is the header as a JSON line, the moves as one
+    line of LURD movements (see moves_to_string) and the footer as a JSON line. A gzip file is a compressed
+    text file, and a binary file packs two moves per byte.
+
+    Args:
+        path (str): Path of the file, its extension sets the variant (see solution_variant).
+        game (Game): The game instance, in the initial state of the solution.
+        algorithm (str): Name of the algorithm that found the solution.
+    """
+    def __init__(self, path, game, algorithm=None):
+        self.variant = solution_variant(path)
+        self.length = 0
+        self.pending = None # Nibble of a binary file waiting for the next move
+        header = json.dumps(solution_header(game, algorithm))
+        if self.variant == "binary":
+            self.file = open(path, "wb")
+            self.file.write(BINARY_MAGIC + struct.pack(">I", len(header)) + header.encode())
+        else:
+            self.file = gzip.open(path, "wt") if self.variant == "gzip" else open(path, "w")
+            self.file.write(header + "\n")
+
+    def write(self, moves):
+        """
+        Appends moves to the file.
+
+        Args:
+            moves (list or str): Movements as (direction, type of movement) tuples, or encoded by moves_to_string.
+        """
+        if isinstance(moves, str):
+            moves = string_to_moves(moves)
+        if self.variant == "binary":
+            packed = bytearray()
+            for move in moves:
+                if self.pending is None:
+                    self.pending = MOVE_CODES[move]
+                else:
+                    packed.append(self.pending << 4 | MOVE_CODES[move])
+                    self.pending = None
+            self.file.write(packed)
+        else:
+            self.file.write(moves_to_string(moves))
+        self.length += len(moves)
+
+    def close(self, **footer):
+        """
+        Writes the footer and closes the file.
+
+        Args:
+            footer: Fields of the footer, besides the number of moves.
+        """
+        if self.file is None:
+            return
+        footer = json.dumps(dict(footer, length=self.length))
+        if self.variant == "binary":
+            end = END_OF_MOVES << 4 | END_OF_MOVES if self.pending is None else self.pending << 4 | END_OF_MOVES
+            self.file.write(bytes([end]) + footer.encode())
+        else:
+            self.file.write("\n" + footer + "\n")
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SolutionReader:
+    """
+    Reads a solution file written by SolutionWriter as a stream: the header when it is opened, the moves in
+    chunks, and the footer once the moves are read, so long solutions are never held in memory at once.
+
+    Args:
+        path (str): Path of the file, its extension sets the variant (see solution_variant).
+    """
+    def __init__(self, path):
+        self.variant = solution_variant(path)
+        self.footer = None
+        if self.variant == "binary":
+            self.file = open(path, "rb")
+            if self.file.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+                self.file.close()
+                raise ValueError(f"{path} is not a binary solution file")
+            header_length = struct.unpack(">I", self.file.read(4))[0]
+            self.header = json.loads(self.file.read(header_length))
+        else:
+            self.file = gzip.open(path, "rt") if self.variant == "gzip" else open(path)
+            self.header = json.loads(self.file.readline())
+        if self.header.get("format") != SOLUTION_FORMAT:
+            self.file.close()
+            raise ValueError(f"{path} is not a solution file")
+
+    def chunks(self):
+        """
+        Generates the moves of the file in chunks, and reads the footer after the last one.
+
+        Returns:
+            chunks (generator): Moves encoded by moves_to_string.
+        """
+        while True:
+            chunk = self.file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                raise ValueError("Truncated solution file")
+            if self.variant == "binary":
+                moves = []
+                for position, byte in enumerate(chunk):
+                    for code in (byte >> 4, byte & 0xF):
+                        if code == END_OF_MOVES:
+                            break
+                        moves.append(MOVES[code])
+                    else:
+                        continue
+                    yield moves_to_string(moves)
+                    self.footer = json.loads(chunk[position + 1:] + self.file.read())
+                    return
+                yield moves_to_string(moves)
+            else:
+                end = chunk.find("\n")
+                if end < 0:
+                    yield chunk
+                    continue
+                yield chunk[:end]
+                self.footer = json.loads(chunk[end + 1:] + self.file.read())
+                return
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def read_solution(path):
+    """
+    Reads a whole solution file.
+
+    Args:
+        path (str): Path of the solution file.
+    Returns:
+        header (dict): Header of the file (see solution_header).
+        moves (str): Moves encoded by moves_to_string.
+        footer (dict): Footer of the file, with the number of moves under "length".
+    """
+    with SolutionReader(path) as reader:
+        moves = "".join(reader.chunks())
+        return reader.header, moves, reader.footer
+
+def solution_summary(path):
+    """
+    Summarizes a solution file without keeping its moves in memory.
+
+    Args:
+        path (str): Path of the solution file.
+    Returns:
+        summary (dict): Algorithm and map hash of the header, the footer, and the number of moves,
+            pushes and pulls.
+    """
+    pushes = pulls = length = 0
+    with SolutionReader(path) as reader:
+        for chunk in reader.chunks():
+            length += len(chunk) // 2
+            pushes += chunk.count("P")
+            pulls += chunk.count("p")
+        return dict(reader.footer, algorithm=reader.header["algorithm"], map_hash=reader.header["map_hash"],
+                    length=length, pushes=pushes, pulls=pulls)
+
+def validate_solution(path, game=None):
+    """
+    Replays a solution file move by move with the rules of Game, in place, and checks that it ends with every
+    box on a storage.
+
+    Args:
+        path (str): Path of the solution file.
+        game (Game): The game the solution should solve. When given, its map and initial state must be the
+            ones of the header. None replays the map of the header.
+    Returns:
+        result (dict): "valid" (bool), "length" (number of moves replayed) and, if it is not valid, "error".
+    """
+    with SolutionReader(path) as reader:
+        header = reader.header
+        if game is not None and (header["map_hash"] != map_hash(game) or header["robot"] != list(game.robot)
+                                 or sorted(header["boxes"]) != sorted(list(box) for box in game.boxes)):
+            return {"valid": False, "length": 0, "error": "The solution is for another map or initial state"}
+        state = {
+            "robot": tuple(header["robot"]),
+            "boxes": [tuple(box) for box in header["boxes"]],
+            "storages": [tuple(storage) for storage in header["storages"]]
+        }
+        replay_game = Game(state, [tuple(blank) for blank in header["blanks"]], game.board if game is not None else None)
+        length = 0
+        for chunk in reader.chunks():
+            for move in string_to_moves(chunk):
+                if not replay_game.check_action(move):
+                    return {"valid": False, "length": length, "error": f"Illegal move {''.join(move)} at step {length}"}
+                replay_game.apply(move)
+                length += 1
+        if reader.footer["length"] != length:
+            return {"valid": False, "length": length, "error": f"The footer counts {reader.footer['length']} moves"}
+        if not replay_game.check_win():
+            return {"valid": False, "length": length, "error": "Some boxes are not on a storage"}
+        return {"valid": True, "length": length}
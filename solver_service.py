@@ -0,0 +1,278 @@
+# Batch solving service: maps in, results out, as JSON lines, solved by a pool of worker processes
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+from collections import OrderedDict
+from contextlib import redirect_stdout
+from functools import partial
+from multiprocessing.connection import wait
+from time import time
+
+from benchmark import ALGORITHMS, DEADLINE_GRACE
+from game import Game, map2objects
+
+# Settings of a task that does not give its own
+TASK_DEFAULTS = {
+    "algorithm": "a_star",
+    "time": 1,
+    "memory": None,
+    "heuristic": None,
+    "macro": False
+}
+
+# Heuristics a task can ask for, None for the default one of the algorithm
+HEURISTICS = [None, "manhattan", "distance", "matching"]
+
+# Number of compiled maps kept for the next tasks on the same map
+MAP_CACHE_SIZE = 64
+
+def is_number(value):
+    """
+    Checks if a JSON value is a number (booleans are not).
+
+    Args:
+        value: Value of a setting.
+    Returns:
+        is_number (bool): True for an int or a float.
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def task_error(task):
+    """
+    Checks the settings of a task.
+
+    Args:
+        task (dict): Settings of the task, with the defaults (see read_tasks).
+    Returns:
+        error (str): Why the task is not valid, None for a valid task.
+    """
+    if not isinstance(task.get("map"), str):
+        return "Missing map"
+    if not isinstance(task["algorithm"], str) or task["algorithm"] not in ALGORITHMS:
+        return f"Unknown algorithm '{task['algorithm']}', expected one of {sorted(ALGORITHMS)}"
+    if not is_number(task["time"]) or not task["time"] > 0:
+        return f"Invalid time {task['time']!r}, expected a positive number of minutes"
+    if task["memory"] is not None and (not is_number(task["memory"]) or not task["memory"] > 0):
+        return f"Invalid memory {task['memory']!r}, expected a positive number of MB or null"
+    if task["heuristic"] not in HEURISTICS:
+        return f"Unknown heuristic {task['heuristic']!r}, expected one of {HEURISTICS}"
+    if not isinstance(task["macro"], bool):
+        return f"Invalid macro {task['macro']!r}, expected true or false"
+    return None
+
+def read_tasks(infile, defaults=TASK_DEFAULTS):
+    """
+    Reads the tasks of a batch, one JSON object per line, as they come. A task has the map (in the format
+    parsed by map2objects) under "map", and optionally an "id" (the line number by default), the "algorithm"
+    (see benchmark.ALGORITHMS), the "time" limit in minutes, the "memory" limit in MB, the "heuristic" and
+    "macro". The settings left out are taken from defaults, the others are checked (see task_error).
+
+    Args:
+        infile (file): Input stream, e.g. sys.stdin.
+        defaults (dict): Settings of the tasks that do not give their own (see TASK_DEFAULTS).
+    Returns:
+        tasks (generator): Settings of each task. A line that is not a valid task gives its id and an "error".
+    """
+    for line_number, line in enumerate(infile, 1):
+        if not line.strip():
+            continue
+        try:
+            task = json.loads(line)
+        except ValueError as error:
+            yield {"id": line_number, "error": f"Invalid JSON: {error}"}
+            continue
+        if not isinstance(task, dict):
+            yield {"id": line_number, "error": "A task must be a JSON object"}
+            continue
+        task = dict(defaults, **task)
+        task.setdefault("id", line_number)
+        error = task_error(task)
+        if error is not None:
+            task["error"] = error
+        yield task
+
+def compile_map(game_map, maps):
+    """
+    Parses a map and builds its board, or takes them from the maps already compiled.
+
+    Args:
+        game_map (str): Map in the format parsed by map2objects.
+        maps (OrderedDict): Compiled maps by map, least recently used first, updated in place.
+    Returns:
+        objects (dict): Initial state, blanks and board of the map (see map2objects).
+    """
+    if game_map in maps:
+        maps.move_to_end(game_map)
+        return maps[game_map]
+    objects = map2objects(game_map)
+    maps[game_map] = objects
+    if len(maps) > MAP_CACHE_SIZE:
+        maps.popitem(last=False)
+    return objects
+
+def run_task(task, objects, connection):
+    """
+    Runs the search of a task in a worker process, with the address space capped to its memory limit,
+    and sends the result through the connection. The messages of the search go to stderr, so they never
+    mix with the results on stdout.
+
+    Args:
+        task (dict): Settings of the task (see read_tasks).
+        objects (dict): Compiled map of the task (see compile_map).
+        connection (Connection): Write end of the pipe of the task.
+    """
+    if task["memory"]:
+        limit = int(task["memory"] * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    algorithm, takes_heuristic = ALGORITHMS[task["algorithm"]]
+    if takes_heuristic and task["heuristic"]:
+        algorithm = partial(algorithm, heuristic=task["heuristic"])
+    game = Game(objects["state"], objects["blanks"], objects["board"])
+    start = time()
+    try:
+        with redirect_stdout(sys.stderr):
+            output = algorithm(game, objects["blanks"], task["time"], macro=task["macro"])
+    except MemoryError:
+        output = {"reason": "Memory exceeded"}
+    wall_time = time() - start
+
+    expanded = output.get("expanded", 0)
+    generated = output.get("generated", 0)
+    # ru_maxrss is in KB on Linux. The children are the workers of the parallel searches.
+    peak_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    connection.send({
+        "solved": "moves" in output,
+        "reason": output.get("reason", "Solution found"),
+        "moves": output.get("moves"),
+        "length": len(output["moves"]) // 2 if "moves" in output else None,
+        "expanded": expanded,
+        "generated": generated,
+        "stats": output.get("stats"),
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+        "wall_time": round(wall_time, 4)
+    })
+    connection.close()
+
+def task_result(task, measures):
+    """
+    Builds the result line of a task.
+
+    Args:
+        task (dict): Settings of the task (see read_tasks).
+        measures (dict): Result of the search (see run_task), or the reason why it has none.
+    Returns:
+        result (dict): Id and settings of the task followed by the measures.
+    """
+    result = {"id": task["id"]}
+    result.update({key: task.get(key) for key in TASK_DEFAULTS})
+    result["solved"] = False
+    result.update(measures)
+    return result
+
+def serve(infile, outfile, workers=None, defaults=TASK_DEFAULTS):
+    """
+    Solves the tasks of a batch with a pool of worker processes. The tasks are read as workers become
+    free, each runs in its own process, stopped if it goes over its time limit, and its result is written
+    as a JSON line as soon as it completes, so the results come out of order. A map repeated over several
+    tasks is compiled once, and the workers inherit the compiled map.
+
+    Args:
+        infile (file): Input stream of the tasks (see read_tasks).
+        outfile (file): Output stream of the results (see task_result).
+        workers (int): Number of tasks run at once, the number of CPUs by default.
+        defaults (dict): Settings of the tasks that do not give their own (see TASK_DEFAULTS).
+    Returns:
+        counts (dict): Number of "tasks", of tasks "solved" and of tasks "failed" (invalid tasks and maps,
+            crashed workers).
+    """
+    workers = workers or multiprocessing.cpu_count()
+    tasks = read_tasks(infile, defaults)
+    maps = OrderedDict()
+    running = {} # Process, task and deadline by read end of the pipe of each running task
+    counts = {"tasks": 0, "solved": 0, "failed": 0}
+
+    def write(result):
+        outfile.write(json.dumps(result) + "\n")
+        outfile.flush()
+        counts["tasks"] += 1
+        counts["solved"] += result["solved"]
+        counts["failed"] += "error" in result
+
+    exhausted = False
+    while True:
+        # Start tasks until every worker is busy
+        while not exhausted and len(running) < workers:
+            task = next(tasks, None)
+            if task is None:
+                exhausted = True
+                break
+            if "error" not in task:
+                try:
+                    objects = compile_map(task["map"], maps)
+                except Exception as error:
+                    task["error"] = f"Invalid map: {error}"
+            if "error" in task:
+                write(task_result(task, {"reason": "Error", "error": task["error"]}))
+                continue
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=run_task, args=(task, objects, writer))
+            process.start()
+            writer.close()
+            running[reader] = (process, task, time() + task["time"] * 60 + DEADLINE_GRACE)
+        if not running:
+            break
+
+        # Wait for a result, a worker exit or the next deadline
+        timeout = max(min(deadline for process, task, deadline in running.values()) - time(), 0)
+        wait(list(running) + [process.sentinel for process, task, deadline in running.values()], timeout)
+        for reader, (process, task, deadline) in list(running.items()):
+            try:
+                measures = reader.recv() if reader.poll() else None
+            except EOFError:
+                measures = None # The worker exited without a result
+            if measures is None:
+                if process.is_alive() and time() < deadline:
+                    continue
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+                    measures = {"reason": "Time exceeded"}
+                elif process.exitcode < 0:
+                    measures = {"reason": "Error", "error": f"Killed by signal {-process.exitcode}"}
+                else:
+                    measures = {"reason": "Error", "error": f"Exit code {process.exitcode}"}
+            process.join()
+            reader.close()
+            del running[reader]
+            write(task_result(task, measures))
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch solving service: reads tasks as JSON lines and writes their results as JSON lines")
+    parser.add_argument("input", nargs="?", default="-", help="File of tasks, one JSON object per line (stdin by default)")
+    parser.add_argument("--output", default="-", help="File of results, one JSON object per line (stdout by default)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of tasks run at once (the number of CPUs by default)")
+    parser.add_argument("--algorithm", default=TASK_DEFAULTS["algorithm"], choices=list(ALGORITHMS), help="Algorithm of the tasks that do not give one")
+    parser.add_argument("--time", type=float, default=TASK_DEFAULTS["time"], help="Time limit of the tasks that do not give one (in minutes)")
+    parser.add_argument("--memory", type=int, default=TASK_DEFAULTS["memory"], help="Memory limit of the tasks that do not give one (in MB)")
+    parser.add_argument("--heuristic", default=TASK_DEFAULTS["heuristic"], choices=HEURISTICS[1:])
+    parser.add_argument("--macro", action="store_true", help="Run the tasks that do not say otherwise in macro mode")
+    args = parser.parse_args()
+
+    defaults = {"algorithm": args.algorithm, "time": args.time, "memory": args.memory, "heuristic": args.heuristic, "macro": args.macro}
+    infile = sys.stdin if args.input == "-" else open(args.input)
+    outfile = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        counts = serve(infile, outfile, args.workers, defaults)
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    print(f"{counts['tasks']} tasks, {counts['solved']} solved, {counts['failed']} failed", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
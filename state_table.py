@@ -0,0 +1,156 @@
+# Table of packed states in fixed-width records, with a hard memory cap
+import struct
+from array import array
+
+# Payload of each record after the packed state: id of the parent entry and g(n) (the depth in BFS)
+PAYLOAD = struct.Struct(">IH")
+NO_PARENT = 0xFFFFFFFF
+
+# Slots of the index when the table is created, and maximum load before the index doubles
+INITIAL_SLOTS = 1 << 12
+MAX_LOAD = 0.75
+
+# Bits of the bitstate filter per stored state once the table degrades (see PackedStateTable.degrade)
+FILTER_BITS = 8
+
+# Value of find for a state the bitstate filter has (maybe) seen
+FILTERED = -2
+
+class PackedStateTable:
+    """Stores the states of a search as fixed-width records in one bytearray: the packed state (see StatePacker)
+    followed by the parent entry and g(n). The records are appended, so each entry has a stable integer id and
+    the entries can be read back in insertion order (the BFS queue). An open addressing index over an array of
+    entry ids finds the entry of a state. The bytes of the records and of the index never go over memory_mb:
+    append fails instead, and the search can stop or call degrade to carry on with less memory per state.
+        Parameters:
+            state_size (int): Bytes of a packed state
+            memory_mb (float): Maximum size of the records and the index in MB
+    """
+    def __init__(self, state_size, memory_mb):
+        self.state_size = state_size
+        self.record_size = state_size + PAYLOAD.size
+        self.max_bytes = int(memory_mb * 1024 * 1024)
+        self.records = bytearray()
+        self.count = 0
+        self.index = array("I", bytes(4 * INITIAL_SLOTS)) # Entry id + 1 in each slot, 0 for an empty slot
+        self.filter = None # Bitstate filter that replaces the index once the table degrades
+
+    def __len__(self):
+        return self.count
+
+    def memory_bytes(self):
+        """Returns the bytes used by the records, the index and the filter"""
+        index_bytes = len(self.index) * self.index.itemsize if self.index is not None else 0
+        filter_bytes = len(self.filter) if self.filter is not None else 0
+        return len(self.records) + index_bytes + filter_bytes
+
+    def find(self, state):
+        """Finds the entry of a packed state
+            Parameters:
+                state (bytes): Packed state
+            Returns:
+                entry (int): Id of the entry, -1 if the state is not stored, FILTERED if the table degraded
+                    and the filter may have seen the state
+        """
+        if self.index is None:
+            return FILTERED if self.in_filter(state) else -1
+        index = self.index
+        records = self.records
+        mask = len(index) - 1
+        slot = hash(state) & mask
+        while index[slot]:
+            start = (index[slot] - 1) * self.record_size
+            if records[start:start + self.state_size] == state:
+                return index[slot] - 1
+            slot = (slot + 1) & mask
+        return -1
+
+    def append(self, state, parent, g, reserved=0):
+        """Stores a new state (see find), unless it would take the table over its memory cap
+            Parameters:
+                state (bytes): Packed state
+                parent (int): Id of the parent entry, NO_PARENT for the root
+                g (int): g(n) of the state
+                reserved (int): Bytes used by the rest of the search (e.g. the open list), counted in the cap
+            Returns:
+                entry (int): Id of the new entry, -1 if the memory cap is reached
+        """
+        needed = self.memory_bytes() + self.record_size + reserved
+        if self.index is not None and self.count + 1 > MAX_LOAD * len(self.index):
+            # The old and the new index are both alive while it doubles
+            needed += 2 * len(self.index) * self.index.itemsize
+            if needed > self.max_bytes:
+                return -1
+            self.grow()
+        elif needed > self.max_bytes:
+            return -1
+        entry = self.count
+        self.records += state + PAYLOAD.pack(parent, g)
+        self.count += 1
+        if self.index is not None:
+            self.insert(state, entry)
+        else:
+            self.add_to_filter(state)
+        return entry
+
+    def insert(self, state, entry):
+        """Adds an entry to the index"""
+        index = self.index
+        mask = len(index) - 1
+        slot = hash(state) & mask
+        while index[slot]:
+            slot = (slot + 1) & mask
+        index[slot] = entry + 1
+
+    def grow(self):
+        """Doubles the index and inserts every entry again"""
+        self.index = array("I", bytes(2 * len(self.index) * self.index.itemsize))
+        for entry in range(self.count):
+            self.insert(self.state(entry), entry)
+
+    def degrade(self):
+        """Replaces the index by a bitstate filter of FILTER_BITS bits per state, which takes a fraction of its
+        memory and leaves the rest for more records. The duplicate detection becomes partial: two hashes of
+        a state are set in the filter, so a new state whose bits are all set by other states is taken as
+        visited and dropped. The search is then no longer complete nor optimal, but it never runs out of memory.
+            Returns:
+                degraded (bool): True if memory was freed, False if the table had already degraded
+        """
+        if self.index is None:
+            return False
+        size = 1
+        while size * 8 < FILTER_BITS * max(self.count, INITIAL_SLOTS):
+            size *= 2
+        self.index = None
+        self.filter = bytearray(size)
+        for entry in range(self.count):
+            self.add_to_filter(self.state(entry))
+        return True
+
+    def filter_bits(self, state):
+        """Returns the two bits of a state in the filter"""
+        key = hash(state)
+        mask = len(self.filter) * 8 - 1
+        return key & mask, (key >> 32) & mask
+
+    def in_filter(self, state):
+        """Checks if both bits of a state are set in the filter"""
+        return all(self.filter[bit >> 3] >> (bit & 7) & 1 for bit in self.filter_bits(state))
+
+    def add_to_filter(self, state):
+        """Sets the bits of a state in the filter"""
+        for bit in self.filter_bits(state):
+            self.filter[bit >> 3] |= 1 << (bit & 7)
+
+    def state(self, entry):
+        """Returns the packed state of an entry"""
+        start = entry * self.record_size
+        return bytes(self.records[start:start + self.state_size])
+
+    def payload(self, entry):
+        """Returns the parent entry and g(n) of an entry"""
+        return PAYLOAD.unpack_from(self.records, entry * self.record_size + self.state_size)
+
+    def set_payload(self, entry, parent, g):
+        """Changes the parent entry and g(n) of an entry, when a shorter path to its state is found"""
+        PAYLOAD.pack_into(self.records, entry * self.record_size + self.state_size, parent, g)
@@ -0,0 +1,32 @@
+# Shared maps of the tests, run from the root of the repository with python -m pytest
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game import Game, map2objects
+
+# Small map solved in 23 movements, with the robot pushing and pulling
+TINY_MAP = """OOOOOO
+O BR O
+O BO O
+OO   O
+OOSS O
+OOOOOO"""
+
+# Map with one box next to its storage
+ONE_PUSH_MAP = """OOOOO
+ORBSO
+OOOOO"""
+
+@pytest.fixture
+def tiny():
+    """Compiled tiny map (see map2objects)"""
+    return map2objects(TINY_MAP)
+
+@pytest.fixture
+def tiny_game(tiny):
+    """Game of the tiny map in its initial state"""
+    return Game(tiny["state"], tiny["blanks"], tiny["board"])
@@ -0,0 +1,40 @@
+import numpy as np
+
+from batch import BatchBoard, unique_unvisited
+from game import MOVES, Game, state_from_dict
+from search import batch_breadth_first_search
+
+def test_expand_matches_the_game_successors(tiny, tiny_game):
+    board = tiny["board"]
+    batch_board = BatchBoard(board, tiny_game.storages)
+    # The initial state and every state one movement away
+    states = [tiny_game.get_state()] + [state_from_dict(state) for _, state in tiny_game.successors()]
+    parents, moves, robots, boxes = batch_board.expand(*batch_board.batch(states))
+    for index, state in enumerate(states):
+        game = Game({"robot": state.robot, "boxes": list(state.boxes), "storages": tiny_game.storages}, tiny["blanks"], board)
+        expected = {(move, state_from_dict(next_state)) for move, next_state in game.successors()}
+        found = {(MOVES[move], (board.coords(robot), tuple(sorted(board.coords(box) for box in next_boxes))))
+                 for move, robot, next_boxes in zip(moves[parents == index], robots[parents == index], boxes[parents == index])}
+        assert found == expected
+
+def test_keys_match_the_zobrist_keys(tiny, tiny_game):
+    board = tiny["board"]
+    batch_board = BatchBoard(board, tiny_game.storages)
+    states = [tiny_game.get_state()] + [state_from_dict(state) for _, state in tiny_game.successors()]
+    keys = batch_board.keys(*batch_board.batch(states))
+    assert [int(key) for key in keys] == [board.zobrist_key(state.robot, state.boxes) for state in states]
+
+def test_is_goal(tiny, tiny_game):
+    batch_board = BatchBoard(tiny["board"], tiny_game.storages)
+    goal = tiny_game.get_state()._replace(boxes=tuple(sorted(tiny_game.storages)))
+    _, boxes = batch_board.batch([tiny_game.get_state(), goal])
+    assert list(batch_board.is_goal(boxes)) == [False, True]
+
+def test_unique_unvisited_keeps_the_first_new_occurrence_in_order():
+    keys = np.array([7, 3, 7, 5, 3, 9], dtype=np.uint64)
+    visited = np.array([5], dtype=np.uint64)
+    assert list(unique_unvisited(keys, visited)) == [0, 1, 5]
+
+def test_batch_breadth_first_search_finds_the_shortest_solution(tiny, tiny_game):
+    output = batch_breadth_first_search(tiny_game, tiny["blanks"], 1)
+    assert len(output["moves"]) // 2 == 23
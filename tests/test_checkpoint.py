@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+import checkpoint as checkpoint_module
+from checkpoint import SAVE_TIME_RATIO, Checkpoint
+from game import Game
+from search import (
+    anytime_a_star_search,
+    a_star_search,
+    bidirectional_search,
+    breadth_first_search,
+    depth_first_search,
+    greedy_best_search,
+    ida_star_search
+)
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "search.ckpt")
+    nodes = {0: "root", 1: "child"}
+    checkpoint = Checkpoint(path)
+    checkpoint.save("a_star", "map", {"fringe": [1, 2]}, {"nodes": nodes})
+    nodes[2] = "grandchild"
+    checkpoint.save("a_star", "map", {"fringe": [3]}, {"nodes": nodes})
+    state, records = Checkpoint(path).load("a_star", "map")
+    assert state == {"fringe": [3]}
+    assert records == {"nodes": [(0, "root"), (1, "child"), (2, "grandchild")]}
+
+def test_log_only_gets_the_new_entries(tmp_path):
+    path = str(tmp_path / "search.ckpt")
+    nodes = {number: "node" for number in range(1000)}
+    checkpoint = Checkpoint(path)
+    checkpoint.save("a_star", "map", {}, {"nodes": nodes})
+    log_size = os.path.getsize(path + ".log")
+    checkpoint.save("a_star", "map", {}, {"nodes": nodes})
+    assert os.path.getsize(path + ".log") == log_size
+
+def test_log_past_the_checkpoint_is_cut_back(tmp_path):
+    path = str(tmp_path / "search.ckpt")
+    nodes = {0: "root"}
+    checkpoint = Checkpoint(path)
+    checkpoint.save("a_star", "map", {"step": 1}, {"nodes": nodes})
+    log_size = os.path.getsize(path + ".log")
+    with open(path + ".log", "ab") as log:
+        log.write(b"entries of a checkpoint that was never written")
+    state, records = Checkpoint(path).load("a_star", "map")
+    assert state == {"step": 1}
+    assert records == {"nodes": [(0, "root")]}
+    assert os.path.getsize(path + ".log") == log_size
+
+def test_load_ignores_other_searches_and_broken_files(tmp_path):
+    path = str(tmp_path / "search.ckpt")
+    assert Checkpoint(path).load("a_star", "map") == (None, {})
+    Checkpoint(path).save("a_star", "map", {"step": 1}, {"nodes": {0: "root"}})
+    assert Checkpoint(path).load("greedy", "map") == (None, {})
+    assert Checkpoint(path).load("a_star", "other map") == (None, {})
+    os.remove(path + ".log")
+    assert Checkpoint(path).load("a_star", "map") == (None, {})
+    with open(path, "wb") as outfile:
+        outfile.write(b"half written")
+    assert Checkpoint(path).load("a_star", "map") == (None, {})
+
+def test_clear(tmp_path):
+    path = str(tmp_path / "search.ckpt")
+    checkpoint = Checkpoint(path)
+    checkpoint.save("a_star", "map", {}, {"nodes": {0: "root"}})
+    checkpoint.clear()
+    assert os.listdir(tmp_path) == []
+
+def test_slow_saves_space_out_the_checkpoints(tmp_path, monkeypatch):
+    checkpoint = Checkpoint(str(tmp_path / "search.ckpt"), interval=1)
+    clock = iter([100.0, 105.0]) # The save takes 5 seconds
+    monkeypatch.setattr(checkpoint_module, "perf_counter", lambda: next(clock))
+    checkpoint.save("a_star", "map", {})
+    assert checkpoint.next_save == 105.0 + SAVE_TIME_RATIO * 5.0
+
+@pytest.mark.parametrize("search", [
+    breadth_first_search,
+    depth_first_search,
+    greedy_best_search,
+    a_star_search,
+    ida_star_search,
+    bidirectional_search,
+    anytime_a_star_search
+])
+def test_resumed_search_finds_the_same_solution(tmp_path, tiny, search):
+    expected = search(Game(tiny["state"], tiny["blanks"], tiny["board"]), tiny["blanks"], 1)
+    path = str(tmp_path / "search.ckpt")
+    runs = 0
+    while True:
+        runs += 1
+        # The budget grows by less than a millisecond at every run, with a checkpoint at every step
+        output = search(Game(tiny["state"], tiny["blanks"], tiny["board"]), tiny["blanks"], 0.00001 * runs,
+                        checkpoint=Checkpoint(path, interval=0))
+        # Anytime A* keeps its checkpoint to improve its solution until it proves it optimal
+        if output.get("reason") != "Time exceeded" and output.get("optimal", True):
+            break
+    assert runs > 1
+    assert output["moves"] == expected["moves"]
+    assert os.listdir(tmp_path) == []
+
+@pytest.mark.parametrize("search", [breadth_first_search, a_star_search, ida_star_search, bidirectional_search])
+def test_resumed_search_is_charged_the_time_already_spent(tmp_path, tiny, search):
+    path = str(tmp_path / "search.ckpt")
+    first = search(Game(tiny["state"], tiny["blanks"], tiny["board"]), tiny["blanks"], 0.00001, checkpoint=Checkpoint(path))
+    assert first["reason"] == "Time exceeded"
+    saved = open(path, "rb").read()
+    # The same budget again: nothing is left, the search stops at once and keeps its checkpoint
+    output = search(Game(tiny["state"], tiny["blanks"], tiny["board"]), tiny["blanks"], 0.00001, checkpoint=Checkpoint(path))
+    assert output["reason"] == "Time exceeded"
+    assert output["time"] == first["time"]
+    assert output["expanded"] == first["expanded"]
+    assert open(path, "rb").read() == saved
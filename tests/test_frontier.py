@@ -0,0 +1,39 @@
+import pytest
+
+from frontier import FifoFrontier, LifoFrontier, PriorityFrontier, make_frontier
+
+def test_fifo_pops_oldest_first():
+    fringe = FifoFrontier()
+    for item in "abc":
+        fringe.push(item)
+    assert len(fringe) == 3
+    assert [fringe.pop() for _ in range(3)] == ["a", "b", "c"]
+    assert len(fringe) == 0
+
+def test_lifo_pops_newest_first():
+    fringe = LifoFrontier()
+    for item in "abc":
+        fringe.push(item)
+    assert [fringe.pop() for _ in range(3)] == ["c", "b", "a"]
+
+def test_priority_pops_lowest_first_and_ties_in_insertion_order():
+    fringe = PriorityFrontier()
+    # Unorderable items: the ties must never compare them
+    items = [{"name": "b"}, {"name": "a1"}, {"name": "c"}, {"name": "a2"}]
+    for item, priority in zip(items, [2, 1, 3, 1]):
+        fringe.push(item, priority)
+    assert fringe.peek() == 1
+    assert [fringe.pop()["name"] for _ in range(4)] == ["a1", "a2", "b", "c"]
+
+def test_priority_takes_tuples():
+    fringe = PriorityFrontier()
+    fringe.push("deep", (5, -3))
+    fringe.push("shallow", (5, -1))
+    assert fringe.pop() == "deep"
+
+def test_make_frontier():
+    assert isinstance(make_frontier("fifo"), FifoFrontier)
+    assert isinstance(make_frontier("lifo"), LifoFrontier)
+    assert isinstance(make_frontier("priority"), PriorityFrontier)
+    with pytest.raises(ValueError):
+        make_frontier("stack")
@@ -0,0 +1,16 @@
+from game import map2objects
+
+def test_frozen_cluster_drops_the_boxes_frozen_against_a_free_box():
+    # Checking (5, 1) finds (3, 3) frozen while (4, 3) takes it as a wall, but (4, 3) turns out free, so (3, 3)
+    # must not stay in the cluster
+    board = map2objects("OOOOOOO\nOR   OO\nO  O  O\nO  O  O\nOOOOOOO")["board"]
+    boxes = [(5, 1), (2, 3), (3, 3), (4, 3), (4, 1)]
+    cluster = board.frozen_cluster(board.mask(boxes), board.cell((5, 1)))
+    assert {board.coords(cell) for cell in cluster} == {(5, 1)}
+
+def test_frozen_cluster_of_a_box_that_can_neither_be_pushed_nor_pulled():
+    # In a 2x2 room a box has no room to be pushed or pulled, while in a wider room it can be pulled out of its corner
+    board = map2objects("OOOOO\nOOR O\nOO  O\nOOOOO")["board"]
+    assert board.frozen_cluster(board.mask([(3, 2)]), board.cell((3, 2))) == {board.cell((3, 2))}
+    board = map2objects("OOOOO\nOR  O\nO   O\nOOOOO")["board"]
+    assert board.frozen_cluster(board.mask([(3, 2)]), board.cell((3, 2))) == set()
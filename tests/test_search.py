@@ -0,0 +1,30 @@
+from game import Game, map2objects
+from search import anytime_a_star_search
+
+# Map whose first weighted solution is 24 movements long and the optimal one 20
+LARGE_MAP = """OOOOOOOOO
+OO  OOOOO
+OOB OOOOO
+O B B   O
+ORSSSSSO
+O BS   OO
+OOBO OOOO
+OO   OOOO
+OOOOOOOOO"""
+
+def test_anytime_a_star_improves_its_solution_until_it_is_optimal():
+    objects = map2objects(LARGE_MAP)
+    output = anytime_a_star_search(Game(objects["state"], objects["blanks"], objects["board"]), objects["blanks"], 1,
+                                   heuristic="matching")
+    costs = [improvement["cost"] for improvement in output["improvements"]]
+    weights = [improvement["weight"] for improvement in output["improvements"]]
+    assert len(costs) > 1
+    assert costs == sorted(costs, reverse=True) and weights == sorted(weights, reverse=True)
+    assert output["cost"] == costs[-1] == len(output["moves"]) // 2 == 20
+    assert output["lower_bound"] == 20
+    assert output["optimal"]
+
+def test_anytime_a_star_gives_a_lower_bound_when_the_time_is_over(tiny, tiny_game):
+    output = anytime_a_star_search(tiny_game, tiny["blanks"], 0.000001)
+    assert output["reason"] == "Time exceeded"
+    assert 0 < output["lower_bound"] <= 23
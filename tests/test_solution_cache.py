@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from conftest import TINY_MAP
+from game import Game, map2objects, string_to_moves
+from search import a_star_search
+from solution_cache import SYMMETRIES, SolutionCache, canonical_form, inverse, transform
+
+def solves(objects, moves):
+    """Checks that the moves solve the map from its initial state"""
+    game = Game(objects["state"], objects["blanks"], objects["board"])
+    for move in string_to_moves(moves):
+        if not game.check_action(move):
+            return False
+        game.apply(move)
+    return game.check_win()
+
+@pytest.fixture
+def solved(tiny, tiny_game):
+    """Output of A* on the tiny map"""
+    return a_star_search(tiny_game, tiny["blanks"], 1)
+
+def test_inverse_undoes_every_symmetry():
+    for symmetry in SYMMETRIES:
+        assert transform(inverse(symmetry), transform(symmetry, (2, -5))) == (2, -5)
+
+def test_canonical_form_is_the_same_for_a_mirrored_map(tiny_game):
+    mirrored = map2objects("\n".join(row[::-1] for row in TINY_MAP.split("\n")))
+    mirrored_game = Game(mirrored["state"], mirrored["blanks"], mirrored["board"])
+    assert canonical_form(mirrored_game)[0] == canonical_form(tiny_game)[0]
+
+def test_put_and_get(tmp_path, tiny, tiny_game, solved):
+    cache = SolutionCache(str(tmp_path))
+    assert cache.get(tiny_game, "a_star") is None
+    cache.put(tiny_game, solved, "a_star", {"max_time": 1})
+    output = cache.get(tiny_game, "a_star")
+    assert output["moves"] == solved["moves"]
+    assert output["cache"]["algorithm"] == "a_star"
+    assert output["cache"]["limits"] == {"max_time": 1}
+    assert cache.get(tiny_game, "greedy") is None
+
+def test_get_replays_the_solution_on_a_mirrored_map(tmp_path, tiny_game, solved):
+    cache = SolutionCache(str(tmp_path))
+    cache.put(tiny_game, solved, "a_star")
+    mirrored = map2objects("\n".join(row[::-1] for row in TINY_MAP.split("\n")))
+    output = cache.get(Game(mirrored["state"], mirrored["blanks"], mirrored["board"]), "a_star")
+    assert len(output["moves"]) == len(solved["moves"])
+    assert solves(mirrored, output["moves"])
+
+def test_put_skips_the_searches_without_solution(tmp_path, tiny_game):
+    cache = SolutionCache(str(tmp_path))
+    cache.put(tiny_game, {"time": 1, "reason": "Time exceeded"}, "a_star")
+    assert os.listdir(tmp_path) == []
+
+def test_evict_removes_the_least_recently_used_maps(tmp_path, tiny_game, solved):
+    cache = SolutionCache(str(tmp_path), max_mb=0)
+    cache.put(tiny_game, solved, "a_star")
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,93 @@
+import pytest
+
+import solution_format
+from conftest import ONE_PUSH_MAP
+from game import Game, map2objects
+from search import a_star_search
+from solution_format import SolutionWriter, read_solution, solution_summary, validate_solution
+
+VARIANTS = ["solution.sol", "solution.sol.gz", "solution.solb"]
+
+@pytest.fixture
+def moves(tiny, tiny_game):
+    """Moves of the solution of A* on the tiny map"""
+    return a_star_search(tiny_game, tiny["blanks"], 1)["moves"]
+
+def write(path, game, moves, chunk=5, **footer):
+    """Writes a solution file a few moves at a time"""
+    with SolutionWriter(str(path), game, "a_star") as writer:
+        for start in range(0, len(moves), 2 * chunk):
+            writer.write(moves[start:start + 2 * chunk])
+        writer.close(**footer)
+
+@pytest.mark.parametrize("name", VARIANTS)
+@pytest.mark.parametrize("length", [0, 1, 22, 23])
+def test_round_trip(tmp_path, monkeypatch, tiny_game, moves, name, length):
+    # Small chunks, so the moves and the footer are read over several chunks
+    monkeypatch.setattr(solution_format, "READ_CHUNK_SIZE", 4)
+    write(tmp_path / name, tiny_game, moves[:2 * length], time=0.5)
+    header, read_moves, footer = read_solution(str(tmp_path / name))
+    assert header["algorithm"] == "a_star"
+    assert header["robot"] == list(tiny_game.robot)
+    assert read_moves == moves[:2 * length]
+    assert footer == {"time": 0.5, "length": length}
+
+@pytest.mark.parametrize("name", VARIANTS)
+def test_summary(tmp_path, tiny_game, moves, name):
+    write(tmp_path / name, tiny_game, moves)
+    summary = solution_summary(str(tmp_path / name))
+    assert summary["length"] == len(moves) // 2
+    assert summary["pushes"] == moves.count("P")
+    assert summary["pulls"] == moves.count("p")
+
+@pytest.mark.parametrize("name", VARIANTS)
+def test_validate_replays_the_solution(tmp_path, tiny_game, moves, name):
+    write(tmp_path / name, tiny_game, moves)
+    assert validate_solution(str(tmp_path / name)) == {"valid": True, "length": len(moves) // 2}
+    assert validate_solution(str(tmp_path / name), tiny_game)["valid"]
+
+def test_validate_rejects_an_incomplete_solution(tmp_path, tiny_game, moves):
+    write(tmp_path / "solution.sol", tiny_game, moves[:-2])
+    result = validate_solution(str(tmp_path / "solution.sol"))
+    assert not result["valid"]
+    assert result["error"] == "Some boxes are not on a storage"
+
+def test_validate_rejects_an_illegal_move(tmp_path):
+    objects = map2objects(ONE_PUSH_MAP)
+    game = Game(objects["state"], objects["blanks"], objects["board"])
+    write(tmp_path / "solution.sol", game, "L-")
+    result = validate_solution(str(tmp_path / "solution.sol"))
+    assert not result["valid"]
+    assert result["length"] == 0
+    assert result["error"].startswith("Illegal move")
+
+def test_validate_rejects_another_map(tmp_path, tiny_game, moves):
+    write(tmp_path / "solution.sol", tiny_game, moves)
+    objects = map2objects(ONE_PUSH_MAP)
+    result = validate_solution(str(tmp_path / "solution.sol"), Game(objects["state"], objects["blanks"], objects["board"]))
+    assert not result["valid"]
+    assert result["error"] == "The solution is for another map or initial state"
+
+def test_validate_rejects_a_wrong_footer(tmp_path, tiny_game, moves):
+    path = tmp_path / "solution.sol"
+    write(path, tiny_game, moves)
+    header, line, footer = path.read_text().split("\n")[:3]
+    path.write_text("\n".join([header, line, footer.replace(f'"length": {len(moves) // 2}', '"length": 1')]) + "\n")
+    result = validate_solution(str(path))
+    assert not result["valid"]
+    assert result["error"] == "The footer counts 1 moves"
+
+def test_reader_rejects_other_files(tmp_path):
+    (tmp_path / "other.sol").write_text('{"format": "other"}\n')
+    with pytest.raises(ValueError):
+        read_solution(str(tmp_path / "other.sol"))
+    (tmp_path / "other.solb").write_bytes(b"not a solution")
+    with pytest.raises(ValueError):
+        read_solution(str(tmp_path / "other.solb"))
+
+def test_reader_rejects_a_truncated_file(tmp_path, tiny_game, moves):
+    path = tmp_path / "solution.sol"
+    write(path, tiny_game, moves)
+    path.write_text(path.read_text().split("\n")[0] + "\n" + moves[:10])
+    with pytest.raises(ValueError):
+        read_solution(str(path))
@@ -0,0 +1,79 @@
+import io
+import json
+from collections import OrderedDict
+
+import pytest
+
+import solver_service
+from conftest import ONE_PUSH_MAP, TINY_MAP
+from solver_service import TASK_DEFAULTS, compile_map, read_tasks, serve, task_result
+
+def tasks(*lines):
+    """Reads tasks from JSON lines, the objects being dumped first"""
+    return list(read_tasks(io.StringIO("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines))))
+
+def test_read_tasks_fills_in_the_defaults():
+    task, = tasks({"map": ONE_PUSH_MAP, "time": 2})
+    assert task == dict(TASK_DEFAULTS, map=ONE_PUSH_MAP, time=2, id=1)
+    task, = tasks("", {"id": "level", "map": ONE_PUSH_MAP, "algorithm": "breadth_first"})
+    assert (task["id"], task["algorithm"]) == ("level", "breadth_first")
+    assert "error" not in task
+
+@pytest.mark.parametrize("line, error", [
+    ("{not json", "Invalid JSON"),
+    ("[1, 2]", "A task must be a JSON object"),
+    ({"time": 1}, "Missing map"),
+    ({"map": ONE_PUSH_MAP, "algorithm": "dijkstra"}, "Unknown algorithm"),
+    ({"map": ONE_PUSH_MAP, "algorithm": ["a_star"]}, "Unknown algorithm"),
+    ({"map": ONE_PUSH_MAP, "time": "5"}, "Invalid time"),
+    ({"map": ONE_PUSH_MAP, "time": True}, "Invalid time"),
+    ({"map": ONE_PUSH_MAP, "time": 0}, "Invalid time"),
+    ({"map": ONE_PUSH_MAP, "time": None}, "Invalid time"),
+    ({"map": ONE_PUSH_MAP, "memory": "512"}, "Invalid memory"),
+    ({"map": ONE_PUSH_MAP, "memory": -1}, "Invalid memory"),
+    ({"map": ONE_PUSH_MAP, "heuristic": "euclidean"}, "Unknown heuristic"),
+    ({"map": ONE_PUSH_MAP, "macro": "yes"}, "Invalid macro"),
+    ({"map": ONE_PUSH_MAP, "macro": 1}, "Invalid macro")
+])
+def test_read_tasks_reports_invalid_tasks(line, error):
+    task, = tasks(line)
+    assert task["id"] == 1
+    assert task["error"].startswith(error)
+
+def test_compile_map_keeps_the_recent_maps(monkeypatch):
+    monkeypatch.setattr(solver_service, "MAP_CACHE_SIZE", 1)
+    maps = OrderedDict()
+    objects = compile_map(ONE_PUSH_MAP, maps)
+    assert compile_map(ONE_PUSH_MAP, maps) is objects
+    compile_map(TINY_MAP, maps)
+    assert list(maps) == [TINY_MAP]
+
+def test_task_result():
+    task, = tasks({"id": "level", "map": ONE_PUSH_MAP})
+    result = task_result(task, {"reason": "Time exceeded"})
+    assert result == dict(TASK_DEFAULTS, id="level", solved=False, reason="Time exceeded")
+
+def test_serve(monkeypatch):
+    monkeypatch.setattr(solver_service, "DEADLINE_GRACE", 0)
+    hard_map = "OOOOOOO\nOS   SO\nO BBB O\nO BRB O\nOSBBBSO\nOSS SSO\nOOOOOOO"
+    infile = io.StringIO("\n".join([
+        json.dumps({"id": "tiny", "map": TINY_MAP}),
+        json.dumps({"id": "macro", "map": TINY_MAP, "algorithm": "breadth_first", "macro": True}),
+        json.dumps({"id": "matching", "map": TINY_MAP, "heuristic": "matching"}),
+        json.dumps({"id": "bad time", "map": TINY_MAP, "time": "5"}),
+        json.dumps({"id": "bad map", "map": "OOO\nOBO\nOOO"}),
+        json.dumps({"id": "hard", "map": hard_map, "algorithm": "breadth_first", "time": 0.002}),
+        "not a task"
+    ]))
+    outfile = io.StringIO()
+    counts = serve(infile, outfile, workers=2)
+    results = {result["id"]: result for result in map(json.loads, outfile.getvalue().splitlines())}
+    assert counts == {"tasks": 7, "solved": 3, "failed": 3}
+    assert len(results) == 7
+    assert results["tiny"]["solved"] and results["tiny"]["length"] == 23
+    assert results["macro"]["solved"] and results["macro"]["macro"] is True
+    assert results["matching"]["solved"] and results["matching"]["length"] == 23
+    assert results["bad time"]["error"].startswith("Invalid time")
+    assert results["bad map"]["error"].startswith("Invalid map")
+    assert results["hard"]["reason"] == "Time exceeded" and not results["hard"]["solved"]
+    assert results[7]["error"].startswith("Invalid JSON")
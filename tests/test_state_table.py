@@ -0,0 +1,76 @@
+import pytest
+
+from game import Game, state_from_dict
+from search import StatePacker, a_star_search, packed_a_star_search, packed_breadth_first_search
+from state_table import FILTERED, INITIAL_SLOTS, MAX_LOAD, NO_PARENT, PackedStateTable
+
+def record(number):
+    """Packed state of 6 bytes"""
+    return number.to_bytes(6, "big")
+
+def test_append_find_and_payload():
+    table = PackedStateTable(6, 1)
+    root = table.append(record(1), NO_PARENT, 0)
+    child = table.append(record(2), root, 1)
+    assert (root, child) == (0, 1)
+    assert len(table) == 2
+    assert table.find(record(2)) == child
+    assert table.find(record(3)) == -1
+    assert table.state(child) == record(2)
+    assert table.payload(child) == (root, 1)
+    table.set_payload(child, NO_PARENT, 7)
+    assert table.payload(child) == (NO_PARENT, 7)
+
+def test_index_grows():
+    table = PackedStateTable(6, 16)
+    count = int(MAX_LOAD * INITIAL_SLOTS) * 2
+    for number in range(count):
+        assert table.append(record(number), NO_PARENT, 0) == number
+    assert len(table.index) > INITIAL_SLOTS
+    assert all(table.find(record(number)) == number for number in range(count))
+
+def test_append_stops_at_the_memory_cap():
+    table = PackedStateTable(6, 0.02)
+    entries = [table.append(record(number), NO_PARENT, 0) for number in range(1000)]
+    assert entries[-1] == -1
+    assert table.memory_bytes() <= table.max_bytes
+    assert table.append(record(1000), NO_PARENT, 0, reserved=table.max_bytes) == -1
+
+def test_degrade_replaces_the_index_by_a_filter():
+    table = PackedStateTable(6, 0.02)
+    number = 0
+    while table.append(record(number), NO_PARENT, 0) >= 0:
+        number += 1
+    full_bytes = table.memory_bytes()
+    assert table.degrade()
+    assert table.memory_bytes() < full_bytes
+    # The states stored before are found by the filter, and the freed memory takes more states
+    assert all(table.find(record(stored)) == FILTERED for stored in range(number))
+    entry = table.append(record(number), NO_PARENT, 0)
+    assert entry == number
+    assert table.find(record(number)) == FILTERED
+    assert table.state(entry) == record(number)
+    assert not table.degrade()
+
+def test_packer_round_trip(tiny, tiny_game):
+    packer = StatePacker(tiny["board"], len(tiny_game.boxes))
+    for _, state in tiny_game.successors():
+        state = state_from_dict(state)
+        assert len(packer.pack(state)) == packer.size
+        assert packer.unpack(packer.pack(state)) == state
+
+@pytest.mark.parametrize("macro", [False, True])
+def test_successor_states_match_the_successors(tiny, tiny_game, macro):
+    expected = [(move, state_from_dict(state)) for move, state in tiny_game.successors(macro)]
+    assert [(move, state) for move, state, _ in tiny_game.successor_states(macro)] == expected
+
+@pytest.mark.parametrize("search", [packed_breadth_first_search, packed_a_star_search])
+def test_packed_searches(tiny, tiny_game, search):
+    assert len(search(tiny_game, tiny["blanks"], 1)["moves"]) // 2 == 23
+    # The cap only holds a few hundred states: the search stops, or carries on with partial duplicate detection
+    assert search(tiny_game, tiny["blanks"], 1, memory_mb=0.02)["reason"] == "Memory exceeded"
+    assert "moves" in search(tiny_game, tiny["blanks"], 1, memory_mb=0.02, on_memory_full="partial")
+
+def test_memory_cap_rejects_the_options_of_the_unpacked_search(tiny, tiny_game):
+    with pytest.raises(ValueError):
+        a_star_search(tiny_game, tiny["blanks"], 1, memory_mb=64, full_output=True)